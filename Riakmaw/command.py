@@ -40,6 +40,7 @@ from Riakmaw.util.types import CustomFilter
 
 if TYPE_CHECKING:
     from Riakmaw.core import Riakmaw
+    from Riakmaw.util.converter import InvocationPlan
 
 CommandFunc = Union[
     Callable[..., Coroutine[Any, Any, None]], Callable[..., Coroutine[Any, Any, Optional[str]]]
@@ -64,6 +65,7 @@ class Command:
     func: Union[CommandFunc, CommandFunc]
     filters: Optional[Union[Filter, CustomFilter]]
     aliases: Iterable[str]
+    plan: Optional["InvocationPlan"]
 
     def __init__(
         self,
@@ -72,12 +74,14 @@ class Command:
         func: CommandFunc,
         cmd_filter: Optional[Union[Filter, CustomFilter]],
         aliases: Iterable[str],
+        plan: Optional["InvocationPlan"] = None,
     ) -> None:
         self.name = name
         self.plugin = plugin
         self.func = func
         self.filters = cmd_filter
         self.aliases = aliases
+        self.plan = plan
 
     def __repr__(self) -> str:
         return f"<command plugin '{self.name}' from '{self.plugin.name}'>"
@@ -91,6 +95,7 @@ class Context:
     msg: Message
     message: Message
     cmd_len: int
+    input_offset: int
 
     response: Message
     input: str
@@ -117,13 +122,11 @@ class Context:
         # Single argument string
         username = self.bot.user.username
         if username and username in self.msg.text:
-            slices = self.cmd_len + 1 + len(username)
-
-            self.input = self.msg.text[slices:]
-            self.input_raw = self.msg.text.markdown[slices:]
+            self.input_offset = self.cmd_len + 1 + len(username)
         else:
-            self.input = self.msg.text[self.cmd_len :]
-            self.input_raw = self.msg.text.markdown[self.cmd_len :]
+            self.input_offset = self.cmd_len
+
+        self.input = self.msg.text[self.input_offset :]
 
         self.segments = self.msg.command
         self.invoker = self.segments[0]
@@ -132,6 +135,8 @@ class Context:
     def __getattr__(self, name: str) -> Any:
         if name == "args":
             return self._get_args()
+        if name == "input_raw":
+            return self._get_input_raw()
 
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
@@ -140,6 +145,11 @@ class Context:
         self.args = self.segments[1:]
         return self.args
 
+    # Single argument string with the markdown entities unparsed
+    def _get_input_raw(self) -> str:
+        self.input_raw = self.msg.text.markdown[self.input_offset :]
+        return self.input_raw
+
     async def delete(
         self, delay: Optional[float] = None, message: Optional[Message] = None
     ) -> None:
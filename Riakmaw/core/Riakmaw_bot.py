@@ -18,9 +18,9 @@ import asyncio
 import logging
 from typing import Optional
 
-import aiohttp
 import pyrogram
 
+from Riakmaw import util
 from Riakmaw.util.config import Config
 
 from .command_dispatcher import CommandDispatcher
@@ -33,7 +33,7 @@ from .telegram_bot import TelegramBot
 class Riakmaw(TelegramBot, DatabaseProvider, PluginExtender, CommandDispatcher, EventDispatcher):
     # Initialized during instantiation
     log: logging.Logger
-    http: aiohttp.ClientSession
+    http: util.http.HttpClient
     client: pyrogram.client.Client
     config: Config
     loop: asyncio.AbstractEventLoop
@@ -45,11 +45,13 @@ class Riakmaw(TelegramBot, DatabaseProvider, PluginExtender, CommandDispatcher,
         self.loop = asyncio.get_event_loop()
         self.stopping = False
 
+        util.async_helper.configure_executors(config.EXECUTOR_POOLS)
+
         # Initialize mixins
         super().__init__()
 
-        # Initialize aiohttp session last in case another mixin fails
-        self.http = aiohttp.ClientSession()
+        # Initialize HTTP client last in case another mixin fails
+        self.http = util.http.HttpClient()
 
     @classmethod
     async def init_and_run(
@@ -73,14 +75,21 @@ class Riakmaw(TelegramBot, DatabaseProvider, PluginExtender, CommandDispatcher,
             await self.dispatch_event("stop")
 
         self.log.info("Stopping")
+        self.stopping = True
         if self.loaded:
+            # Queued updates must reach the plugins before they release their resources
+            await self.stop_dispatch_shards()
             await self.dispatch_event("stop")
             if self.client.is_connected:
                 await self.client.stop()
 
         await self.http.close()
+        await self.flush_writes()
+        self.close_settings_caches()
         await self.db.close()
 
         self.log.info("Running post-stop hooks")
         if self.loaded:
             await self.dispatch_event("stopped")
+
+        util.async_helper.shutdown_executors()
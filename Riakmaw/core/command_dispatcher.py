@@ -14,7 +14,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import inspect
 from typing import TYPE_CHECKING, Any, Iterable, MutableMapping, Optional, Union
 
 from pyrogram import ContinuePropagation, errors
@@ -26,7 +25,7 @@ from pyrogram.types import Message
 
 from Riakmaw import command, plugin, util
 from Riakmaw.error import CommandHandlerError, CommandInvokeError, ExistingCommandError
-from Riakmaw.util.cache_limiter import CacheLimiter
+from Riakmaw.util.rate_limiter import CommandLimiter
 
 from .Riakmaw_mixin_base import MixinBase
 
@@ -39,13 +38,13 @@ class CommandDispatcher(MixinBase):
     commands: MutableMapping[str, command.Command]
 
     # Private
-    __limiter: CacheLimiter
+    __limiter: CommandLimiter
 
     def __init__(self: "Riakmaw", **kwargs: Any) -> None:
         # Initialize command map
         self.commands = {}
 
-        self.__limiter = CacheLimiter(ttl=10, max_value=3)
+        self.__limiter = CommandLimiter()
 
         # Propagate initialization to other mixins
         super().__init__(**kwargs)
@@ -67,8 +66,10 @@ class CommandDispatcher(MixinBase):
         if filters:
             self.log.debug("Registering filter '%s' into '%s'", type(filters).__name__, name)
             util.misc.check_filters(filters, self)
+            filters = util.compiled_filter.compile_filter(filters)
 
-        cmd = command.Command(name, plug, func, filters, aliases)
+        plan = util.converter.InvocationPlan(func)
+        cmd = command.Command(name, plug, func, filters, aliases, plan)
 
         if name in self.commands:
             orig = self.commands[name]
@@ -138,42 +139,33 @@ class CommandDispatcher(MixinBase):
                 return False  # ignore channel broadcasts
 
             if message.text is not None and message.text.startswith("/"):
+                parts = message.text.split()
+                parts[0] = parts[0][1:]
+
+                # Check if bot command contains a valid username
+                # eg: /ping@dRiakmaw_bot will return True
+                # If current bot instance is dRiakmaw_bot else False
+                if self.user.username and self.user.username in parts[0]:
+                    # Remove username from command
+                    parts[0] = parts[0].replace(f"@{self.user.username}", "")
+
+                # Filter if command is not in commands
+                try:
+                    cmd = self.commands[parts[0]]
+                except KeyError:
+                    return False
+
+                # Check user, chat and global limiter
                 user = message.from_user or message.sender_chat
-                # check user limiter
-                if await self.__limiter.exceeded(user.id):
+                if not self.__limiter.acquire(user.id, message.chat.id if message.chat else None):
                     return False
 
-                try:
-                    parts = message.text.split()
-                    parts[0] = parts[0][1:]
-
-                    # Check if bot command contains a valid username
-                    # eg: /ping@dRiakmaw_bot will return True
-                    # If current bot instance is dRiakmaw_bot else False
-                    if self.user.username and self.user.username in parts[0]:
-                        # Remove username from command
-                        parts[0] = parts[0].replace(f"@{self.user.username}", "")
-
-                    # Filter if command is not in commands
-                    try:
-                        cmd = self.commands[parts[0]]
-                    except KeyError:
-                        return False
-
-                    # Check additional built-in filters
-                    if cmd.filters:
-                        if inspect.iscoroutinefunction(cmd.filters.__call__):
-                            if not await cmd.filters(client, message):
-                                return False
-                        else:
-                            if not await util.run_sync(cmd.filters, client, message):
-                                return False
-
-                    message.command = parts
-                    return True
-                finally:
-                    # Increment user limit
-                    await self.__limiter.increment(user.id)
+                # Check additional built-in filters
+                if cmd.filters and not await cmd.filters(client, message):
+                    return False
+
+                message.command = parts
+                return True
 
             return False
 
@@ -193,11 +185,7 @@ class CommandDispatcher(MixinBase):
             )
 
             # Parse and convert handler required parameters
-            signature = inspect.signature(cmd.func)
-            args = []  # type: list[Any]
-            kwargs = {}  # type: MutableMapping[str, Any]
-            if len(signature.parameters) > 1:
-                args, kwargs = await util.converter.parse_arguments(signature, ctx, cmd.func)
+            args, kwargs = await cmd.plan.parse(ctx)
 
             # Invoke command function
             try:
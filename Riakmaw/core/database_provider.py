@@ -14,8 +14,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import sys
-from typing import TYPE_CHECKING, Any
+from functools import partial
+from typing import TYPE_CHECKING, Any, List, Mapping, MutableMapping, Optional, Sequence
+
+from pymongo import IndexModel
+from pymongo.errors import PyMongoError
 
 from Riakmaw import util
 
@@ -27,18 +32,80 @@ if TYPE_CHECKING:
 
 class DatabaseProvider(MixinBase):
     db: util.db.AsyncDatabase
+    write_buffers: MutableMapping[str, util.db.WriteBehind]
+    settings_caches: MutableMapping[str, util.db.SettingsCache]
 
     def __init__(self: "Riakmaw", **kwargs: Any) -> None:
+        client_cls: Any = util.db.AsyncClient
+        if self.config.DB_BACKEND == "native":
+            if util.db.native.AVAILABLE:
+                client_cls = util.db.NativeClient
+            else:
+                self.log.warning(
+                    "Native database backend requires motor, falling back to thread backend"
+                )
+        elif self.config.DB_BACKEND != "thread":
+            self.log.warning(
+                "Unknown database backend '%s', using thread backend", self.config.DB_BACKEND
+            )
+
         if sys.platform == "win32":
             import certifi
 
-            client = util.db.AsyncClient(
-                self.config.DB_URI, connect=False, tlsCAFile=certifi.where()
-            )
+            client = client_cls(self.config.DB_URI, connect=False, tlsCAFile=certifi.where())
         else:
-            client = util.db.AsyncClient(self.config.DB_URI, connect=False)
+            client = client_cls(self.config.DB_URI, connect=False)
 
         self.db = client.get_database("RiakmawBot")
+        self.write_buffers = {}
+        self.settings_caches = {}
 
         # Propagate initialization to other mixins
         super().__init__(**kwargs)
+
+    def write_behind(self: "Riakmaw", name: str) -> util.db.WriteBehind:
+        """Get the shared write-behind buffer of a collection"""
+        try:
+            return self.write_buffers[name]
+        except KeyError:
+            buffer = self.write_buffers[name] = util.db.WriteBehind(self.db.get_collection(name))
+            return buffer
+
+    async def flush_writes(self: "Riakmaw") -> None:
+        await asyncio.gather(*(buffer.flush() for buffer in self.write_buffers.values()))
+
+    async def ensure_indexes(self: "Riakmaw") -> None:
+        """Create the indexes declared by the loaded plugins"""
+
+        async def ensure(name: str, indexes: List[IndexModel]) -> None:
+            try:
+                await self.db.get_collection(name).create_indexes(indexes)
+            except PyMongoError as e:
+                # An existing index with other options shouldn't stop the bot
+                self.log.warning("Failed to create indexes on %s: %s", name, e)
+
+        declared = util.db.merge_indexes(plug.indexes for plug in self.plugins.values())
+        await asyncio.gather(*(ensure(name, indexes) for name, indexes in declared.items()))
+
+    async def get_user_data(self: "Riakmaw", user_id: int) -> Optional[Mapping[str, Any]]:
+        """USERS document of a user, loaded at most once per update"""
+        return await util.memo.current().get(
+            ("USERS", user_id), partial(self.db.get_collection("USERS").find_one, {"_id": user_id})
+        )
+
+    def settings_cache(
+        self: "Riakmaw", name: str, key: str = "chat_id", fields: Optional[Sequence[str]] = None
+    ) -> util.db.SettingsCache:
+        """Get the shared settings cache of a collection,
+        the first caller decides the key and fields of the cache"""
+        try:
+            return self.settings_caches[name]
+        except KeyError:
+            cache = self.settings_caches[name] = util.db.SettingsCache(
+                self.db.get_collection(name), key=key, fields=fields
+            )
+            return cache
+
+    def close_settings_caches(self: "Riakmaw") -> None:
+        for cache in self.settings_caches.values():
+            cache.close()
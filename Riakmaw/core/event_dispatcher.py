@@ -16,14 +16,24 @@
 
 import asyncio
 import bisect
+from copy import copy
 from datetime import datetime
 from hashlib import sha256
-from typing import TYPE_CHECKING, Any, MutableMapping, MutableSequence, Optional, Tuple
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    List,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Tuple,
+)
 
 from pyrogram import raw
 from pyrogram.filters import Filter
 from pyrogram.raw import functions
-from pyrogram.types import CallbackQuery, InlineQuery, Message
+from pyrogram.types import CallbackQuery, ChatMemberUpdated, InlineQuery, Message
 
 from Riakmaw import plugin, util
 from Riakmaw.error import EventDispatchError
@@ -41,6 +51,10 @@ EventType = (
     Message,
 )
 
+# Events which listeners don't depend on each other, so they are always gathered
+CONCURRENT_EVENTS = {"chat_migrate", "plugin_backup", "plugin_restore", "stat_listen", "stop"}
+CONCURRENT_DISPATCH_LIMIT = 8
+
 
 def _get_event_data(event: Any) -> MutableMapping[str, Any]:
     if isinstance(event, Message):
@@ -73,13 +87,66 @@ def _unpack_args(args: Tuple[Any, ...]) -> str:
     return ", ".join([str(arg) for arg in args])
 
 
+def _get_shard_key(event: Any) -> int:
+    """Get the chat id of an event, falling back to the sender for chatless events."""
+    if isinstance(event, (Message, ChatMemberUpdated)) and event.chat:
+        return event.chat.id
+    if isinstance(event, CallbackQuery) and event.message and event.message.chat:
+        return event.message.chat.id
+    if getattr(event, "from_user", None):
+        return event.from_user.id
+
+    return 0
+
+
+class DispatchShard:
+    """A bounded event queue served by a single worker.
+
+    Events of the same chat always land on the same shard, so they are
+    dispatched in order while other shards keep running in parallel.
+    """
+
+    index: int
+    queue: "asyncio.Queue[Tuple[float, str, Tuple[Any, ...]]]"
+    task: Optional[asyncio.Task]
+
+    processed: int
+    lag: float
+    max_lag: float
+
+    def __init__(self, index: int, maxsize: int) -> None:
+        self.index = index
+        self.queue = asyncio.Queue(maxsize)
+        self.task = None
+
+        self.processed = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def stats(self) -> MutableMapping[str, Any]:
+        return {
+            "shard": self.index,
+            "depth": self.depth,
+            "maxsize": self.queue.maxsize,
+            "processed": self.processed,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+        }
+
+
 class EventDispatcher(MixinBase):
     # Initialized during instantiation
     listeners: MutableMapping[str, MutableSequence[Listener]]
+    dispatch_shards: List[DispatchShard]
 
     def __init__(self: "Riakmaw", **kwargs: Any) -> None:
         # Initialize listener map
         self.listeners = {}
+        self.dispatch_shards = []
 
         # Propagate initialization to other mixins
         super().__init__(**kwargs)
@@ -92,6 +159,7 @@ class EventDispatcher(MixinBase):
         *,
         priority: int = 100,
         filters: Optional[Filter] = None,
+        concurrent: bool = False,
     ) -> None:
         if event in {"load", "start", "started", "stop", "stopped"} and filters is not None:
             self.log.warning("Built-in Listener can't be use with filters. Removing...")
@@ -104,8 +172,9 @@ class EventDispatcher(MixinBase):
 
         if filters:
             self.log.debug("Registering filter '%s' into '%s'", type(filters).__name__, event)
+            filters = util.compiled_filter.compile_filter(filters)
 
-        listener = Listener(event, func, plug, priority, filters)
+        listener = Listener(event, func, plug, priority, filters, concurrent=concurrent)
 
         if event in self.listeners:
             bisect.insort(self.listeners[event], listener)
@@ -132,6 +201,7 @@ class EventDispatcher(MixinBase):
                     func,
                     priority=getattr(func, "_listener_priority", 100),
                     filters=getattr(func, "_listener_filters", None),
+                    concurrent=getattr(func, "_listener_concurrent", False),
                 )
                 done = True
             finally:
@@ -144,6 +214,110 @@ class EventDispatcher(MixinBase):
                 if listener.plugin == plug:
                     self.unregister_listener(listener)
 
+    async def _dispatch_listener(
+        self: "Riakmaw",
+        lst: Listener,
+        event: str,
+        args: Tuple[Any, ...],
+        kwargs: MutableMapping[str, Any],
+    ) -> Any:
+        """Invoke a single listener, reporting any error it raised.
+
+        Returns the listener result, or None if it was filtered out or failed.
+        :obj:`StopPropagation` is left for the caller to handle.
+        """
+        match = None
+        index = None
+        if lst.filters:
+            for idx, arg in enumerate(args):
+                if isinstance(arg, EventType):
+                    if not await lst.filters(self.client, arg):
+                        continue
+
+                    match = arg.matches
+                    index = idx
+                    break
+
+                self.log.error(f"'{type(arg)}' can't be used with filters.")
+            else:
+                return None
+
+        if match and index is not None:
+            args[index].matches = match
+
+        try:
+            return await lst.func(*args, **kwargs)
+        except KeyError:
+            return None
+        except StopPropagation:
+            raise
+        except Exception as err:  # skipcq: PYL-W0703
+            dispatcher_error = EventDispatchError(
+                f"raised from {type(err).__name__}: {str(err)}"
+            ).with_traceback(err.__traceback__)
+            await self.dispatch_alert(
+                f"Event __{event}__ on `{lst.func.__qualname__}`", dispatcher_error
+            )
+            if args and isinstance(args[0], EventType):
+                data = _get_event_data(args[0])
+                self.log.error(
+                    "Error dispatching event '%s' on %s\n"
+                    "  Data:\n"
+                    "    • Chat    -> %s (%d)\n"
+                    "    • Invoker -> %s (%d)\n"
+                    "    • Input   -> %s",
+                    event,
+                    lst.func.__qualname__,
+                    data.get("chat_title", "Unknown"),
+                    data.get("chat_id", -1),
+                    data.get("user_name", "Unknown"),
+                    data.get("user_id", -1),
+                    data.get("input"),
+                    exc_info=dispatcher_error,
+                )
+            else:
+                self.log.error(
+                    "Error dispatching event '%s' on %s with data\n%s",
+                    event,
+                    lst.func.__qualname__,
+                    _unpack_args(args),
+                    exc_info=dispatcher_error,
+                )
+
+            return None
+
+    async def _dispatch_concurrent(
+        self: "Riakmaw",
+        listeners: List[Listener],
+        event: str,
+        args: Tuple[Any, ...],
+        kwargs: MutableMapping[str, Any],
+    ) -> Tuple[List[Any], bool]:
+        """Gather listeners with a bounded concurrency.
+
+        Returns the results in listener order and whether any of them stopped propagation.
+        """
+        semaphore = asyncio.Semaphore(CONCURRENT_DISPATCH_LIMIT)
+        for arg in args:
+            if isinstance(arg, EventType):
+                # Attached before copying, so the copies still share filter results
+                util.compiled_filter.memo_of(arg)
+
+        async def invoke(lst: Listener) -> Tuple[Any, bool]:
+            # Filters store their matches on the update, so each filtered listener
+            # gets its own copy to not read the matches of another one
+            lst_args = args
+            if lst.filters:
+                lst_args = tuple(copy(arg) if isinstance(arg, EventType) else arg for arg in args)
+            async with semaphore:
+                try:
+                    return await self._dispatch_listener(lst, event, lst_args, kwargs), False
+                except StopPropagation:
+                    return None, True
+
+        done = await asyncio.gather(*(invoke(lst) for lst in listeners))
+        return [result for result, _ in done], any(stop for _, stop in done)
+
     async def dispatch_event(
         self: "Riakmaw",
         event: str,
@@ -162,77 +336,111 @@ class EventDispatcher(MixinBase):
 
         self.log.debug("Dispatching event '%s' with data %s", event, args)
 
-        match = None
-        index = None
-        is_tg_event = False
-        for lst in listeners:
-            if lst.filters:
-                for idx, arg in enumerate(args):
-                    is_tg_event = isinstance(arg, EventType)
-                    if is_tg_event:
-                        if not await lst.filters(self.client, arg):
-                            continue
-
-                        match = arg.matches
-                        index = idx
+        # Listeners of the same update share what they load through util.memo
+        with util.memo.scope(args[0] if args else None):
+            if event in CONCURRENT_EVENTS:
+                batch, _ = await self._dispatch_concurrent(list(listeners), event, args, kwargs)
+                return tuple(result for result in batch if result)
+
+            # Listeners that declared themselves concurrent are gathered together
+            # with their concurrent neighbours, the rest run one after another.
+            pending: List[Listener] = []
+            for lst in [*listeners, None]:
+                if lst is not None and lst.concurrent:
+                    pending.append(lst)
+                    continue
+
+                if pending:
+                    batch, stop = await self._dispatch_concurrent(pending, event, args, kwargs)
+                    results.extend(result for result in batch if result)
+                    pending = []
+                    if stop:
                         break
 
-                    self.log.error(f"'{type(arg)}' can't be used with filters.")
-                else:
-                    continue
+                if lst is None:
+                    break
 
-            if match and index is not None:
-                args[index].matches = match
+                try:
+                    result = await self._dispatch_listener(lst, event, args, kwargs)
+                except StopPropagation:
+                    break
 
-            result = None
-            try:
-                result = await lst.func(*args, **kwargs)
-            except KeyError:
-                continue
-            except StopPropagation:
-                break
-            except Exception as err:  # skipcq: PYL-W0703
-                dispatcher_error = EventDispatchError(
-                    f"raised from {type(err).__name__}: {str(err)}"
-                ).with_traceback(err.__traceback__)
-                await self.dispatch_alert(
-                    f"Event __{event}__ on `{lst.func.__qualname__}`", dispatcher_error
-                )
-                if is_tg_event and args[0] is not None:
-                    data = _get_event_data(args[0])
-                    self.log.error(
-                        "Error dispatching event '%s' on %s\n"
-                        "  Data:\n"
-                        "    • Chat    -> %s (%d)\n"
-                        "    • Invoker -> %s (%d)\n"
-                        "    • Input   -> %s",
-                        event,
-                        lst.func.__qualname__,
-                        data.get("chat_title", "Unknown"),
-                        data.get("chat_id", -1),
-                        data.get("user_name", "Unknown"),
-                        data.get("user_id", -1),
-                        data.get("input"),
-                        exc_info=dispatcher_error,
-                    )
-                else:
-                    self.log.error(
-                        "Error dispatching event '%s' on %s with data\n%s",
-                        event,
-                        lst.func.__qualname__,
-                        _unpack_args(args),
-                        exc_info=dispatcher_error,
-                    )
-                continue
-            finally:
                 if result:
                     results.append(result)
 
-                match = None
-                index = None
-                result = None
+            return tuple(results)
+
+    async def _shard_worker(self: "Riakmaw", shard: DispatchShard) -> None:
+        while True:
+            queued_at, event, args = await shard.queue.get()
+            shard.lag = monotonic() - queued_at
+            shard.max_lag = max(shard.max_lag, shard.lag)
+            try:
+                await self.dispatch_event(event, *args)
+            except Exception:  # skipcq: PYL-W0703
+                # dispatch_event already reports listener errors
+                self.log.exception("Unhandled error on dispatch shard %d", shard.index)
+            finally:
+                shard.processed += 1
+                shard.queue.task_done()
+
+    def start_dispatch_shards(self: "Riakmaw") -> None:
+        if self.dispatch_shards or self.config.DISPATCH_SHARDS <= 0:
+            return
+
+        self.log.info(
+            "Starting %d dispatch shards with queue size %d",
+            self.config.DISPATCH_SHARDS,
+            self.config.DISPATCH_QUEUE_SIZE,
+        )
+        for index in range(self.config.DISPATCH_SHARDS):
+            shard = DispatchShard(index, self.config.DISPATCH_QUEUE_SIZE)
+            shard.task = self.loop.create_task(self._shard_worker(shard))
+            self.dispatch_shards.append(shard)
+
+    async def stop_dispatch_shards(self: "Riakmaw", timeout: float = 10) -> None:
+        if not self.dispatch_shards:
+            return
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(shard.queue.join() for shard in self.dispatch_shards)), timeout
+            )
+        except asyncio.TimeoutError:
+            self.log.warning(
+                "Dropping %d undispatched events",
+                sum(shard.depth for shard in self.dispatch_shards),
+            )
+
+        for shard in self.dispatch_shards:
+            if shard.task:
+                shard.task.cancel()
+
+        await asyncio.gather(
+            *(shard.task for shard in self.dispatch_shards if shard.task),
+            return_exceptions=True,
+        )
+        self.dispatch_shards = []
+
+    async def dispatch_sharded_event(self: "Riakmaw", event: str, *args: Any) -> None:
+        """Queue a telegram event on its chat shard, or dispatch it inline if sharding is off.
+
+        Waits while the shard queue is full, pushing backpressure to the update workers.
+        Updates received while the bot is stopping are dropped.
+        """
+        if self.stopping:
+            return
+
+        if not self.dispatch_shards:
+            await self.dispatch_event(event, *args)
+            return
+
+        key = _get_shard_key(args[0]) if args else 0
+        shard = self.dispatch_shards[hash(key) % len(self.dispatch_shards)]
+        await shard.queue.put((monotonic(), event, args))
 
-        return tuple(results)
+    def dispatch_stats(self: "Riakmaw") -> List[MutableMapping[str, Any]]:
+        return [shard.stats() for shard in self.dispatch_shards]
 
     async def dispatch_missed_events(self: "Riakmaw") -> None:
         if not self.loaded or self._TelegramBot__running:
@@ -19,13 +19,23 @@ import signal
 import sys
 from functools import partial
 from hashlib import sha256
-from typing import TYPE_CHECKING, Any, MutableMapping, Optional, Set, Tuple, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import pyrogram.filters as flt
-from aiocache import cached
 from aiopath import AsyncPath
 from pyrogram.client import Client
 from pyrogram.enums.parse_mode import ParseMode
+from pyrogram.errors import PeerIdInvalid, UserNotParticipant
 from pyrogram.filters import Filter
 from pyrogram.handlers.callback_query_handler import CallbackQueryHandler
 from pyrogram.handlers.chat_member_updated_handler import ChatMemberUpdatedHandler
@@ -35,6 +45,7 @@ from pyrogram.types import (
     CallbackQuery,
     Chat,
     ChatMember,
+    ChatMemberUpdated,
     ChatPreview,
     InlineQuery,
     Message,
@@ -44,6 +55,7 @@ from yaml import full_load
 
 from Riakmaw import util
 from Riakmaw.language import get_lang_file
+from Riakmaw.util.cache import cached
 
 from .Riakmaw_mixin_base import MixinBase
 
@@ -65,7 +77,7 @@ class TelegramBot(MixinBase):
     staff: Set[int]
     devs: Set[int]
     chats_languages: MutableMapping[int, str]
-    languages: MutableMapping[str, MutableMapping[str, str]]
+    languages: MutableMapping[str, Mapping[str, str]]
 
     # Initialized during startup
     client: Client
@@ -127,11 +139,14 @@ class TelegramBot(MixinBase):
 
         # Register core command handler
         self.client.add_handler(MessageHandler(self.on_command, self.command_predicate()), -1)
+        # Keep chat admins roster up to date
+        self.client.add_handler(ChatMemberUpdatedHandler(self.on_member_update), -1)
 
         # Load plugin
         self.load_all_plugins()
-        await self.dispatch_event("load")
+        await asyncio.gather(self.ensure_indexes(), self.dispatch_event("load"))
         self.loaded = True
+        self.start_dispatch_shards()
 
         async with asyncio.Lock():
             # Start Telegram client
@@ -168,12 +183,15 @@ class TelegramBot(MixinBase):
         async for data in self.db.get_collection("LANGUAGE").find({}, {"_id": False}):
             self.chats_languages[data["chat_id"]] = data["language"]
 
-        # Load text from language file
+        # Load text from language file, then decode it once into lookup tables
+        raw_languages = {}
         async for language_file in get_lang_file():
-            self.languages[language_file.stem] = await util.run_sync(
-                full_load, await language_file.read_text()
+            raw_languages[language_file.stem] = await util.run_sync(
+                full_load, await language_file.read_text(), pool="cpu"
             )
 
+        self.languages = util.tg.compile_languages(self, raw_languages)
+
         # Record start time and dispatch start event
         self.start_time_us = util.time.usec()
         await self.dispatch_event("start", self.start_time_us)
@@ -260,6 +278,21 @@ class TelegramBot(MixinBase):
             # Make sure we stop when done
             await self.stop()
 
+    async def on_member_update(
+        self: "Riakmaw", client: Client, update: ChatMemberUpdated  # skipcq: PYL-W0613
+    ) -> None:
+        util.roster.ROSTER.update(update)
+
+        member = update.new_chat_member or update.old_chat_member
+        if member and member.user and member.user.is_self:
+            self.invalidate_chat_cache(update.chat.id)
+            return
+
+        if member and member.user:
+            self.get_chat_member.cache.invalidate(update.chat.id, member.user.id)  # type: ignore
+
+        self.get_chat_members_count.cache.invalidate(update.chat.id)  # type: ignore
+
     def update_plugin_event(
         self: "Riakmaw",
         name: str,
@@ -275,7 +308,7 @@ class TelegramBot(MixinBase):
                 async def event_handler(
                     client: Client, event: EventType  # skipcq: PYL-W0613
                 ) -> None:
-                    await self.dispatch_event(name, event)
+                    await self.dispatch_sharded_event(name, event)
 
                 if filters is not None:
                     handler_info = (event_type(event_handler, filters), group)
@@ -384,12 +417,51 @@ class TelegramBot(MixinBase):
 
         raise ValueError(f"Unknown response mode {mode}")
 
-    @cached(ttl=60)
-    async def get_chat(self: "Riakmaw", chat_id: int) -> Union[Chat, ChatPreview]:
+    @cached(ttl=60, negative=(PeerIdInvalid,), negative_ttl=10, noself=True)
+    async def get_chat(self: "Riakmaw", chat_id: Union[int, str]) -> Union[Chat, ChatPreview]:
         """Wrapper for `Client.get_chat` with a TTL cache."""
         return await self.client.get_chat(chat_id)
 
-    @cached(ttl=60)
-    async def get_chat_member(self: "Riakmaw", chat_id: int, user_id: int) -> ChatMember:
+    @cached(
+        ttl=60,
+        maxsize=4096,
+        negative=(PeerIdInvalid, UserNotParticipant),
+        negative_ttl=10,
+        noself=True,
+    )
+    async def get_chat_member(
+        self: "Riakmaw", chat_id: int, user_id: Union[int, str]
+    ) -> ChatMember:
         """Wrapper for `Client.get_chat_member` with a TTL cache."""
         return await self.client.get_chat_member(chat_id, user_id)
+
+    @cached(ttl=60, maxsize=4096, negative=(PeerIdInvalid,), negative_ttl=10, noself=True)
+    async def get_users(self: "Riakmaw", user_id: Union[int, str]) -> User:
+        """Wrapper for `Client.get_users` of a single user with a TTL cache."""
+        return await self.client.get_users(user_id)  # type: ignore
+
+    @cached(ttl=60, negative=(PeerIdInvalid,), negative_ttl=10, noself=True)
+    async def get_chat_members_count(self: "Riakmaw", chat_id: int) -> int:
+        """Wrapper for `Client.get_chat_members_count` with a TTL cache."""
+        return await self.client.get_chat_members_count(chat_id)
+
+    async def get_member(self: "Riakmaw", chat_id: int, user_id: int) -> ChatMember:
+        """Chat member record of a user, fetched at most once per update."""
+        return await util.memo.current().get(
+            ("member", chat_id, user_id), partial(self.get_chat_member, chat_id, user_id)
+        )
+
+    async def get_linked_chat(self: "Riakmaw", chat_id: int) -> Optional[Chat]:
+        """Linked channel or discussion group of a chat, fetched at most once per update."""
+
+        async def load() -> Optional[Chat]:
+            chat = await self.get_chat(chat_id)
+            return getattr(chat, "linked_chat", None)
+
+        return await util.memo.current().get(("linked_chat", chat_id), load)
+
+    def invalidate_chat_cache(self: "Riakmaw", chat_id: int) -> None:
+        """Drop every cached API result related to the chat."""
+        self.get_chat.cache.invalidate(chat_id)  # type: ignore
+        self.get_chat_members_count.cache.invalidate(chat_id)  # type: ignore
+        self.get_chat_member.cache.invalidate_where(lambda key: key[0] == chat_id)  # type: ignore
@@ -259,7 +259,7 @@ def _admin_only(include_bot: bool = True, send_error: bool = True) -> CustomFilt
                 if message.sender_chat.id == message.chat.id:  # Anonymous Admin
                     return True
 
-                curr_chat: Any = await client.get_chat(message.chat.id)
+                curr_chat: Any = await flt.Riakmaw.get_chat(message.chat.id)
                 if (
                     curr_chat.linked_chat
                     and message.sender_chat.id == curr_chat.linked_chat.id
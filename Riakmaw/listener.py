@@ -42,12 +42,19 @@ def filters(_filters: Filter) -> Decorator:
     return filters_decorator
 
 
+def concurrent(func: ListenerFunc) -> ListenerFunc:
+    """Marks the given listener function as safe to run alongside other concurrent listeners."""
+    setattr(func, "_listener_concurrent", True)
+    return func
+
+
 class Listener:
     event: str
     func: Union[ListenerFunc, ListenerFunc]
     plugin: Any
     priority: int
     filters: Optional[Filter]
+    concurrent: bool
 
     def __init__(
         self,
@@ -56,12 +63,15 @@ class Listener:
         plugin: Any,
         prio: int,
         listener_filter: Optional[Filter] = None,
+        *,
+        concurrent: bool = False,
     ) -> None:
         self.event = event
         self.func = func
         self.plugin = plugin
         self.priority = prio
         self.filters = listener_filter
+        self.concurrent = concurrent
 
     def __lt__(self, other: "Listener") -> bool:
         return self.priority < other.priority
@@ -17,8 +17,9 @@
 import inspect
 import logging
 import os.path
-from typing import TYPE_CHECKING, Any, ClassVar, Coroutine, Optional
+from typing import TYPE_CHECKING, Any, ClassVar, Coroutine, Mapping, Optional, Sequence
 
+from pymongo import IndexModel
 from typing_extensions import final
 
 from Riakmaw.util.tg import get_text
@@ -32,6 +33,9 @@ class Plugin:
     name: ClassVar[str] = "Unnamed"
     disabled: ClassVar[bool] = False
     helpable: ClassVar[bool] = False
+    # Indexes the plugin queries rely on, keyed by collection name.
+    # They are created when the bot starts.
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {}
 
     # Instance variables
     bot: "Riakmaw"
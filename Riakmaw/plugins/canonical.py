@@ -20,7 +20,6 @@ from datetime import datetime, timezone
 from typing import Any, ClassVar, MutableMapping
 
 from aiopath import AsyncPath
-from pymongo import UpdateOne
 from pymongo.errors import PyMongoError
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.enums.chat_members_filter import ChatMembersFilter
@@ -68,7 +67,7 @@ class Canonical(plugin.Plugin):
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("TEST")
-        self.db_analytics = self.bot.db.get_collection("ANALYTICS")
+        self.analytics_writes = self.bot.write_behind("ANALYTICS")
         self.chats_db = self.bot.db.get_collection("CHATS")
         self._api = WebServer(
             title="Riakmaw API Docs", description="API Documentation for Riakmaw Services"
@@ -89,28 +88,19 @@ class Canonical(plugin.Plugin):
             return "c"
         return self._mt.get(message.media, "t") if message.media else "t"
 
-    async def save_message_type(self, message: Message) -> None:
+    def save_message_type(self, message: Message) -> None:
         today = util.time.sec()
         timestamp = today - (today % 86400)  # truncate to day
+        message_type = self.get_type(message)
 
         # TODO: Remove old schema after analytics migration
-        await self.db_analytics.bulk_write(
-            [
-                UpdateOne(
-                    {"key": 2},
-                    {"$inc": {f"data.{str(timestamp)}.{self.get_type(message)}": 1}},
-                    upsert=True,
-                ),
-                UpdateOne(  # new schema
-                    {
-                        "timestamp": datetime.now(timezone.utc).replace(
-                            minute=0, second=0, microsecond=0
-                        )
-                    },
-                    {"$inc": {f"data.{self.get_type(message)}": 1}},
-                    upsert=True,
-                ),
-            ]
+        self.analytics_writes.update_one(
+            {"key": 2}, {"$inc": {f"data.{str(timestamp)}.{message_type}": 1}}, upsert=True
+        )
+        self.analytics_writes.update_one(  # new schema
+            {"timestamp": datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)},
+            {"$inc": {f"data.{message_type}": 1}},
+            upsert=True,
         )
 
     @command.filters(filters.admin_only & filters.group)
@@ -145,7 +135,7 @@ class Canonical(plugin.Plugin):
             return
 
         # Analytics
-        self.bot.loop.create_task(self.save_message_type(message))
+        self.save_message_type(message)
 
     async def on_chat_action(self, message: Message) -> None:
         """Delete admins data from chats"""
@@ -43,6 +43,92 @@ class Debug(plugin.Plugin):
 
         return f"Latency: {latency} ms"
 
+    @command.filters(filters.dev_only)
+    async def cmd_shards(self, ctx: command.Context) -> Optional[str]:
+        stats = self.bot.dispatch_stats()
+        if not stats:
+            return "Sharded dispatch is disabled, events are dispatched inline."
+
+        text = "<b>Dispatch shards</b>\n"
+        for stat in stats:
+            text += (
+                f"\n<b>#{stat['shard']}</b>: <code>{stat['depth']}/{stat['maxsize']}</code> queued, "
+                f"<code>{stat['processed']}</code> processed, "
+                f"lag <code>{stat['lag'] * 1000:.1f}</code> ms "
+                f"(max <code>{stat['max_lag'] * 1000:.1f}</code> ms)"
+            )
+
+        await ctx.respond(text, parse_mode=pyrogram.enums.parse_mode.ParseMode.HTML)
+        return None
+
+    @command.filters(filters.dev_only)
+    async def cmd_executors(self, ctx: command.Context) -> Optional[str]:
+        stats = util.async_helper.executor_stats()
+        if not stats:
+            return "No executor has been used yet."
+
+        text = "<b>Executors</b>\n"
+        for name, stat in stats.items():
+            text += (
+                f"\n<b>{name}</b>: <code>{stat['size']}</code> threads, "
+                f"<code>{stat['depth']}</code> queued, "
+                f"<code>{stat['completed']}</code> completed, "
+                f"wait <code>{stat['wait_avg'] * 1000:.1f}</code> ms "
+                f"(max <code>{stat['wait_max'] * 1000:.1f}</code> ms)"
+            )
+
+        await ctx.respond(text, parse_mode=pyrogram.enums.parse_mode.ParseMode.HTML)
+        return None
+
+    @command.filters(filters.dev_only)
+    async def cmd_dbcache(self, ctx: command.Context) -> Optional[str]:
+        if not self.bot.settings_caches:
+            return "No settings cache has been used yet."
+
+        text = "<b>Settings caches</b>\n"
+        for name, cache in self.bot.settings_caches.items():
+            stat = cache.stats()
+            text += (
+                f"\n<b>{name}</b>: <code>{stat['size']}</code> chats, "
+                f"hit ratio <code>{stat['hit_ratio'] * 100:.1f}%</code> "
+                f"(<code>{stat['hits']}</code>/<code>{stat['hits'] + stat['misses']}</code>), "
+                f"{'watching' if stat['watching'] else 'expiring'}"
+            )
+
+        await ctx.respond(text, parse_mode=pyrogram.enums.parse_mode.ParseMode.HTML)
+        return None
+
+    @command.filters(filters.dev_only)
+    async def cmd_httpstats(self, ctx: command.Context) -> Optional[str]:
+        stats = self.bot.http.stats()
+        if not stats:
+            return "No outbound requests yet."
+
+        lines = []
+        for host, stat in sorted(stats.items()):
+            lines.append(
+                f"{host}: {stat['requests']} requests, "
+                f"{stat['error_ratio'] * 100:.1f}% errors, {stat['retries']} retries, "
+                f"{stat['rejected']} rejected, latency {stat['latency'] * 1000:.0f}ms "
+                f"(max {stat['max_latency'] * 1000:.0f}ms), circuit {stat['circuit']}"
+            )
+
+        return "\n".join(lines)
+
+    @command.filters(filters.dev_only)
+    async def cmd_shieldcache(self, ctx: command.Context) -> Optional[str]:
+        shield = self.bot.plugins.get("SpamShield")
+        if not shield:
+            return "SpamShield isn't loaded."
+
+        stat = shield.verdicts.stats()  # type: ignore
+        return (
+            f"SpamShield verdicts: {stat['size']} cached, "
+            f"hit ratio {stat['hit_ratio'] * 100:.1f}% "
+            f"({stat['hits']} hits, {stat['coalesced']} coalesced, {stat['misses']} misses, "
+            f"{stat['evictions']} evicted)"
+        )
+
     @command.filters(filters.dev_only)
     async def cmd_eval(self, ctx: command.Context) -> Optional[str]:
         code = ctx.input
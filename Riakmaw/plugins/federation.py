@@ -15,28 +15,38 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
+import csv
+import io
 from datetime import datetime
 from typing import (
     Any,
     AsyncIterator,
+    Callable,
+    ClassVar,
     Dict,
     List,
     Mapping,
     MutableMapping,
     Optional,
+    Sequence,
+    Set,
+    Tuple,
     Union,
 )
 from uuid import uuid4
 
-from aiopath import AsyncPath
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import PyMongoError
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.enums.chat_type import ChatType
 from pyrogram.errors import (
     BadRequest,
     ChannelPrivate,
     ChatAdminRequired,
+    FloodWait,
     Forbidden,
     PeerIdInvalid,
+    RPCError,
     UserAdminInvalid,
 )
 from pyrogram.types import (
@@ -51,16 +61,165 @@ from pyrogram.types import (
 
 from Riakmaw import command, filters, listener, plugin, util
 
+# Federations that still keep their bans inside the federation document
+LEGACY_BANS = {"$or": [{"banned": {"$exists": True}}, {"banned_chat": {"$exists": True}}]}
+# Concurrent bans of a propagation, all of them share the rate below
+PROPAGATION_WORKERS = 8
+PROPAGATION_RATE = 20
+# Bulk writes of a fedrestore running at the same time
+RESTORE_CONCURRENCY = 4
+# Seconds between progress saves and status edits of a propagation
+PROGRESS_INTERVAL = 5
+# Change events after which a stream stops
+STREAM_RESETS = frozenset({"drop", "rename", "dropDatabase", "invalidate"})
+
 
 class Federation(plugin.Plugin):
-    name = "Federations"
-    helpable = True
+    name: ClassVar[str] = "Federations"
+    helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {
+        "FEDERATIONS": [
+            IndexModel("chats"),
+            IndexModel("owner"),
+            IndexModel("admins"),
+            IndexModel("subscribers"),
+        ],
+        "FED_BANS": [
+            IndexModel([("fed_id", ASCENDING), ("target_id", ASCENDING)], unique=True),
+            IndexModel([("type", ASCENDING), ("fed_id", ASCENDING)]),
+            IndexModel("target_id"),
+        ],
+    }
 
     db: util.db.AsyncCollection
+    bans_db: util.db.AsyncCollection
+    chat_settings: util.db.SettingsCache
+    jobs_db: util.db.AsyncCollection
+    ban_index: util.fed_index.FedBanIndex
+    index_ready: bool
+    throttle: util.rate_limiter.Throttle
+    _index_task: Optional[asyncio.Task[None]]
+    _jobs: Set[asyncio.Task[None]]
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("FEDERATIONS")
-        self.chat_db = self.bot.db.get_collection("CHATS")
+        self.bans_db = self.bot.db.get_collection("FED_BANS")
+        self.jobs_db = self.bot.db.get_collection("FED_PROPAGATIONS")
+        self.chat_settings = self.bot.settings_cache("CHATS", fields=("action_topic",))
+        self.ban_index = util.fed_index.FedBanIndex()
+        self.index_ready = False
+        self._index_task = None
+        self.throttle = util.rate_limiter.Throttle(PROPAGATION_RATE, burst=PROPAGATION_WORKERS)
+        self._jobs = set()
+
+        if await self.db.find_one(LEGACY_BANS, {"_id": 1}):
+            self.log.warning("Some federation bans aren't migrated yet, run /fbanmigrate")
+
+    async def on_start(self, _: int) -> None:
+        self._index_task = self.bot.loop.create_task(self._maintain_index())
+
+        # Propagations interrupted by the last stop
+        async for job in self.jobs_db.find({}):
+            self.log.info(f"Resuming federation {job['action']} of {job['target_id']}")
+            self._start_job(job)
+
+    async def on_stop(self) -> None:
+        if self._index_task is not None:
+            self._index_task.cancel()
+        for task in self._jobs:
+            task.cancel()
+
+    async def _load_index(self) -> None:
+        self.ban_index.clear()
+        async for fed in self.db.find({}, {"name": 1, "chats": 1, "subscribers": 1}).read_ahead():
+            self._index_federation(fed)
+
+        fid, targets = None, []
+        async for ban in self.bans_db.find(
+            {}, {"_id": 0, "fed_id": 1, "target_id": 1}, sort=[("fed_id", ASCENDING)]
+        ).read_ahead():
+            if ban["fed_id"] != fid:
+                if fid is not None:
+                    self.ban_index.load_bans(fid, targets)
+                fid, targets = ban["fed_id"], []
+            targets.append(ban["target_id"])
+        if fid is not None:
+            self.ban_index.load_bans(fid, targets)
+
+    def _index_federation(self, fed: Mapping[str, Any]) -> None:
+        self.ban_index.set_federation(
+            fed["_id"], fed.get("name", ""), fed.get("chats", []), fed.get("subscribers", [])
+        )
+
+    def _on_fed_change(self, change: Mapping[str, Any]) -> None:
+        fid = change.get("documentKey", {}).get("_id")
+        fed = change.get("fullDocument")
+        if fed:
+            self._index_federation(fed)
+        elif fid is not None and self.ban_index.name(fid) is not None:
+            # Deleted, or gone before the update could be looked up
+            self.ban_index.remove_federation(fid)
+
+    def _on_ban_change(self, change: Mapping[str, Any]) -> None:
+        # Deletes only carry the _id, removed bans are dropped once they are hit instead
+        ban = change.get("fullDocument")
+        if ban:
+            self.ban_index.add_ban(ban["fed_id"], ban["target_id"])
+
+    @staticmethod
+    async def _follow(
+        stream: AsyncIterator[Mapping[str, Any]], handler: Callable[[Mapping[str, Any]], None]
+    ) -> None:
+        async for change in stream:
+            if change["operationType"] in STREAM_RESETS:
+                # The server closes the stream after these, the index has to be rebuilt
+                return
+
+            handler(change)
+
+    async def _maintain_index(self) -> None:
+        """Build the ban index and keep it in sync with the database"""
+        failures = 0
+        while True:
+            try:
+                # Streams are opened first so nothing written while loading is missed
+                async with self.db.watch(full_document="updateLookup") as feds, self.bans_db.watch(
+                    [{"$match": {"operationType": {"$ne": "delete"}}}]
+                ) as bans:
+                    await self._load_index()
+                    self.index_ready = True
+                    failures = 0
+                    self.log.info("Federation ban index loaded with %d bans", len(self.ban_index))
+                    tasks = {
+                        self.bot.loop.create_task(self._follow(feds, self._on_fed_change)),
+                        self.bot.loop.create_task(self._follow(bans, self._on_ban_change)),
+                    }
+                    try:
+                        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+
+                    for task in done:
+                        task.result()
+            except PyMongoError as e:
+                self.index_ready = False
+                if util.db.change_stream_unsupported(e):
+                    self.log.warning(
+                        "Can't watch federations, checking bans on the database: %s", e
+                    )
+                    return
+
+                delay = util.db.change_stream_backoff(failures)
+                failures += 1
+                self.log.warning(
+                    "Lost the federation streams, rebuilding the ban index in %.0f seconds: %s",
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
+            finally:
+                self.index_ready = False
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
@@ -136,7 +295,9 @@ class Federation(plugin.Plugin):
                     await self.text(chat.id, "fed-delete-canceled")
                 )
 
-            data = await self.db.find_one_and_delete({"_id": arg})
+            data, _ = await asyncio.gather(
+                self.db.find_one_and_delete({"_id": arg}), self.bans_db.delete_many({"fed_id": arg})
+            )
             await query.message.edit_text(await self.text(chat.id, "fed-delete-done", data["name"]))
         elif cmd == "log":
             owner_id, fid = arg.split("_")
@@ -169,7 +330,7 @@ class Federation(plugin.Plugin):
             await self.fban_handler(chat, target, banned)
 
     async def get_action_topic(self, chat_id: int) -> Optional[int]:
-        data = await self.chat_db.find_one({"chat_id": chat_id}, {"action_topic": 1})
+        data = await self.chat_settings.get(chat_id)
         return data.get("action_topic") if data else None
 
     @staticmethod
@@ -195,9 +356,7 @@ class Federation(plugin.Plugin):
 
     async def _get_fed_subs_data(self, fid: str) -> AsyncIterator[Mapping[str, Any]]:
         """Get federation that subcribe current federation"""
-        async for i in self.db.find(
-            {"subscribers": fid}, {"_id": 1, "name": 1, "banned": 1, "banned_chat": 1}
-        ):
+        async for i in self.db.find({"subscribers": fid}, {"_id": 1, "name": 1}):
             yield i
 
     async def fban_user(
@@ -209,15 +368,12 @@ class Federation(plugin.Plugin):
         reason: Optional[str] = None,
     ) -> None:
         """Fban a user"""
-        await self.db.update_one(
-            {"_id": fid},
-            {
-                "$set": {
-                    f"banned.{user}": {"name": fullname, "reason": reason, "time": datetime.now()}
-                }
-            },
+        await self.bans_db.update_one(
+            {"fed_id": fid, "target_id": user},
+            {"$set": {"type": "user", "name": fullname, "reason": reason, "time": datetime.now()}},
             upsert=True,
         )
+        self.ban_index.add_ban(fid, user)
 
     async def fban_chat(
         self,
@@ -228,93 +384,124 @@ class Federation(plugin.Plugin):
         reason: Optional[str] = None,
     ) -> None:
         """Fban a channel"""
-        await self.db.update_one(
-            {"_id": fid},
-            {
-                "$set": {
-                    f"banned_chat.{chat}": {
-                        "title": title,
-                        "reason": reason,
-                        "time": datetime.now(),
-                    }
-                }
-            },
+        await self.bans_db.update_one(
+            {"fed_id": fid, "target_id": chat},
+            {"$set": {"type": "chat", "title": title, "reason": reason, "time": datetime.now()}},
+            upsert=True,
         )
+        self.ban_index.add_ban(fid, chat)
 
     async def unfban_user(self, fid: str, user: int) -> None:
         """Remove banned user"""
-        await self.db.update_one({"_id": fid}, {"$unset": {f"banned.{user}": None}}, upsert=True)
+        await self.bans_db.delete_one({"fed_id": fid, "target_id": user})
+        self.ban_index.remove_ban(fid, user)
 
     async def unfban_chat(self, fid: str, chat: int) -> None:
         """Remove banned chat"""
-        await self.db.update_one(
-            {"_id": fid}, {"$unset": {f"banned_chat.{chat}": None}}, upsert=True
+        await self.bans_db.delete_one({"fed_id": fid, "target_id": chat})
+        self.ban_index.remove_ban(fid, chat)
+
+    async def get_fban(self, fid: str, target: int) -> Optional[MutableMapping[str, Any]]:
+        """Get a ban of user or channel in a federation"""
+        return await self.bans_db.find_one({"fed_id": fid, "target_id": target})
+
+    async def count_fban(self, fid: str) -> Tuple[int, int]:
+        """Count banned users and channels of a federation"""
+        return await asyncio.gather(
+            self.bans_db.count_documents({"type": "user", "fed_id": fid}),
+            self.bans_db.count_documents({"type": "chat", "fed_id": fid}),
         )
 
-    async def check_fban(self, target: int) -> util.db.AsyncCursor:
-        """Check user banned list"""
-        return self.db.find(
-            {
-                "$or": [
-                    {f"banned.{target}": {"$exists": True}},
-                    {f"banned_chat.{target}": {"$exists": True}},
-                ]
-            },
-            {
-                "_id": 1,
-                "name": 1,
-                f"banned.{target}": 1,
-                f"banned_chat.{target}": 1,
-            },
-        )
+    async def check_fban(self, target: int) -> List[MutableMapping[str, Any]]:
+        """Check user banned list, each ban carries the federation name"""
+        bans = await self.bans_db.find({"target_id": target}).to_list()
+        if not bans:
+            return bans
+
+        names = {
+            fed["_id"]: fed["name"]
+            async for fed in self.db.find(
+                {"_id": {"$in": [ban["fed_id"] for ban in bans]}}, {"name": 1}
+            )
+        }
+        for ban in bans:
+            ban["fed_name"] = names.get(ban["fed_id"], ban["fed_id"])
+
+        return bans
 
     async def is_fbanned(self, chat: int, target: int) -> Optional[MutableMapping[str, Any]]:
-        def check(target: int, data: Mapping[str, Any]) -> Optional[MutableMapping[str, Any]]:
-            """Scoped check to verify if user is banned"""
-            if str(target) in data.get("banned", {}):
-                user_data = data["banned"][str(target)]
-                user_data["fed_name"] = data["name"]
-                user_data["type"] = "user"
-                return user_data
-
-            if str(target) in data.get("banned_chat", {}):
-                channel_data = data["banned_chat"][str(target)]
-                channel_data["fed_name"] = data["name"]
-                channel_data["type"] = "chat"
-                return channel_data
-
-        data = await self.db.find_one(
-            {
-                "chats": chat,
-                "$or": [
-                    {f"banned.{target}": {"$exists": True}},
-                    {f"banned_chat.{target}": {"$exists": True}},
-                ],
-            },
-            {
-                f"banned.{target}": 1,
-                f"banned_chat.{target}": 1,
-                "name": 1,
-            },
-        )
-        if data:
-            res = check(target, data)
-            if res:
-                return res
+        if not self.index_ready:
+            return await self._query_fbanned(chat, target)
 
-        # Check if user is banned in subcribed federation
-        fid = await self.get_fed_bychat(chat)
-        if not fid:
+        # Most targets aren't banned anywhere, that is answered without the database
+        while (fid := self.ban_index.lookup(chat, target)) is not None:
+            ban = await self.get_fban(fid, target)
+            if not ban:  # Unbanned by an other instance
+                self.ban_index.remove_ban(fid, target)
+                continue
+
+            ban["fed_name"] = self.ban_index.name(fid)
+            if fid != self.ban_index.federation(chat):
+                ban["subfed"] = True
+
+            return ban
+
+        return None
+
+    async def _query_fbanned(self, chat: int, target: int) -> Optional[MutableMapping[str, Any]]:
+        fed = await self.db.find_one({"chats": chat}, {"_id": 1, "name": 1})
+        if not fed:
             return None
 
-        subscribe = [res async for res in self._get_fed_subs_data(fid["_id"])]
-        if not subscribe:
+        # Bans of the subscribed federations are applied too, walked in the ban index order
+        names = {fed["_id"]: fed["name"]}
+        order = [fed["_id"]]
+        for current in order:
+            followed = [sub async for sub in self._get_fed_subs_data(current)]
+            for sub in sorted(followed, key=lambda sub: sub["_id"]):
+                if sub["_id"] not in names:
+                    names[sub["_id"]] = sub.get("name", "")
+                    order.append(sub["_id"])
+
+        bans = await self.bans_db.find({"fed_id": {"$in": order}, "target_id": target}).to_list()
+        if not bans:
             return None
-        for i in subscribe:
-            res = check(target, i)
-            if res:
-                res["subfed"] = True
-                return res
+
+        # The chat federation own ban goes first, then the closest subscribed one
+        ban = min(bans, key=lambda ban: order.index(ban["fed_id"]))
+        ban["fed_name"] = names[ban["fed_id"]]
+        if ban["fed_id"] != fed["_id"]:
+            ban["subfed"] = True
+
+        return ban
+
+    async def migrate_fban(self, chunk_size: int = 1000) -> Tuple[int, int]:
+        """Move the bans stored on federation documents into FED_BANS.
+
+        Bans that already exist in FED_BANS are kept, so it's safe to run
+        while the bot is serving and to run it again after an interruption.
+        """
+        feds = bans = 0
+        async for fed in self.db.find(LEGACY_BANS, {"banned": 1, "banned_chat": 1}):
+            requests = [
+                UpdateOne(
+                    {"fed_id": fed["_id"], "target_id": int(target)},
+                    {"$setOnInsert": {**data, "type": ban_type}},
+                    upsert=True,
+                )
+                for ban_type, field in (("user", "banned"), ("chat", "banned_chat"))
+                for target, data in fed.get(field, {}).items()
+            ]
+            for index in range(0, len(requests), chunk_size):
+                await self.bans_db.bulk_write(requests[index : index + chunk_size], ordered=False)
+
+            await self.db.update_one(
+                {"_id": fed["_id"]}, {"$unset": {"banned": None, "banned_chat": None}}
+            )
+            feds += 1
+            bans += len(requests)
+
+        return feds, bans
 
     async def fban_handler(
         self, chat: Chat, user: Union[User, Chat], data: MutableMapping[str, Any]
@@ -557,7 +744,9 @@ class Federation(plugin.Plugin):
         else:
             return await self.text(chat.id, "fed-specified-id")
 
-        owner = await self.bot.client.get_users(data["owner"])
+        owner, (banned, banned_chat) = await asyncio.gather(
+            self.bot.get_users(data["owner"]), self.count_fban(data["_id"])
+        )
         if isinstance(owner, List):
             owner = owner[0]
 
@@ -568,8 +757,8 @@ class Federation(plugin.Plugin):
             data["name"],
             owner.mention,
             len(data.get("admins", [])),
-            len(data.get("banned", [])),
-            len(data.get("banned_chat", [])),
+            banned,
+            banned_chat,
             len(data.get("chats", [])),
             len(data.get("subscribers", [])),
         )
@@ -596,7 +785,7 @@ class Federation(plugin.Plugin):
         if not self.is_fed_admin(data, user.id):
             return await self.text(chat.id, "fed-admin-only")
 
-        owner = await self.bot.client.get_users(data["owner"])
+        owner = await self.bot.get_users(data["owner"])
         if isinstance(owner, List):
             owner = owner[0]
 
@@ -609,7 +798,7 @@ class Federation(plugin.Plugin):
 
             for uid in admins:
                 try:
-                    admin = await self.bot.client.get_users(uid)
+                    admin = await self.bot.get_users(uid)
                 except PeerIdInvalid:
                     text += f"[{uid}](tg://user?id={uid})\n"
                     continue
@@ -628,14 +817,12 @@ class Federation(plugin.Plugin):
         reason: str,
         fed_data: Mapping[str, Any],
     ) -> str:
-        update = False
-        if str(target.id) in fed_data.get("banned", {}).keys():
-            update = True
+        existing = await self.get_fban(fed_data["_id"], target.id)
 
         fullname = target.first_name + target.last_name if target.last_name else target.first_name
         await self.fban_user(fed_data["_id"], target.id, fullname=fullname, reason=reason)
 
-        if update:
+        if existing:
             return await self.text(
                 chat.id,
                 "fed-ban-info-update",
@@ -643,7 +830,7 @@ class Federation(plugin.Plugin):
                 banner.mention,
                 target.mention,
                 target.id,
-                fed_data["banned"][str(target.id)]["reason"],
+                existing["reason"],
                 reason,
             )
         return await self.text(
@@ -664,13 +851,11 @@ class Federation(plugin.Plugin):
         reason: str,
         fed_data: Mapping[str, Any],
     ) -> str:
-        update = False
-        if str(target.id) in fed_data.get("banned_chat", {}).keys():
-            update = True
+        existing = await self.get_fban(fed_data["_id"], target.id)
 
         await self.fban_chat(fed_data["_id"], target.id, title=target.title, reason=reason)
 
-        if update:
+        if existing:
             return await self.text(
                 chat.id,
                 "fed-ban-chat-info-update",
@@ -678,7 +863,7 @@ class Federation(plugin.Plugin):
                 banner.mention,
                 target.title,
                 target.id,
-                fed_data["banned_chat"][str(target.id)]["reason"],
+                existing["reason"],
                 reason,
             )
         return await self.text(
@@ -691,33 +876,181 @@ class Federation(plugin.Plugin):
             reason,
         )
 
-    async def _propagate_fban(
-        self,
-        target: Union[User, Chat],
-        chats: List[int],
-        host_fed: str,
-        sub_fed: Optional[str] = None,
-    ) -> Mapping[int, str]:
-        """Propagate fban to each chat in the list"""
-        failed = {}
-        for chat in chats:
-            try:
-                await self.bot.client.ban_chat_member(chat, target.id)
-            except BadRequest as br:
-                self.log.warning(
-                    f"Failed to send fban on subfed {sub_fed} of {host_fed} at {chat} due to {br.MESSAGE}"
-                    if sub_fed
-                    else f"Failed to fban {target.username} on {chat} due to {br.MESSAGE}"
+    async def _collect_chats(self, data: Mapping[str, Any]) -> List[int]:
+        """Chats of the federation and of every federation subscribed to it, each chat once"""
+        chats = dict.fromkeys(data.get("chats", []))
+        seen = {data["_id"]}
+        subscribers = set(data.get("subscribers", [])) - seen
+        while subscribers:
+            seen |= subscribers
+            following: Set[str] = set()
+            async for fed in self.db.find(
+                {"_id": {"$in": list(subscribers)}}, {"chats": 1, "subscribers": 1}
+            ):
+                chats.update(dict.fromkeys(fed.get("chats", [])))
+                following.update(fed.get("subscribers", []))
+
+            subscribers = following - seen
+
+        return list(chats)
+
+    async def _propagate(
+        self, action: str, data: Mapping[str, Any], target: int, status: Message
+    ) -> None:
+        """Start banning or unbanning the target over the federation in the background"""
+        job: MutableMapping[str, Any] = {
+            "_id": str(uuid4()),
+            "action": action,
+            "fed_id": data["_id"],
+            "fed_name": data["name"],
+            "target_id": target,
+            "pending": await self._collect_chats(data),
+            "failed": {},
+            "kept": [],
+            "status": [status.chat.id, status.id],
+            "log": data.get("log"),
+        }
+        job["total"] = len(job["pending"])
+        await self.jobs_db.insert_one(job)
+        self._start_job(job)
+
+    def _start_job(self, job: MutableMapping[str, Any]) -> None:
+        task = self.bot.loop.create_task(self._finish_job(job))
+        self._jobs.add(task)
+        task.add_done_callback(self._jobs.discard)
+
+    async def _finish_job(self, job: MutableMapping[str, Any]) -> None:
+        try:
+            failed, left = await self._run_job(job)
+        except PyMongoError as e:
+            # The job document stays, it is resumed on the next start
+            self.log.error(f"Federation {job['action']} of {job['target_id']} failed: {e}")
+            return
+
+        await self._report(
+            job,
+            f"Federation {job['action']} of {job['target_id']} in {job['fed_name']} "
+            f"finished, failed on {len(failed)} chats.",
+        )
+        if not left:
+            return
+
+        text = ""
+        for chat in left:
+            text += f"failed to fban on chat {chat} caused by {failed[chat]}\n\n"
+        text += f"**Those chat has leaved the federation {job['fed_name']}!**"
+
+        chat_id, message_id = job["status"]
+        try:
+            await self.bot.client.send_message(chat_id, text, reply_to_message_id=message_id)
+            if job.get("log"):
+                await self.bot.client.send_message(job["log"], text)
+        except RPCError as e:
+            self.log.warning(f"Can't report the failed chats of the federation ban: {e}")
+
+    async def _run_job(self, job: MutableMapping[str, Any]) -> Tuple[Dict[int, str], List[int]]:
+        """Run the job on its pending chats, the progress is saved as it goes
+        so the job is resumed on start if the bot stopped before it finished.
+
+        Returns the failed chats and the chats that left the federation because of it."""
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for chat in job["pending"]:
+            queue.put_nowait(chat)
+
+        # Keys are kept as string to be stored in the job document
+        failed: Dict[str, str] = dict(job["failed"])
+        # Chats that failed for a reason other than the bot rights, they stay in the federation
+        kept: List[str] = list(job.get("kept", []))
+        done: List[int] = []
+
+        async def worker() -> None:
+            while not queue.empty():
+                chat = queue.get_nowait()
+                error = await self._apply(job["action"], chat, job["target_id"])
+                if error:
+                    message, permanent = error
+                    failed[str(chat)] = message
+                    if not permanent:
+                        kept.append(str(chat))
+                done.append(chat)
+
+        processed = job["total"] - len(job["pending"])
+        tasks = [
+            self.bot.loop.create_task(worker())
+            for _ in range(min(PROPAGATION_WORKERS, queue.qsize()))
+        ]
+        running = set(tasks)
+        try:
+            while running:
+                _, running = await asyncio.wait(running, timeout=PROGRESS_INTERVAL)
+                finished = done.copy()
+                done.clear()
+                processed += len(finished)
+                await self.jobs_db.update_one(
+                    {"_id": job["_id"]},
+                    {"$pullAll": {"pending": finished}, "$set": {"failed": failed, "kept": kept}},
                 )
-                failed[chat] = br.MESSAGE
-            except (Forbidden, ChannelPrivate) as err:
-                self.log.warning(
-                    f"Can't fban on subfed {sub_fed} of {host_fed} at {chat} caused by {err.MESSAGE}"
-                    if sub_fed
-                    else f"Can't fban {target.username} on {chat} caused by {err.MESSAGE}"
+                await self._report(
+                    job,
+                    f"{'Banning' if job['action'] == 'ban' else 'Unbanning'} {job['target_id']}"
+                    f" in federation {job['fed_name']}: {processed}/{job['total']} chats",
                 )
-                failed[chat] = err.MESSAGE
-        return failed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        for task in tasks:
+            task.result()
+
+        left: List[int] = []
+        removed = [int(chat) for chat in failed if chat not in kept]
+        if job["action"] == "ban" and removed:
+            # The bot can't act on those chats anymore, remove them from the federation.
+            # Only the federation own chats are removed, subscriber failures are just logged
+            fed = await self.db.find_one_and_update(
+                {"_id": job["fed_id"]},
+                {"$pull": {"chats": {"$in": removed}}},
+                projection={"chats": 1},
+            )
+            if fed:
+                left = [chat for chat in removed if chat in fed.get("chats", [])]
+
+        await self.jobs_db.delete_one({"_id": job["_id"]})
+        return {int(chat): error for chat, error in failed.items()}, left
+
+    async def _apply(self, action: str, chat: int, target: int) -> Optional[Tuple[str, bool]]:
+        """Ban or unban the target in a chat.
+
+        Returns the error message when it failed, with whether the bot can't act on the chat
+        anymore (rather than a failure of this call only)."""
+        while True:
+            await self.throttle.acquire()
+            try:
+                if action == "ban":
+                    await self.bot.client.ban_chat_member(chat, target)
+                else:
+                    await self.bot.client.unban_chat_member(chat, target)
+
+                return None
+            except FloodWait as flood:
+                # Every worker shares the throttle, so all of them wait the flood out
+                self.throttle.pause(flood.value)  # type: ignore
+            except (BadRequest, Forbidden, ChannelPrivate) as err:
+                self.log.warning(f"Failed to {action} {target} on {chat} due to {err.MESSAGE}")
+                return err.MESSAGE, True
+            except (RPCError, OSError, asyncio.TimeoutError) as err:
+                self.log.warning(f"Failed to {action} {target} on {chat} due to {err!r}")
+                return str(err) or type(err).__name__, False
+
+    async def _report(self, job: Mapping[str, Any], text: str) -> None:
+        chat_id, message_id = job["status"]
+        try:
+            await self.bot.client.edit_message_text(chat_id, message_id, text)
+        except BadRequest:  # Message not modified or deleted
+            pass
+        except RPCError as e:
+            # Progress is best effort, the job goes on without it
+            self.log.warning(f"Can't edit the federation job status: {e}")
 
     async def cmd_fban(
         self, ctx: command.Context, target: Union[User, Chat, None] = None, *, reason: str = ""
@@ -770,56 +1103,22 @@ class Federation(plugin.Plugin):
         else:
             return await self.text(chat.id, "err-peer-invalid")
 
-        await ctx.respond(f"Starting a federation ban for {target.id} in federation {data['name']}")
-        failed = await self._propagate_fban(target, data["chats"], data["_id"])
-
-        text = ""
-        if failed:
-            for key, err_msg in failed.items():
-                text += f"failed to fban on chat {key} caused by {err_msg}\n\n"
-                # Remove the chat federation
-                await self.db.update_one({"_id": data["_id"]}, {"$pull": {"chats": chat}})
-            text += f"**Those chat has leaved the federation {data['name']}!**"
-            await ctx.respond(text, mode="reply", reference=ctx.response)
-
-        if data.get("subscribers", []):
-            for fed_id in data["subscribers"]:
-                subs_data = await self.get_fed(fed_id)
-                if not subs_data:
-                    continue
-                await self._propagate_fban(
-                    target, subs_data.get("chats", []), data["_id"], subs_data["_id"]
-                )
-
         await ctx.respond(string)
-
         # send message to federation log
         if log := data.get("log"):
             await self.bot.client.send_message(log, string, disable_web_page_preview=True)
-            if failed:
-                await self.bot.client.send_message(log, text)
 
+        status = await ctx.respond(
+            f"Starting a federation ban for {target.id} in federation {data['name']}",
+            mode="reply",
+            reference=ctx.response,
+        )
+        await self._propagate("ban", data, target.id, status)  # type: ignore
         return None
 
-    async def _propagate_unfban(
-        self,
-        target: Union[User, Chat],
-        chats: List[int],
-        host_fed: str,
-        sub_fed: Optional[str] = None,
-    ) -> None:
-        for chat in chats:
-            try:
-                await self.bot.client.unban_chat_member(chat, target.id)
-                await asyncio.sleep(0.5)
-            except (BadRequest, Forbidden, ChannelPrivate) as err:
-                self.log.warning(
-                    f"Failed to unfban on subfed {sub_fed} of {host_fed} due to {err.MESSAGE}"
-                    if sub_fed
-                    else f"Failed to unfban on {host_fed} due to {err.MESSAGE}"
-                )
-
-    async def cmd_unfban(self, ctx: command.Context, target: Union[User, Chat, None] = None) -> str:
+    async def cmd_unfban(
+        self, ctx: command.Context, target: Union[User, Chat, None] = None
+    ) -> Optional[str]:
         """Unban a user on federation"""
         chat = ctx.chat
         if chat.type == ChatType.PRIVATE:
@@ -844,9 +1143,7 @@ class Federation(plugin.Plugin):
                 return await self.text(chat.id, "fed-no-ban-user")
             target = reply_msg.from_user or reply_msg.sender_chat
 
-        if (str(target.id) not in (data.get("banned", {}).keys())) and (
-            str(target.id) not in (data.get("banned_chat", {}).keys())
-        ):
+        if not await self.get_fban(data["_id"], target.id):
             return await self.text(chat.id, "fed-user-not-banned")
 
         if isinstance(target, User):
@@ -872,23 +1169,17 @@ class Federation(plugin.Plugin):
         else:
             return ""
 
-        await ctx.respond(f"Removing federation ban for {target.id} in federation {data['name']}")
-        await self._propagate_unfban(target, data["chats"], data["_id"])
-
-        if data.get("subscribers", []):
-            for fed_id in data["subscribers"]:
-                subs_data = await self.get_fed(fed_id)
-                if not subs_data:
-                    continue
-
-                await self._propagate_unfban(
-                    target, subs_data.get("chats", []), data["_id"], subs_data["_id"]
-                )
-
+        await ctx.respond(text)
         if log := data.get("log"):
             await self.bot.client.send_message(log, text, disable_web_page_preview=True)
 
-        return text
+        status = await ctx.respond(
+            f"Removing federation ban for {target.id} in federation {data['name']}",
+            mode="reply",
+            reference=ctx.response,
+        )
+        await self._propagate("unban", data, target.id, status)  # type: ignore
+        return None
 
     @command.filters(aliases=["fstats", "fedstats"])
     async def cmd_fbanstats(self, ctx: command.Context) -> str:
@@ -900,30 +1191,14 @@ class Federation(plugin.Plugin):
             except (TypeError, ValueError):
                 return await self.text(chat.id, "fed-invalid-user-id")
 
-            data = await self.get_fed(ctx.args[1])
+            data, res = await asyncio.gather(
+                self.get_fed(ctx.args[1]), self.get_fban(ctx.args[1], user_id)
+            )
             if data:
-                if str(user_id) in data.get("banned", {}):
-                    res = data["banned"][str(user_id)]
+                if res:
                     return await self.text(
                         chat.id,
-                        "fed-stat-banned",
-                        res["reason"],
-                        res["time"].strftime("%Y %b %d %H:%M UTC"),
-                    )
-                if str(user_id) in data.get("banned_chat", {}):
-                    res = data["banned_chat"][str(user_id)]
-                    return await self.text(
-                        chat.id,
-                        "fed-stat-banned-chat",
-                        res["reason"],
-                        res["time"].strftime("%Y %b %d %H:%M UTC"),
-                    )
-
-                if str(user_id) in data.get("banned_chat", {}):
-                    res = data["banned_chat"][str(user_id)]
-                    return await self.text(
-                        chat.id,
-                        "fed-stat-banned-chat",
+                        "fed-stat-banned" if res["type"] == "user" else "fed-stat-banned-chat",
                         res["reason"],
                         res["time"].strftime("%Y %b %d %H:%M UTC"),
                     )
@@ -935,7 +1210,7 @@ class Federation(plugin.Plugin):
         if len(ctx.args) == 1:  # <user_id>
             try:
                 user_id = int(ctx.args[0])
-                user = await self.bot.client.get_users(user_id)
+                user = await self.bot.get_users(user_id)
                 if isinstance(user, List):
                     user = user[0]
                 if not user:
@@ -954,19 +1229,16 @@ class Federation(plugin.Plugin):
         if not user:
             return ""
 
-        cursor = await self.check_fban(user_id)
-        fed_list = await cursor.to_list()
+        fed_list = await self.check_fban(user_id)
         if fed_list:
             text = await self.text(chat.id, "fed-stat-multi")
             for bans in fed_list:
                 text += "\n" + await self.text(
                     chat.id,
                     "fed-stat-multi-info",
-                    bans["name"],
-                    bans["_id"],
-                    bans["banned_chat" if bans.get("banned_chat") else "banned"][str(user.id)][
-                        "reason"
-                    ],
+                    bans["fed_name"],
+                    bans["fed_id"],
+                    bans["reason"],
                 )
         else:
             text = await self.text(chat.id, "fed-stat-multi-not-banned")
@@ -983,25 +1255,50 @@ class Federation(plugin.Plugin):
         if not data:
             return await self.text(chat.id, "user-no-feds")
 
-        try:
-            banned = data["banned"]
-        except KeyError:
+        query = {"type": "user", "fed_id": data["_id"]}
+        if not await self.bans_db.find_one(query, {"_id": 1}):
             return await self.text(chat.id, "fed-backup-empty")
 
-        file = AsyncPath(self.bot.config.DOWNLOAD_PATH + data["name"] + ".csv")
+        file = io.BytesIO()
+        file.name = data["name"] + ".csv"
+        text = io.TextIOWrapper(file, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text)
+        async for ban in self.bans_db.find(
+            query, {"_id": 0, "target_id": 1, "name": 1, "reason": 1, "time": 1}
+        ).read_ahead():
+            writer.writerow((ban["target_id"], ban["name"], ban["reason"], ban["time"]))
 
-        await file.touch()
-        async with file.open("w") as f:
-            for banned_user in banned:
-                ban_data = banned[banned_user]
-                await f.write(
-                    f"{banned_user},{ban_data['name']},{ban_data['reason']},{ban_data['time']}\n"
-                )
+        # Closing the wrapper would close the buffer before the upload
+        text.detach()
 
-        await ctx.respond(document=str(file))
-        await file.unlink()
+        file.seek(0)
+        await ctx.respond(document=file)
         return None
 
+    @staticmethod
+    def _parse_backup_row(fid: str, row: List[str]) -> Optional[UpdateOne]:
+        """Build the ban write of a backup line, returns None for invalid lines"""
+        try:
+            target = int(row[0])
+        except (IndexError, ValueError):
+            return None
+
+        name, reason, stamp = (row + ["", "", ""])[1:4]
+        try:
+            banned_at = datetime.fromisoformat(stamp) if stamp else datetime.now()
+        except ValueError:
+            banned_at = datetime.now()
+
+        return UpdateOne(
+            {"fed_id": fid, "target_id": target},
+            {"$set": {"type": "user", "name": name, "reason": reason, "time": banned_at}},
+            upsert=True,
+        )
+
+    async def _restore_chunk(self, requests: List[UpdateOne]) -> int:
+        await self.bans_db.bulk_write(requests, ordered=False)
+        return len(requests)
+
     @command.filters(filters.private)
     async def cmd_fedrestore(self, ctx: command.Context) -> Optional[str]:
         """Restore a backup bans"""
@@ -1015,21 +1312,49 @@ class Federation(plugin.Plugin):
         if not data:
             return await self.text(chat.id, "user-no-feds")
 
-        file = AsyncPath(await reply_msg.download(self.bot.config.DOWNLOAD_PATH))
+        file: io.BytesIO = await reply_msg.download(in_memory=True)  # type: ignore
+        file.seek(0)
+        rows = csv.reader(io.TextIOWrapper(file, encoding="utf-8", errors="replace", newline=""))
 
-        fid = data["_id"]
-        tasks = []  # type: List[asyncio.Task[None]]
-        async with file.open("r") as f:
-            line: str
-            async for line in f:  # type: ignore
-                d = line.split(",")
-                task = self.bot.loop.create_task(
-                    self.fban_user(fid, int(d[0]), fullname=d[1], reason=d[2])
-                )
-                tasks.append(task)
+        chunk_size = self.bot.config.FEDRESTORE_CHUNK_SIZE
+        restored = 0
+        chunk: List[UpdateOne] = []
+        writes: Set[asyncio.Task[int]] = set()
+        try:
+            for row in rows:
+                request = self._parse_backup_row(data["_id"], row)
+                if request is None:
+                    continue
+
+                chunk.append(request)
+                if len(chunk) < chunk_size:
+                    continue
 
-        ret = await asyncio.gather(self.text(chat.id, "fed-restore-done"), file.unlink(), *tasks)
-        return ret[0]
+                if len(writes) >= RESTORE_CONCURRENCY:
+                    done, writes = await asyncio.wait(writes, return_when=asyncio.FIRST_COMPLETED)
+                    restored += sum(task.result() for task in done)
+                    await ctx.respond(f"Restoring federation bans... {restored} bans restored")
+
+                writes.add(self.bot.loop.create_task(self._restore_chunk(chunk)))
+                chunk = []
+
+            if chunk:
+                writes.add(self.bot.loop.create_task(self._restore_chunk(chunk)))
+            if writes:
+                restored += sum(await asyncio.gather(*writes))
+        finally:
+            for task in writes:
+                task.cancel()
+
+        self.log.info(f"Restored {restored} bans of federation {data['_id']}")
+        return await self.text(chat.id, "fed-restore-done")
+
+    @command.filters(filters.dev_only)
+    async def cmd_fbanmigrate(self, ctx: command.Context) -> str:
+        """Move federation bans into their own collection"""
+        await ctx.respond("Migrating federation bans...")
+        feds, bans = await self.migrate_fban()
+        return f"Migrated {bans} bans from {feds} federations."
 
     @command.filters(filters.private, aliases=["myfeds"])
     async def cmd_myfed(self, ctx: command.Context) -> str:
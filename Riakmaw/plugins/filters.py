@@ -21,12 +21,15 @@ from typing import (
     Callable,
     ClassVar,
     Coroutine,
+    Mapping,
     MutableMapping,
     Optional,
+    Sequence,
     Set,
     Tuple,
 )
 
+from pymongo import IndexModel
 from pyrogram.errors import MediaEmpty, MessageEmpty
 from pyrogram.types import Message
 
@@ -37,6 +40,7 @@ from Riakmaw.util.tg import Types, build_button, get_message_info
 class Filters(plugin.Plugin):
     name: ClassVar[str] = "Filters"
     helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {"FILTERS": [IndexModel("chat_id")]}
 
     db: util.db.AsyncCollection
     trigger: MutableMapping[int, Set[str]] = {}
@@ -58,7 +62,7 @@ class Filters(plugin.Plugin):
         }
 
     async def on_start(self, _: int) -> None:
-        async for chat in self.db.find({}):
+        async for chat in self.db.find({}).read_ahead():
             self.trigger[chat["chat_id"]] = set(chat["trigger"].keys())
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
@@ -16,8 +16,9 @@
 
 import asyncio
 from functools import partial
-from typing import Any, ClassVar, MutableMapping, Optional
+from typing import Any, ClassVar, Mapping, MutableMapping, Optional, Sequence
 
+from pymongo import IndexModel
 from pymongo.errors import PyMongoError
 from pyrogram import emoji
 from pyrogram.enums.chat_type import ChatType
@@ -43,6 +44,7 @@ class Language(plugin.Plugin):
 
     name: ClassVar[str] = "Language"
     helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {"LANGUAGE": [IndexModel("chat_id")]}
 
     db: util.db.AsyncCollection
     _db_stream: asyncio.Task[None]
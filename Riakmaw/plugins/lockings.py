@@ -24,12 +24,15 @@ from typing import (
     ClassVar,
     Coroutine,
     List,
+    Mapping,
     MutableMapping,
     Optional,
+    Sequence,
     Set,
     Union,
 )
 
+from pymongo import IndexModel
 from pyrogram.client import Client
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.enums.chat_type import ChatType
@@ -42,7 +45,7 @@ from pyrogram.errors import (
     PeerIdInvalid,
     UserNotParticipant,
 )
-from pyrogram.types import Chat, ChatPermissions, Message
+from pyrogram.types import ChatPermissions, Message
 
 from Riakmaw import command, filters, plugin, util
 
@@ -104,12 +107,15 @@ LOCK_TYPES = OrderedDict(
 class Lockings(plugin.Plugin):
     name: ClassVar[str] = "Lockings"
     helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {"LOCKINGS": [IndexModel("chat_id")]}
 
     db: util.db.AsyncCollection
+    settings: util.db.SettingsCache
     restrictions: MutableMapping[str, MutableMapping[str, MutableMapping[str, bool]]]
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("LOCKINGS")
+        self.settings = self.bot.settings_cache("LOCKINGS")
         self.restrictions = {
             "lock": self.get_restrictions("lock"),
             "unlock": self.get_restrictions("unlock"),
@@ -123,6 +129,7 @@ class Lockings(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.settings.invalidate(old_chat, new_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         data = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -130,6 +137,7 @@ class Lockings(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.settings.invalidate(chat_id)
 
     async def on_message(self, message: Message) -> None:
         if message.outgoing:
@@ -144,19 +152,17 @@ class Lockings(plugin.Plugin):
             if message.sender_chat.id == chat.id:  # anon admin
                 return
 
-            current_chat: Chat = await self.bot.get_chat(chat.id)
-            if current_chat.linked_chat and message.sender_chat.id == current_chat.linked_chat.id:
+            linked_chat = await self.bot.get_linked_chat(chat.id)
+            if linked_chat and message.sender_chat.id == linked_chat.id:
                 # Linked channel group
                 return
 
         if user:
             try:
-                target = await chat.get_member(user.id)
+                if await util.roster.ROSTER.is_admin(self.bot.client, chat.id, user.id):
+                    return
             except (ChatAdminRequired, ChannelPrivate, PeerIdInvalid, UserNotParticipant):
                 pass
-            else:
-                if target.status in (ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER):
-                    return
 
         locked = await self.get_chat_restrictions(chat.id)
         for lock_type in locked:
@@ -249,7 +255,7 @@ class Lockings(plugin.Plugin):
         )
 
     async def get_chat_restrictions(self, chat_id: int) -> List[str]:
-        data = await self.db.find_one({"chat_id": chat_id}, {"type": 1})
+        data = await self.settings.get(chat_id)
         return data["type"] if data else []
 
     def unpack_permissions(
@@ -272,6 +278,7 @@ class Lockings(plugin.Plugin):
             raise ValueError("Invalid mode")
 
         await self.db.update_one({"chat_id": chat_id}, {aggregation: {"type": types}}, upsert=True)
+        self.settings.invalidate(chat_id)
 
     @command.filters(filters.admin_only, aliases={"listlocks", "locks", "locked", "locklist"})
     async def cmd_list_locks(self, ctx: command.Context) -> str:
@@ -17,14 +17,15 @@
 from json import JSONDecodeError
 from typing import Any, ClassVar, Optional
 
-from aiohttp import ClientConnectorError, ClientSession, ContentTypeError
+from aiohttp import ClientConnectorError, ContentTypeError
 from aiopath import AsyncPath
 
 from Riakmaw import command, filters, plugin
+from Riakmaw.util.http import CircuitOpen, HttpClient
 
 
 class Paste:
-    def __init__(self, session: ClientSession, name: str, url: str):
+    def __init__(self, session: HttpClient, name: str, url: str):
         self.__session = session
         self.__name = name
         self.__url = url
@@ -136,7 +137,7 @@ class Misc(plugin.Plugin):
                 return await self.text(
                     ctx.chat.id, "paste-succes", f"[{service}]({await paste.go(data)})"
                 )
-        except (JSONDecodeError, ContentTypeError, ClientConnectorError, KeyError):
+        except (JSONDecodeError, ContentTypeError, ClientConnectorError, CircuitOpen, KeyError):
             self.log.error("Error while pasting", exc_info=True)
             return await self.text(ctx.chat.id, "paste-fail", service)
 
@@ -15,8 +15,18 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-from typing import Any, Callable, ClassVar, Coroutine, MutableMapping, Optional
-
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Coroutine,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+)
+
+from pymongo import IndexModel
 from pyrogram.enums.chat_action import ChatAction
 from pyrogram.enums.parse_mode import ParseMode
 from pyrogram.errors import MediaEmpty, MessageEmpty
@@ -29,6 +39,7 @@ from Riakmaw.util.tg import Types, build_button, get_message_info, revert_button
 class Notes(plugin.Plugin):
     name: ClassVar[str] = "Notes"
     helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {"NOTES": [IndexModel("chat_id")]}
 
     db: util.db.AsyncCollection
     ACTION: MutableMapping[int, ChatAction]
@@ -15,8 +15,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-from typing import Any, MutableMapping, Optional
+from typing import Any, ClassVar, Mapping, MutableMapping, Optional, Sequence
 
+from pymongo import IndexModel
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.enums.chat_type import ChatType
 from pyrogram.errors import UserNotParticipant
@@ -26,15 +27,22 @@ from Riakmaw import command, filters, listener, plugin, util
 
 
 class Reporting(plugin.Plugin):
-    name = "Reporting"
-    helpable = True
+    name: ClassVar[str] = "Reporting"
+    helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {
+        "CHAT_REPORTING": [IndexModel("chat_id")]
+    }
 
     db: util.db.AsyncCollection
     user_db: util.db.AsyncCollection
+    settings: util.db.SettingsCache
+    user_settings: util.db.SettingsCache
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("CHAT_REPORTING")
         self.user_db = self.bot.db.get_collection("USER_REPORTING")
+        self.settings = self.bot.settings_cache("CHAT_REPORTING")
+        self.user_settings = self.bot.settings_cache("USER_REPORTING", key="_id")
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
@@ -44,6 +52,7 @@ class Reporting(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.settings.invalidate(old_chat, new_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         report = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -51,6 +60,7 @@ class Reporting(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.settings.invalidate(chat_id)
 
     @listener.filters(filters.regex(r"(?i)^@admin(s)?\b") & filters.group & ~filters.outgoing)
     async def on_message(self, message: Message) -> None:
@@ -115,6 +125,7 @@ class Reporting(plugin.Plugin):
                 )
             else:
                 await self.user_db.delete_one({"_id": chat_id})
+            self.user_settings.invalidate(chat_id)
         else:
             if setting:
                 await self.db.update_one(
@@ -122,13 +133,14 @@ class Reporting(plugin.Plugin):
                 )
             else:
                 await self.db.delete_one({"chat_id": chat_id})
+            self.settings.invalidate(chat_id)
 
     async def is_active(self, uid: int, is_private: bool) -> bool:
         """Get current setting default to True"""
         if is_private:
-            data = await self.user_db.find_one({"_id": uid})
+            data = await self.user_settings.get(uid)
         else:
-            data = await self.db.find_one({"chat_id": uid})
+            data = await self.settings.get(uid)
         if not data:
             return True
 
@@ -18,6 +18,7 @@ import asyncio
 from typing import Any, ClassVar, MutableMapping, Optional, Union
 
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 from pyrogram.enums.chat_member_status import ChatMemberStatus
 from pyrogram.errors import BadRequest, PeerIdInvalid, UserNotParticipant
 from pyrogram.types import (
@@ -97,7 +98,7 @@ class Restrictions(plugin.Plugin):
             await query.message.edit(await self.get_text(chat.id, "warn-keyboard-removed"))
             return
 
-        target = await self.bot.client.get_users(int(user))
+        target = await self.bot.get_users(int(user))
         if isinstance(target, list):
             target = target[0]
 
@@ -273,21 +274,19 @@ class Restrictions(plugin.Plugin):
         if target.status in {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}:
             return await ctx.get_text("rmwarn-admin")
 
-        threshold = 3
-        warns: Optional[int] = None
-        chat_data = await self.db.find_one(
-            {"chat_id": chat.id, "warn_list": {"$exists": True}},
-            {"warn_list": 1, "warn_threshold": 1},
-        )
-        if chat_data:  # Get threshold and existing warns from chat data
-            threshold = chat_data.get("warn_threshold", 3)
-            try:
-                warns = len(chat_data["warn_list"][str(user.id)])
-            except KeyError:
-                pass
-
         uid = str(ObjectId())
         reason = reason or await ctx.get_text("warn-default-reason")
+        # Store the warn and read the resulting warns in one go
+        chat_data = await self.db.find_one_and_update(
+            {"chat_id": chat.id},
+            {"$set": {f"warn_list.{user.id}.{uid}": reason}},
+            projection={f"warn_list.{user.id}": 1, "warn_threshold": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        threshold = chat_data.get("warn_threshold", 3)
+        warns = len(chat_data["warn_list"][str(user.id)])
+
         keyboard = [
             [
                 InlineKeyboardButton(
@@ -296,24 +295,12 @@ class Restrictions(plugin.Plugin):
                 )
             ]
         ]
-        await asyncio.gather(
-            self.db.update_one(
-                {"chat_id": chat.id}, {"$set": {f"warn_list.{user.id}.{uid}": reason}}, upsert=True
-            ),
-            ctx.respond(
-                await self.get_text(
-                    chat.id,
-                    "warn-message",
-                    user.mention,
-                    1 if warns is None else warns + 1,
-                    threshold,
-                    reason,
-                ),
-                reply_markup=InlineKeyboardMarkup(keyboard),
-            ),
+        await ctx.respond(
+            await self.get_text(chat.id, "warn-message", user.mention, warns, threshold, reason),
+            reply_markup=InlineKeyboardMarkup(keyboard),
         )
 
-        if warns is not None and warns + 1 >= threshold:
+        if warns >= threshold:
             ret, _ = await asyncio.gather(
                 ctx.get_text("warn-user-max", user.mention), chat.ban_member(user.id)
             )
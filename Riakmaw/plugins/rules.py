@@ -15,8 +15,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-from typing import Any, MutableMapping, Optional
+from typing import Any, ClassVar, Mapping, MutableMapping, Optional, Sequence
 
+from pymongo import IndexModel
 from pyrogram.errors import PeerIdInvalid
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
@@ -24,8 +25,9 @@ from Riakmaw import command, filters, plugin, util
 
 
 class Rules(plugin.Plugin):
-    name = "Rules"
-    helpable = True
+    name: ClassVar[str] = "Rules"
+    helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {"RULES": [IndexModel("chat_id")]}
 
     db: util.db.AsyncCollection
 
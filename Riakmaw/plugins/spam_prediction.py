@@ -19,8 +19,20 @@ import re
 from datetime import datetime, time, timedelta
 from hashlib import md5, sha256
 from random import randint
-from typing import Any, Callable, ClassVar, List, MutableMapping, Optional, Tuple
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+from aiohttp import ClientSession, ClientTimeout
+from pymongo import IndexModel, ReturnDocument
 from pyrogram.errors import (
     ChatAdminRequired,
     FloodWait,
@@ -32,7 +44,6 @@ from pyrogram.errors import (
 )
 from pyrogram.types import (
     CallbackQuery,
-    Chat,
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     Message,
@@ -50,16 +61,27 @@ except ImportError:
 from Riakmaw import command, filters, listener, plugin, util
 from Riakmaw.util.misc import StopPropagation
 
+# Probability above which a message is treated as spam
+SPAM_THRESHOLD = 0.5
+# Seconds the model download may take, aiohttp's default total timeout
+MODEL_TIMEOUT = 300
+
 
 class SpamPrediction(plugin.Plugin):
     name: ClassVar[str] = "SpamPredict"
     helpable: ClassVar[bool] = True
     disabled: ClassVar[bool] = not _run_predict
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {
+        "SPAM_PREDICT_SETTING": [IndexModel("chat_id")],
+    }
 
     db: util.db.AsyncCollection
     user_db: util.db.AsyncCollection
+    user_writes: util.db.WriteBehind
     setting_db: util.db.AsyncCollection
+    settings: util.db.SettingsCache
     model: Classifier
+    predictor: util.batching.BatchPredictor
 
     __predict_cost: int = 10
     __log_channel: int = -1001314588569
@@ -68,11 +90,23 @@ class SpamPrediction(plugin.Plugin):
         self.model = Classifier()
         self.db = self.bot.db.get_collection("SPAM_DUMP")
         self.user_db = self.bot.db.get_collection("USERS")
+        self.user_writes = self.bot.write_behind("USERS")
         self.setting_db = self.bot.db.get_collection("SPAM_PREDICT_SETTING")
-
+        self.settings = self.bot.settings_cache("SPAM_PREDICT_SETTING")
+
+        config = self.bot.config
+        self.predictor = util.batching.BatchPredictor(
+            self.model,
+            workers=config.PREDICT_WORKERS,
+            max_batch=config.PREDICT_BATCH_SIZE,
+            max_delay=config.PREDICT_BATCH_DELAY / 1000,
+        )
         await self.__load_model()
         self.bot.loop.create_task(self.__refresh_model())
 
+    async def on_stop(self) -> None:
+        self.predictor.close()
+
     async def on_chat_migrate(self, message: Message) -> None:
         await self.db.update_one(
             {"chat_id": message.migrate_from_chat_id},
@@ -87,6 +121,7 @@ class SpamPrediction(plugin.Plugin):
         await self.setting_db.update_one(
             {"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True
         )
+        self.settings.invalidate(chat_id)
 
     async def __refresh_model(self) -> None:
         scheduled_time = time(hour=17)  # Run at 00:00 WIB
@@ -103,7 +138,11 @@ class SpamPrediction(plugin.Plugin):
     async def __load_model(self) -> None:
         self.log.info("Downloading spam prediction model!")
         try:
-            await self.model.load_model(self.bot.http)
+            # The model is too large for the timeout and retries of bot.http
+            async with ClientSession(timeout=ClientTimeout(total=MODEL_TIMEOUT)) as session:
+                await self.model.load_model(session)
+            # Workers get a copy of the model, restart them with the new one
+            self.predictor.reload(self.model)
         except RuntimeError:
             self.log.warning("Failed to download prediction model!")
             self.bot.unload_plugin(self)
@@ -118,11 +157,17 @@ class SpamPrediction(plugin.Plugin):
         # skipcq: PTC-W1003
         return md5((str(id) + self.bot.user.username).encode()).hexdigest()  # skipcq: BAN-B324
 
+    def _unverify(self, uid: int) -> None:
+        """Make SpamShield check the user again on their next message"""
+        shield = self.bot.plugins.get("SpamShield")
+        if shield:
+            shield.verified.discard_value(uid)  # type: ignore
+
     async def _collect_random_sample(self, proba: float, uid: Optional[int]) -> None:
         if not uid or uid == self.bot.uid:
             return
         if randint(1, 2) == 2:  # 50% chance to collect a sample
-            await self.user_db.update_one(
+            self.user_writes.update_one(
                 {"_id": uid},
                 {
                     "$push": {
@@ -134,6 +179,12 @@ class SpamPrediction(plugin.Plugin):
                 },
             )  # Do not upsert
 
+            # Only a spam-like sample can lower the trust score enough for SpamShield
+            if proba > SPAM_THRESHOLD:
+                # The check reads the samples back from the database
+                await self.user_writes.flush()
+                self._unverify(uid)
+
     @listener.filters(
         filters.regex(r"spam_check_(?P<value>t|f)") | filters.regex(r"spam_ban_(?P<user>.*)")
     )
@@ -166,7 +217,7 @@ class SpamPrediction(plugin.Plugin):
             raise ValueError("Reply markup must be an InlineKeyboardMarkup")
 
         try:
-            target = await self.bot.client.get_users(int(user))
+            target = await self.bot.get_users(int(user))
         except PeerIdInvalid:
             await query.answer("Error while fetching user!")
             await query.edit_message_reply_markup(
@@ -177,6 +228,7 @@ class SpamPrediction(plugin.Plugin):
             target = target[0]
 
         await chat.ban_member(target.id)
+        self._unverify(target.id)
         await query.answer(
             await self.get_text(
                 chat.id, "spampredict-ban", user=target.username or target.first_name
@@ -197,56 +249,57 @@ class SpamPrediction(plugin.Plugin):
 
         content_hash = content[0]
 
-        data = await self.db.find_one({"_id": content_hash})
-        if not data:
-            return await query.answer(
-                "The voting poll for this message has ended!", show_alert=True
-            )
-
-        users_on_correct = data["spam"]
-        users_on_incorrect = data["ham"]
         if value == "t":
-            try:
-                # Check user in incorrect data
-                if author in users_on_incorrect:
-                    users_on_incorrect.remove(author)
-
-                if author in users_on_correct:
-                    users_on_correct.remove(author)
-                    ans = "You have unvoted this message as a spam!"
-                else:
-                    users_on_correct.append(author)
-                    ans = "You voted this message as a spam!"
-            except TypeError:
-                return await query.answer(
-                    "You can't vote this anymore, because this was marked as a spam by our staff",
-                    show_alert=True,
-                )
-            await query.answer(ans)
+            vote, other, label = "spam", "ham", "a spam"
         elif value == "f":
-            try:
-                # Check user in correct data
-                if author in users_on_correct:
-                    users_on_correct.remove(author)
+            vote, other, label = "ham", "spam", "non-spam"
+        else:
+            return await query.answer("Invalid keyboard method!", show_alert=True)
 
-                if author in users_on_incorrect:
-                    users_on_incorrect.remove(author)
-                    ans = "You have unvoted this message as non-spam!"
-                else:
-                    users_on_incorrect.append(author)
-                    ans = "You voted this message as non-spam!"
-            except TypeError:
+        # Toggle the vote and drop the opposite one in a single update,
+        # so concurrent voters can't overwrite each other
+        data = await self.db.find_one_and_update(
+            {"_id": content_hash, "spam": {"$type": "array"}, "ham": {"$type": "array"}},
+            [
+                {
+                    "$set": {
+                        vote: {
+                            "$cond": [
+                                {"$in": [author, f"${vote}"]},
+                                {
+                                    "$filter": {
+                                        "input": f"${vote}",
+                                        "cond": {"$ne": ["$$this", author]},
+                                    }
+                                },
+                                {"$concatArrays": [f"${vote}", [author]]},
+                            ]
+                        },
+                        other: {
+                            "$filter": {"input": f"${other}", "cond": {"$ne": ["$$this", author]}}
+                        },
+                    }
+                }
+            ],
+            projection={vote: True},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if not data:
+            if await self.db.find_one({"_id": content_hash}, {"_id": True}):
+                # Votes are replaced once our staff marked the message
                 return await query.answer(
                     "You can't vote this anymore, because this was marked as a spam by our staff",
                     show_alert=True,
                 )
-            await query.answer(ans)
-        else:
-            return await query.answer("Invalid keyboard method!", show_alert=True)
 
-        await self.db.update_one(
-            {"_id": content_hash}, {"$set": {"spam": users_on_correct, "ham": users_on_incorrect}}
-        )
+            return await query.answer(
+                "The voting poll for this message has ended!", show_alert=True
+            )
+
+        if author in data[vote]:
+            await query.answer(f"You have unvoted this message as {label}!")
+        else:
+            await query.answer(f"You voted this message as {label}!")
 
     @listener.filters(filters.group & ~filters.outgoing)
     @listener.priority(70)
@@ -313,7 +366,7 @@ class SpamPrediction(plugin.Plugin):
         if len(text_norm.split()) < 4:  # Skip short messages
             return
 
-        response = await self.model.predict(text_norm)
+        response = await self.predictor.predict(text_norm)
         await self.bot.log_stat("predicted")
         if response.size == 0:
             return
@@ -322,7 +375,7 @@ class SpamPrediction(plugin.Plugin):
 
         await self._collect_random_sample(probability, user)
 
-        if probability <= 0.5:
+        if probability <= SPAM_THRESHOLD:
             return
 
         content_hash = self._build_hash(text)
@@ -376,18 +429,15 @@ class SpamPrediction(plugin.Plugin):
                 if message.sender_chat.id == chat.id:  # anon admin
                     return
 
-                current_chat: Chat = await self.bot.get_chat(chat.id)
-                if (
-                    current_chat.linked_chat
-                    and message.sender_chat.id == current_chat.linked_chat.id
-                ):
+                linked_chat = await self.bot.get_linked_chat(chat.id)
+                if linked_chat and message.sender_chat.id == linked_chat.id:
                     # Linked channel group
                     return
 
             target = None
             if user:
                 try:
-                    target = await message.chat.get_member(user)
+                    target = await self.bot.get_member(chat.id, user)
                 except UserNotParticipant:
                     pass
                 else:
@@ -557,10 +607,11 @@ class SpamPrediction(plugin.Plugin):
         await self.setting_db.update_one(
             {"chat_id": chat_id}, {"$set": {"setting": setting}}, upsert=True
         )
+        self.settings.invalidate(chat_id)
 
     async def is_active(self, chat_id: int) -> bool:
         """Return SpamShield setting"""
-        data = await self.setting_db.find_one({"chat_id": chat_id})
+        data = await self.settings.get(chat_id)
         return data.get("setting", True) if data else True
 
     @command.filters(filters.admin_only, aliases=["spampredict", "spam_predict"])
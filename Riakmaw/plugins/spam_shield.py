@@ -17,14 +17,11 @@
 import asyncio
 from datetime import datetime
 from json import JSONDecodeError
-from typing import Any, ClassVar, List, MutableMapping, Optional
+from pathlib import Path
+from typing import Any, ClassVar, List, Mapping, MutableMapping, Optional, Sequence
 
-from aiohttp import (
-    ClientConnectorError,
-    ClientOSError,
-    ClientResponseError,
-    ContentTypeError,
-)
+from aiohttp import ClientError, ClientResponseError, ContentTypeError
+from pymongo import IndexModel
 from pyrogram.errors import (
     BadRequest,
     ChannelPrivate,
@@ -42,13 +39,35 @@ except ImportError:
 from Riakmaw import command, filters, listener, plugin, util
 from Riakmaw.util.misc import StopPropagation
 
+# Seconds to keep the CAS and SpamWatch verdict of a user, bans rarely get lifted
+# so they are kept longer than clean results.
+BANNED_TTL = 6 * 60 * 60
+CLEAN_TTL = 30 * 60
+
+
+class LookupUnavailable(Exception):
+    """The ban list couldn't be checked, so there is no verdict to cache"""
+
+
+def _verdict_ttl(verdict: Any) -> float:
+    return BANNED_TTL if verdict else CLEAN_TTL
+
 
 class SpamShield(plugin.Plugin):
     name: ClassVar[str] = "SpamShield"
     helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {
+        "GBAN_SETTINGS": [IndexModel("chat_id")],
+    }
 
     db: util.db.AsyncCollection
-    federation_db: util.db.AsyncCollection
+    settings: util.db.SettingsCache
+    fbans_db: util.db.AsyncCollection
+    verdicts: util.cache.AsyncCache
+    verified: util.cache.RecentWindow
+    cas_mirror: Optional[util.banlist.BanListMirror]
+    sw_mirror: Optional[util.banlist.BanListMirror]
+    _mirror_tasks: List[asyncio.Task[None]]
     token: Optional[str]
     spam_protection: bool
 
@@ -58,9 +77,46 @@ class SpamShield(plugin.Plugin):
             self.bot.log.warning("SpamWatch API token not exist")
 
         self.db = self.bot.db.get_collection("GBAN_SETTINGS")  # spamshield autoban
-        self.federation_db = self.bot.db.get_collection("FEDERATIONS")
+        self.settings = self.bot.settings_cache("GBAN_SETTINGS")
+        self.fbans_db = self.bot.db.get_collection("FED_BANS")
         self.user_db = self.bot.db.get_collection("USERS")
         self.spam_protection = "SpamPredict" in self.bot.plugins
+        self.verdicts = util.cache.AsyncCache(CLEAN_TTL, 50000, ttl_of=_verdict_ttl)
+        # Users that passed the checks recently, their next messages skip them
+        self.verified = util.cache.RecentWindow(self.bot.config.SPAMSHIELD_WINDOW)
+
+        config = self.bot.config
+        path = Path(config.BANLIST_PATH)
+        self.cas_mirror = self.sw_mirror = None
+        if config.CAS_EXPORT:
+            self.cas_mirror = util.banlist.BanListMirror(
+                "CAS", config.CAS_EXPORT, path / "cas.rbl", config.BANLIST_REFRESH
+            )
+        if config.SW_EXPORT:
+            self.sw_mirror = util.banlist.BanListMirror(
+                "SpamWatch",
+                config.SW_EXPORT,
+                path / "spamwatch.rbl",
+                config.BANLIST_REFRESH,
+                headers={"Authorization": f"Bearer {self.token}"} if self.token else None,
+            )
+        self._mirror_tasks = []
+        for mirror in self.mirrors:
+            mirror.load()
+
+    @property
+    def mirrors(self) -> List[util.banlist.BanListMirror]:
+        return [mirror for mirror in (self.cas_mirror, self.sw_mirror) if mirror is not None]
+
+    async def on_start(self, _: int) -> None:
+        for mirror in self.mirrors:
+            self._mirror_tasks.append(self.bot.loop.create_task(mirror.run(self.bot.http)))
+
+    async def on_stop(self) -> None:
+        for task in self._mirror_tasks:
+            task.cancel()
+        for mirror in self.mirrors:
+            mirror.close()
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
@@ -70,6 +126,8 @@ class SpamShield(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.settings.invalidate(old_chat, new_chat)
+        self.verified.discard_chat(old_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         setting = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -77,6 +135,7 @@ class SpamShield(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.settings.invalidate(chat_id)
 
     @listener.priority(90)
     async def on_chat_action(self, message: Message) -> None:
@@ -86,7 +145,7 @@ class SpamShield(plugin.Plugin):
             return
 
         try:
-            me = await chat.get_member("me")
+            me = (await util.roster.ROSTER.get(self.bot.client, chat.id)).me
             if not me.privileges or not me.privileges.can_restrict_members:
                 return
 
@@ -115,32 +174,50 @@ class SpamShield(plugin.Plugin):
         if not chat or not user or not text or not await self.is_active(chat.id):
             return
 
+        if self.verified.contains(chat.id, user.id):
+            return
+
         if self.spam_protection:
-            sample = await self.user_db.find_one({"_id": user.id}, {"pred_sample": 1, "spam": 1})
+            sample = await self.bot.get_user_data(user.id)
             if sample and not sample.get("spam", False):
                 trust = get_trust(sample.get("pred_sample", []))
                 if trust and trust < 5.0:
                     self.log.debug(f"{user.id} has low trust score, flaging as spam")
                     await self.user_db.update_one({"_id": user.id}, {"$set": {"spam": True}})
+                    util.memo.current().discard(("USERS", user.id))
+                    self.verified.discard_value(user.id)
 
         try:
-            me, target = await util.tg.fetch_permissions(self.bot.client, chat.id, user.id)
+            # Senders of a message are members already, so only the roster is needed
+            roster = await util.roster.ROSTER.get(self.bot.client, chat.id)
             if (
-                not (me and target)
-                or not me.privileges
-                or not me.privileges.can_restrict_members
-                or util.tg.is_staff_or_admin(target)
+                not roster.me.privileges
+                or not roster.me.privileges.can_restrict_members
+                or roster.is_admin(user.id)
+                or util.tg.is_staff(user.id)
             ):
                 return
 
-            await self.check(target.user, chat, message)
+            if not await self.check(user, chat, message):
+                self.verified.add(chat.id, user.id)
         except (ChannelPrivate, ChatAdminRequired, PeerIdInvalid, UserNotParticipant):
             return
 
-    async def get_ban(self, user_id: int) -> MutableMapping[str, Any]:
+    async def get_ban(self, user_id: int) -> Mapping[str, Any]:
+        """Check on SpamWatch"""
         if not self.token:
             return {}
 
+        # Only banned users are looked up for the ban reason
+        if self.sw_mirror is not None and self.sw_mirror.ready and user_id not in self.sw_mirror:
+            return {}
+
+        try:
+            return await self.verdicts.get_or_call(("sw", user_id), self._fetch_sw, user_id)
+        except LookupUnavailable:
+            return {}
+
+    async def _fetch_sw(self, user_id: int) -> Mapping[str, Any]:
         path = f"https://api.spamwat.ch/banlist/{user_id}"
         headers = {"Authorization": f"Bearer {self.token}"}
         try:
@@ -160,7 +237,7 @@ class SpamShield(plugin.Plugin):
                             message="Make sure your Spamwatch API token is corret",
                         ),
                     )
-                    return {}
+                    raise LookupUnavailable
 
                 if resp.status == 403:
                     self.log.error(
@@ -171,7 +248,7 @@ class SpamShield(plugin.Plugin):
                             message="Forbidden, your token permissions is not valid",
                         ),
                     )
-                    return {}
+                    raise LookupUnavailable
 
                 if resp.status == 429:
                     self.log.warning(
@@ -182,73 +259,71 @@ class SpamShield(plugin.Plugin):
                             message="There were problems with request... Too many.",
                         ),
                     )
-                    return {}
+                    raise LookupUnavailable
 
                 self.log.error(
                     f"Unknown Spamwatch API error: Received {resp.status}",
                     exc_info=ClientResponseError(resp.request_info, resp.history),
                 )
-                return {}
-        except ClientConnectorError:
-            return {}
+                raise LookupUnavailable
+        except (ClientError, asyncio.TimeoutError) as err:
+            raise LookupUnavailable from err
 
     async def cas_check(self, user: User) -> Optional[str]:
         """Check on CAS"""
-        retry = 0
-        while True:
-            try:
-                async with self.bot.http.get(
-                    f"https://api.cas.chat/check?user_id={user.id}"
-                ) as res:
-                    data = await res.json()
-                    if data["ok"]:
-                        reason = f"https://cas.chat/query?u={user.id}"
-                        return reason
-
-                    return None
-            except (ContentTypeError, JSONDecodeError):
-                if retry == 5:
-                    self.log.debug("Error parsing CAS response")
-                    return None
-
-                retry += 1
-                await asyncio.sleep(1)
-                self.log.debug("Invalid data received from CAS server, retrying...")
-            except ClientOSError:
-                if retry == 10:
-                    self.log.debug("Error connecting to CAS API")
-                    return None
-
-                retry += 1
-                await asyncio.sleep(0.5)
-                self.log.debug(f"Retrying CAS check for {user.id}")
+        if self.cas_mirror is not None and self.cas_mirror.ready:
+            return f"https://cas.chat/query?u={user.id}" if user.id in self.cas_mirror else None
+
+        try:
+            return await self.verdicts.get_or_call(("cas", user.id), self._fetch_cas, user.id)
+        except LookupUnavailable:
+            return None
+
+    async def _fetch_cas(self, user_id: int) -> Optional[str]:
+        # Connection errors and server errors are retried by the HTTP client,
+        # an unhealthy CAS fails fast once its circuit is open
+        try:
+            async with self.bot.http.get(f"https://api.cas.chat/check?user_id={user_id}") as res:
+                data = await res.json()
+                if data["ok"]:
+                    reason = f"https://cas.chat/query?u={user_id}"
+                    return reason
+
+                return None
+        except (ContentTypeError, JSONDecodeError) as err:
+            self.log.debug("Error parsing CAS response")
+            raise LookupUnavailable from err
+        except (ClientError, asyncio.TimeoutError) as err:
+            self.log.debug(f"Error connecting to CAS API: {err}")
+            raise LookupUnavailable from err
 
     async def check_spam(self, uid: int) -> bool:
         if not self.spam_protection:
             return False
-        res = await self.user_db.find_one({"_id": uid}, {"spam": 1})
+        res = await self.bot.get_user_data(uid)
         return res.get("spam", False) if res else False
 
     async def is_active(self, chat_id: int) -> bool:
         """Return SpamShield setting"""
-        data = await self.db.find_one({"chat_id": chat_id})
+        data = await self.settings.get(chat_id)
         return data["setting"] if data else True
 
     async def ban(self, chat: Chat, user: User, reason: str) -> None:
+        self.verified.discard_value(user.id)
         fullname = user.first_name + user.last_name if user.last_name else user.first_name
         await asyncio.gather(
             chat.ban_member(user.id),
-            self.federation_db.update_one(
-                {"_id": "RiakmawSpamShield"},
+            self.fbans_db.update_one(
+                {"fed_id": "RiakmawSpamShield", "target_id": user.id},
                 {
                     "$set": {
-                        f"banned.{user.id}": {
-                            "name": fullname,
-                            "reason": "Automated fban " + reason,
-                            "time": datetime.now(),
-                        }
+                        "type": "user",
+                        "name": fullname,
+                        "reason": "Automated fban " + reason,
+                        "time": datetime.now(),
                     }
                 },
+                upsert=True,
             ),
         )
 
@@ -258,6 +333,7 @@ class SpamShield(plugin.Plugin):
             await self.db.update_one({"chat_id": chat_id}, {"$set": {"setting": True}}, upsert=True)
         else:
             await self.db.delete_one({"chat_id": chat_id})
+        self.settings.invalidate(chat_id)
 
     async def check(self, user: User, chat: Chat, message: Message) -> bool:
         """Shield checker action."""
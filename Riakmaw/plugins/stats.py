@@ -15,7 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-from typing import Any, ClassVar, List, Mapping, Optional
+from typing import Any, ClassVar, Optional
 
 from pyrogram.enums.parse_mode import ParseMode
 from pyrogram.types import Message
@@ -47,12 +47,15 @@ class PluginStats(plugin.Plugin):
     name: ClassVar[str] = "Stats"
 
     db: util.db.AsyncCollection
+    writes: util.db.WriteBehind
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("STATS")
+        self.writes = self.bot.write_behind("STATS")
         self.chats_db = self.bot.db.get_collection("CHATS")
         self.users_db = self.bot.db.get_collection("USERS")
         self.feds_db = self.bot.db.get_collection("FEDERATIONS")
+        self.fbans_db = self.bot.db.get_collection("FED_BANS")
 
         if await self.get("stop_time_usec") or await self.get("uptime"):
             self.log.info("Migrating stats timekeeping format")
@@ -73,7 +76,8 @@ class PluginStats(plugin.Plugin):
             await self.put("start_time_usec", time_us)
 
     async def on_stat_listen(self, key: str, value: int) -> None:
-        await self.inc(key, value)
+        # Counters are bumped on every message, merge them instead of writing each one
+        self.writes.update_one({"_id": 1}, {"$inc": {key: value}}, upsert=True)
 
     async def on_message(self, message: Message) -> None:
         stat = "sent" if message.outgoing else "received"
@@ -99,6 +103,7 @@ class PluginStats(plugin.Plugin):
 
     @command.filters(filters.dev_only & filters.private)
     async def cmd_stats(self, ctx: command.Context) -> None:
+        await self.writes.flush()
         if ctx.input == "reset":
             await self.db.delete_many({})
             await self.on_load()
@@ -138,24 +143,11 @@ class PluginStats(plugin.Plugin):
             total_users,
             total_chats,
         ) = resp
-        total_federations = 0
-        total_fbanned = 0
-        total_chat_fbanned = 0
-        pipeline: List[Mapping[str, Any]] = [
-            {
-                "$project": {
-                    "_id": 1,
-                    "name": 1,
-                    "banned_user": {"$size": {"$objectToArray": {"$ifNull": ["$banned", {}]}}},
-                    "banned_chat": {"$size": {"$objectToArray": {"$ifNull": ["$banned_chat", {}]}}},
-                }
-            }
-        ]
-
-        async for opt in self.feds_db.aggregate(pipeline=pipeline):
-            total_federations += 1
-            total_fbanned += opt.get("banned_user", 0)
-            total_chat_fbanned += opt.get("banned_chat", 0)
+        total_federations, total_fbanned, total_chat_fbanned = await asyncio.gather(
+            self.feds_db.count_documents({}),
+            self.fbans_db.count_documents({"type": "user"}),
+            self.fbans_db.count_documents({"type": "chat"}),
+        )
 
         text = f"""<b>STATS  SINCE  LAST  RESET</b>:\n
   • <b>Total Uptime Elapsed</b>: <b>{util.time.format_duration_us(uptime - downtime)}</b>
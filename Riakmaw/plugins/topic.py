@@ -24,9 +24,11 @@ class Topics(plugin.Plugin):
     helpable: ClassVar[bool] = True
 
     db: util.db.AsyncCollection
+    chat_settings: util.db.SettingsCache
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("CHATS")
+        self.chat_settings = self.bot.settings_cache("CHATS", fields=("action_topic",))
 
     @command.filters(filters.can_manage_topic, aliases=["setdefaulttopic"])
     async def cmd_setactiontopic(self, ctx: command.Context) -> Optional[str]:
@@ -39,6 +41,7 @@ class Topics(plugin.Plugin):
             {"$set": {"action_topic": ctx.msg.message_thread_id}},
             upsert=True,
         )
+        self.chat_settings.invalidate(ctx.chat.id)
         return await self.text(ctx.chat.id, "topic-set")
 
     # TODO: Add command to create, delete, edit topic
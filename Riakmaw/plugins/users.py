@@ -19,8 +19,19 @@ import re
 from hashlib import md5
 from html import escape
 from time import time
-from typing import Any, ClassVar, List, Mapping, MutableMapping, Optional, Union
-
+from typing import (
+    Any,
+    ClassVar,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from pymongo import IndexModel, UpdateOne
+from pymongo.errors import PyMongoError
 from pyrogram.enums.chat_action import ChatAction
 from pyrogram.enums.chat_type import ChatType
 from pyrogram.enums.parse_mode import ParseMode
@@ -37,50 +48,94 @@ except ImportError:
 
 class Users(plugin.Plugin):
     name: ClassVar[str] = "Users"
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {
+        "USERS": [IndexModel("hash"), IndexModel("chats")],
+        "CHATS": [IndexModel("chat_id"), IndexModel("hash")],
+    }
 
     chats_db: util.db.AsyncCollection
     users_db: util.db.AsyncCollection
+    chats_writes: util.db.WriteBehind
+    users_writes: util.db.WriteBehind
     predict_loaded: bool
 
     async def on_load(self) -> None:
         self.chats_db = self.bot.db.get_collection("CHATS")
         self.users_db = self.bot.db.get_collection("USERS")
+        self.chats_writes = self.bot.write_behind("CHATS")
+        self.users_writes = self.bot.write_behind("USERS")
         self.predict_loaded = "SpamPredict" in self.bot.plugins
 
+    async def on_start(self, _: int) -> None:
+        self.bot.loop.create_task(self._backfill())
+
+    async def _backfill(self) -> None:
+        """Complete documents stored without a chat list or hash.
+
+        New documents get both on insert, and a stored hash is never overwritten
+        since it also depends on the bot username.
+        """
+        try:
+            await self.users_db.update_many({"chats": {"$exists": False}}, {"$set": {"chats": []}})
+            if not self.predict_loaded:
+                return
+
+            for collection, key in ((self.users_db, "_id"), (self.chats_db, "chat_id")):
+                requests: List[UpdateOne] = []
+                async for data in collection.find({"hash": {"$exists": False}}, {key: True}):
+                    if key not in data:
+                        continue
+
+                    requests.append(
+                        UpdateOne(
+                            {"_id": data["_id"], "hash": {"$exists": False}},
+                            {"$set": {"hash": self.hash_id(data[key])}},
+                        )
+                    )
+                    if len(requests) >= 1000:
+                        await collection.bulk_write(requests, ordered=False)
+                        requests = []
+
+                if requests:
+                    await collection.bulk_write(requests, ordered=False)
+        except PyMongoError as e:
+            self.log.warning("Failed to backfill user and chat data: %s", e)
+
     def hash_id(self, id: int) -> str:
         # skipcq: PTC-W1003
         return md5((str(id) + self.bot.user.username).encode()).hexdigest()  # skipcq: BAN-B324
 
-    async def build_channel_task(self, channel: Chat) -> asyncio.Task[Any]:
-        async def _do_nothing() -> None:
+    def save_channel(self, channel: Chat) -> None:
+        if channel.type != ChatType.CHANNEL:
             return
 
-        if channel.type == ChatType.CHANNEL:
-            data = await self.chats_db.find_one({"chat_id": channel.id})
-            content = {"chat_name": channel.title, "type": "channel"}
-            if not data or "hash" not in data:
-                content["hash"] = self.hash_id(channel.id)
-            return self.bot.loop.create_task(
-                self.chats_db.update_one({"chat_id": channel.id}, {"$set": content}, upsert=True)
-            )
+        self.chats_writes.update_one(
+            {"chat_id": channel.id},
+            {
+                "$set": {"chat_name": channel.title, "type": "channel"},
+                "$setOnInsert": {"hash": self.hash_id(channel.id)},
+            },
+            upsert=True,
+        )
 
-        return self.bot.loop.create_task(_do_nothing())
-
-    async def build_user_task(self, user: User) -> asyncio.Task:
-        data = await self.users_db.find_one({"_id": user.id})
-        content: MutableMapping[str, Any] = {"username": user.username, "last_seen": int(time())}
-        if not data or "hash" not in data:
-            content["hash"] = self.hash_id(user.id)
-        if not data or "chats" not in data:
-            content["chats"] = []
-        return self.bot.loop.create_task(
-            self.users_db.update_one({"_id": user.id}, {"$set": content}, upsert=True)
+    def save_user(self, user: User) -> None:
+        self.users_writes.update_one(
+            {"_id": user.id},
+            {
+                "$set": {"username": user.username, "last_seen": int(time())},
+                "$setOnInsert": {"hash": self.hash_id(user.id), "chats": []},
+            },
+            upsert=True,
         )
 
     async def on_chat_migrate(self, message: Message) -> None:
         new_chat = message.chat.id
         old_chat = message.migrate_from_chat_id
 
+        self.bot.invalidate_chat_cache(old_chat)
+        util.roster.ROSTER.invalidate(old_chat)
+        # Buffered memberships have to land before they are moved
+        await asyncio.gather(self.users_writes.flush(), self.chats_writes.flush())
         await asyncio.gather(
             self.users_db.update_many({"chats": old_chat}, {"$push": {"chats": new_chat}}),
             self.users_db.update_many({"chats": old_chat}, {"$pull": {"chats": old_chat}}),
@@ -94,6 +149,7 @@ class Users(plugin.Plugin):
 
         chat = message.chat
         user = message.left_chat_member
+        await asyncio.gather(self.users_writes.flush(), self.chats_writes.flush())
         if user.id == self.bot.uid:
             await asyncio.gather(
                 self.chats_db.update_one({"chat_id": chat.id}, {"$set": {"member": []}}),
@@ -108,13 +164,14 @@ class Users(plugin.Plugin):
     async def on_callback_query(self, query: CallbackQuery) -> None:
         """Hanle user that sent a callback query"""
         user = query.from_user
-        set_content = {"username": user.username, "name": user.first_name}
-        user_data = await self.users_db.find_one({"_id": user.id})
-
-        if self.predict_loaded and (not user_data or "hash" not in user_data):
-            set_content["hash"] = self.hash_id(user.id)
+        set_content: MutableMapping[str, Any] = {
+            "username": {"$literal": user.username},
+            "name": {"$literal": user.first_name},
+        }
+        if self.predict_loaded:
+            set_content["hash"] = {"$ifNull": ["$hash", self.hash_id(user.id)]}
 
-        await self.users_db.update_one({"_id": user.id}, {"$set": set_content})
+        await self.users_db.update_one({"_id": user.id}, [{"$set": set_content}])
 
     @listener.priority(50)
     async def on_message(self, message: Message) -> None:
@@ -128,25 +185,17 @@ class Users(plugin.Plugin):
         if not user or not chat:  # sanity check for service
             return
 
-        tasks = []
         set_content = {"username": user.username, "name": user.first_name, "last_seen": int(time())}
-        user_data = await self.users_db.find_one({"_id": user.id})
+        if self.predict_loaded:
+            if ch := message.forward_from_chat:
+                self.save_channel(ch)
+            if usr := message.forward_from:
+                self.save_user(usr)
 
         if chat.type == ChatType.PRIVATE:
-            if self.predict_loaded:
-                if ch := message.forward_from_chat:
-                    tasks.append(await self.build_channel_task(ch))
-                if not user_data or "hash" not in user_data:
-                    set_content["hash"] = self.hash_id(user.id)
-                if usr := message.forward_from:
-                    tasks.append(await self.build_user_task(usr))
-
-            await asyncio.gather(
-                self.users_db.update_one({"_id": user.id}, {"$set": set_content}), *tasks
-            )
+            self.users_writes.update_one({"_id": user.id}, {"$set": set_content})
             return
 
-        chat_data = await self.chats_db.find_one({"chat_id": chat.id})
         chat_update = {
             "$set": {
                 "chat_name": chat.title,
@@ -156,27 +205,17 @@ class Users(plugin.Plugin):
             "$addToSet": {"member": user.id},
         }
         if self.predict_loaded:
-            if not user_data or "hash" not in user_data:
-                set_content["hash"] = self.hash_id(user.id)
-            if not chat_data or "hash" not in chat_data:
-                chat_update["$set"]["hash"] = self.hash_id(chat.id)
+            chat_update["$setOnInsert"] = {"hash": self.hash_id(chat.id)}
             update = {
                 "$set": set_content,
-                "$setOnInsert": {"reputation": 0},
+                "$setOnInsert": {"reputation": 0, "hash": self.hash_id(user.id)},
                 "$addToSet": {"chats": chat.id},
             }
-            if ch := message.forward_from_chat:
-                tasks.append(await self.build_channel_task(ch))
-            if usr := message.forward_from:
-                tasks.append(await self.build_user_task(usr))
         else:
             update = {"$set": set_content, "$addToSet": {"chats": chat.id}}
 
-        await asyncio.gather(
-            self.users_db.update_one({"_id": user.id}, update, upsert=True),
-            self.chats_db.update_one({"chat_id": chat.id}, chat_update, upsert=True),
-            *tasks,
-        )
+        self.users_writes.update_one({"_id": user.id}, update, upsert=True)
+        self.chats_writes.update_one({"chat_id": chat.id}, chat_update, upsert=True)
 
     async def _user_info(self, ctx: command.Context, user: User) -> None:
         """User Info"""
@@ -22,13 +22,15 @@ from typing import (
     ClassVar,
     Coroutine,
     Dict,
+    Mapping,
     MutableMapping,
     Optional,
+    Sequence,
     Tuple,
     Union,
 )
 
-from pyrogram.client import Client
+from pymongo import IndexModel
 from pyrogram.enums.parse_mode import ParseMode
 from pyrogram.errors import (
     ChannelPrivate,
@@ -54,14 +56,31 @@ from Riakmaw.util.tg import (
 class Greeting(plugin.Plugin):
     name: ClassVar[str] = "Greetings"
     helpable: ClassVar[bool] = True
+    indexes: ClassVar[Mapping[str, Sequence[IndexModel]]] = {"WELCOME": [IndexModel("chat_id")]}
 
     db: util.db.AsyncCollection
-    chat_db: util.db.AsyncCollection
+    settings: util.db.SettingsCache
+    chat_settings: util.db.SettingsCache
     SEND: MutableMapping[int, Callable[..., Coroutine[Any, Any, Optional[Message]]]]
 
     async def on_load(self) -> None:
         self.db = self.bot.db.get_collection("WELCOME")
-        self.chat_db = self.bot.db.get_collection("CHATS")
+        # Previous greeting ids are written on every join, they are left out of the cache
+        self.settings = self.bot.settings_cache(
+            "WELCOME",
+            fields=(
+                "should_welcome",
+                "should_goodbye",
+                "clean_service",
+                "custom_welcome",
+                "custom_goodbye",
+                "text",
+                "button",
+                "type",
+                "file_id",
+            ),
+        )
+        self.chat_settings = self.bot.settings_cache("CHATS", fields=("action_topic",))
 
         self.SEND = {
             Types.TEXT.value: self.bot.client.send_message,
@@ -82,6 +101,10 @@ class Greeting(plugin.Plugin):
         if message.left_chat_member and message.left_chat_member.id == self.bot.uid:
             return
 
+        # The service message may arrive before the member update that invalidates
+        # the count, a join burst would be welcomed with a stale one
+        self.bot.get_chat_members_count.cache.invalidate(chat.id)  # type: ignore
+
         # Clean service both for left member and new member if active
         if await self.clean_service(chat.id):
             try:
@@ -113,7 +136,7 @@ class Greeting(plugin.Plugin):
         if not text:
             text = await self.text(chat.id, "default-goodbye", noformat=True)
 
-        formatted_text = await self._build_text(text, left_member, chat, self.bot.client)
+        formatted_text = await self._build_text(text, left_member, chat)
         try:
             msg = await self.bot.client.send_message(
                 chat.id,
@@ -153,9 +176,7 @@ class Greeting(plugin.Plugin):
                     else:
                         string = text
 
-                    formatted_text = await self._build_text(
-                        string, new_member, chat, self.bot.client
-                    )
+                    formatted_text = await self._build_text(string, new_member, chat)
 
                     if button:
                         button = build_button(button)
@@ -214,6 +235,7 @@ class Greeting(plugin.Plugin):
             {"chat_id": old_chat},
             {"$set": {"chat_id": new_chat}},
         )
+        self.settings.invalidate(old_chat, new_chat)
 
     async def on_plugin_backup(self, chat_id: int) -> MutableMapping[str, Any]:
         welcome = await self.db.find_one({"chat_id": chat_id}, {"_id": False})
@@ -221,16 +243,14 @@ class Greeting(plugin.Plugin):
 
     async def on_plugin_restore(self, chat_id: int, data: MutableMapping[str, Any]) -> None:
         await self.db.update_one({"chat_id": chat_id}, {"$set": data[self.name]}, upsert=True)
+        self.settings.invalidate(chat_id)
 
-    @staticmethod
-    async def _build_text(
-        text: str, user: User, chat: Chat, client: Optional[Client] = None
-    ) -> str:
+    async def _build_text(self, text: str, user: User, chat: Chat) -> str:
         first_name = user.first_name or ""  # Ensure first name is not None
         last_name = user.last_name
         full_name = first_name + last_name if last_name else first_name
         try:
-            count = await client.get_chat_members_count(chat.id) if client else "N/A"
+            count = await self.bot.get_chat_members_count(chat.id)
         except ChannelPrivate:
             count = "N/A"
 
@@ -248,24 +268,24 @@ class Greeting(plugin.Plugin):
     async def get_action_topic(self, chat: Chat) -> Optional[int]:
         if not chat.is_forum:
             return None
-        data = await self.chat_db.find_one({"chat_id": chat.id}, {"action_topic": True})
+        data = await self.chat_settings.get(chat.id)
         return data.get("action_topic") if data else None
 
     async def is_welcome(self, chat_id: int) -> bool:
         """Get chat welcome setting"""
-        active = await self.db.find_one({"chat_id": chat_id}, {"should_welcome": 1})
+        active = await self.settings.get(chat_id)
         return active.get("should_welcome", True) if active else True
 
     async def is_goodbye(self, chat_id: int) -> bool:
         """Get chat welcome setting"""
-        active = await self.db.find_one({"chat_id": chat_id}, {"should_goodbye": 1})
+        active = await self.settings.get(chat_id)
         return active.get("should_goodbye", True) if active else True
 
     async def welc_message(
         self, chat_id: int
     ) -> Tuple[Optional[str], Optional[Tuple[Tuple[str, str, bool]]], Optional[int], Optional[str]]:
         """Get chat welcome string"""
-        message = await self.db.find_one({"chat_id": chat_id})
+        message = await self.settings.get(chat_id)
         if message:
             # This checks data for old welcome schema
             # TODO: deprecate old schema on v3
@@ -273,14 +293,20 @@ class Greeting(plugin.Plugin):
                 text: str = message["custom_welcome"]
                 button: Optional[Button] = message.get("button")
                 message_type: Types = Types.TEXT
-                await self.db.delete_one({"chat_id": chat_id})
-                await self.set_custom_welcome(
-                    chat_id=chat_id,
-                    text=text,
-                    buttons=button,
-                    message_type=message_type,
-                    content=None,
+                # Rewrite the old fields in place, other settings of the chat are kept
+                await self.db.update_one(
+                    {"chat_id": chat_id, "custom_welcome": {"$exists": True}},
+                    {
+                        "$set": {
+                            "text": text,
+                            "button": button,
+                            "file_id": None,
+                            "type": message_type,
+                        },
+                        "$unset": {"custom_welcome": ""},
+                    },
                 )
+                self.settings.invalidate(chat_id)
                 self.log.info("Migrated old welcome message on %d to new schema.", chat_id)
                 return text, button, message_type, None
             else:
@@ -293,7 +319,7 @@ class Greeting(plugin.Plugin):
         return await self.text(chat_id, "default-welcome", noformat=True), None, None, None
 
     async def left_message(self, chat_id: int) -> str:
-        message = await self.db.find_one({"chat_id": chat_id}, {"custom_goodbye": 1})
+        message = await self.settings.get(chat_id)
         return (
             message.get(
                 "custom_goodbye", await self.text(chat_id, "default-goodbye", noformat=True)
@@ -304,7 +330,7 @@ class Greeting(plugin.Plugin):
 
     async def clean_service(self, chat_id: int) -> bool:
         """Fetch clean service setting"""
-        clean = await self.db.find_one({"chat_id": chat_id}, {"clean_service": 1})
+        clean = await self.settings.get(chat_id)
         if clean:
             return clean.get("clean_service", True)
 
@@ -331,10 +357,12 @@ class Greeting(plugin.Plugin):
             },
             upsert=True,
         )
+        self.settings.invalidate(chat_id)
 
     async def set_custom_goodbye(self, chat_id: int, text: str) -> None:
         """Set custom goodbye"""
         await self.db.update_one({"chat_id": chat_id}, {"$set": {"custom_goodbye": text}})
+        self.settings.invalidate(chat_id)
 
     async def del_custom_welcome(self, chat_id: int) -> None:
         """Delete custom welcome message"""
@@ -350,10 +378,12 @@ class Greeting(plugin.Plugin):
                 }
             },
         )
+        self.settings.invalidate(chat_id)
 
     async def del_custom_goodbye(self, chat_id: int) -> None:
         """Delete custom goodbye message"""
         await self.db.update_one({"chat_id": chat_id}, {"$unset": {"custom_goodbye": ""}})
+        self.settings.invalidate(chat_id)
 
     async def greeting_setting(self, chat_id: int, key: str, value: bool) -> None:
         """Turn on/off greetings in chats"""
@@ -361,6 +391,7 @@ class Greeting(plugin.Plugin):
             await self.db.update_one({"chat_id": chat_id}, {"$set": {key: False}}, upsert=True)
         else:
             await self.db.update_one({"chat_id": chat_id}, {"$unset": {key: ""}}, upsert=True)
+        self.settings.invalidate(chat_id)
 
     async def previous_welcome(self, chat_id: int, msg_id: int) -> Optional[int]:
         """Save latest welcome msg_id and return previous msg_id"""
@@ -402,7 +433,7 @@ class Greeting(plugin.Plugin):
             return await self.text(chat.id, "greetings-no-input")
 
         try:  # Try to build a text first to check message validity
-            await self._build_text(welc_text or "", ctx.author or self.bot.user, chat, self.bot.client)
+            await self._build_text(welc_text or "", ctx.author or self.bot.user, chat)
         except (KeyError, ValueError) as e:
             return await self.text(chat.id, "err-msg-format-parsing", err=e)
 
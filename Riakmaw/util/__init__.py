@@ -16,12 +16,20 @@
 
 from . import (  # skipcq: PY-W2000
     async_helper,
-    cache_limiter,
+    banlist,
+    batching,
+    cache,
+    compiled_filter,
     config,
     converter,
     db,
     error,
+    fed_index,
+    http,
+    memo,
     misc,
+    rate_limiter,
+    roster,
     system,
     tg,
     time,
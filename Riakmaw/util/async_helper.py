@@ -14,15 +14,174 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+
 import asyncio
 import functools
-from typing import Any, Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+from time import monotonic
+from typing import Any, Callable, Collection, Dict, Mapping, Optional, Set, TypeVar
 
 Result = TypeVar("Result")
 
+# Default number of threads of each executor pool
+POOL_SIZES = {
+    # Point queries on the message path
+    "db": min(32, (cpu_count() or 1) + 4),
+    # Cursor iteration, change streams get their own thread each (see open_executor)
+    "db-stream": 4,
+    # CPU bound work (parsing, model prediction)
+    "cpu": cpu_count() or 1,
+    # Everything else, sized like the default executor of the event loop
+    "misc": min(32, (cpu_count() or 1) + 4),
+}
+
+
+class Executor:
+    """Named thread pool that keeps queue depth and wait time metrics"""
+
+    name: str
+    size: int
+
+    submitted: int
+    started: int
+    completed: int
+    wait_total: float
+    wait_max: float
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+        self.submitted = self.started = self.completed = 0
+        self.wait_total = self.wait_max = 0.0
+        self._pool = ThreadPoolExecutor(size, thread_name_prefix=f"Riakmaw-{name}")
+
+    @property
+    def depth(self) -> int:
+        """Number of submitted calls waiting for a free thread"""
+        return self.submitted - self.started
+
+    def _wrap(self, func: Callable[[], Result]) -> Callable[[], Result]:
+        queued_at = monotonic()
+
+        def run() -> Result:
+            # Metrics are updated without a lock, a lost update only skews the numbers
+            wait = monotonic() - queued_at
+            self.started += 1
+            self.wait_total += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+
+            try:
+                return func()
+            finally:
+                self.completed += 1
+
+        return run
+
+    async def run(self, func: Callable[[], Result]) -> Result:
+        self.submitted += 1
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self._wrap(func))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "depth": self.depth,
+            "completed": self.completed,
+            "wait_avg": self.wait_total / self.started if self.started else 0.0,
+            "wait_max": self.wait_max,
+        }
+
+
+_executors: Dict[str, Executor] = {}
+_dedicated: Dict[str, Set[Executor]] = {}
+
+
+def configure_executors(sizes: Mapping[str, int]) -> None:
+    """Override the default pool sizes, must be called before the pools are used"""
+    for name, size in sizes.items():
+        if name not in POOL_SIZES:
+            raise ValueError(f"Unknown executor pool '{name}'")
+        if size < 1:
+            raise ValueError(f"Executor pool '{name}' size must be positive")
+
+        POOL_SIZES[name] = size
+
+
+def get_executor(pool: str) -> Executor:
+    try:
+        return _executors[pool]
+    except KeyError:
+        pass
+
+    try:
+        size = POOL_SIZES[pool]
+    except KeyError:
+        raise ValueError(f"Unknown executor pool '{pool}'") from None
+
+    executor = _executors[pool] = Executor(pool, size)
+    return executor
+
+
+def open_executor(name: str) -> Executor:
+    """Creates a single thread executor for a consumer that blocks for a long time.
+
+    Executors opened with the same name are reported together by :func:`executor_stats`,
+    release them with :func:`close_executor`.
+    """
+    executor = Executor(name, 1)
+    _dedicated.setdefault(name, set()).add(executor)
+    return executor
+
+
+def close_executor(executor: Executor) -> None:
+    executor.shutdown()
+    _dedicated.get(executor.name, set()).discard(executor)
+
+
+def _merge_stats(executors: Collection[Executor]) -> Dict[str, Any]:
+    started = sum(executor.started for executor in executors)
+    wait_total = sum(executor.wait_total for executor in executors)
+    return {
+        "size": sum(executor.size for executor in executors),
+        "depth": sum(executor.depth for executor in executors),
+        "completed": sum(executor.completed for executor in executors),
+        "wait_avg": wait_total / started if started else 0.0,
+        "wait_max": max(executor.wait_max for executor in executors),
+    }
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    stats = {name: executor.stats() for name, executor in _executors.items()}
+    for name, executors in _dedicated.items():
+        if executors:
+            stats[name] = _merge_stats(executors)
+
+    return stats
+
+
+def shutdown_executors() -> None:
+    for executor in _executors.values():
+        executor.shutdown()
+
+    for executors in _dedicated.values():
+        for executor in executors:
+            executor.shutdown()
+
+    _executors.clear()
+    _dedicated.clear()
+
+
+async def run_sync(
+    func: Callable[..., Result], *args: Any, pool: Optional[str] = None, **kwargs: Any
+) -> Result:
+    """Runs the given sync function (optionally with arguments) on a separate thread.
 
-async def run_sync(func: Callable[..., Result], *args: Any, **kwargs: Any) -> Result:
-    """Runs the given sync function (optionally with arguments) on a separate thread."""
+    The function is run on the named executor ``pool`` ('db', 'db-stream', 'cpu', 'misc'),
+    defaults to 'misc'.
+    """
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+    return await get_executor(pool or "misc").run(functools.partial(func, *args, **kwargs))
@@ -0,0 +1,276 @@
+"""Local mirrors of external ban lists"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, Optional, Union
+
+import aiohttp
+
+from .async_helper import run_sync
+from .http import HttpClient
+
+__all__ = ["BanList", "BanListMirror", "parse_export"]
+
+log = logging.getLogger("banlist")
+
+MAGIC = b"RBL1"
+# Magic and number of ids, the sorted int64 ids follow
+HEADER = struct.Struct("<4sQ")
+# Exports are large, they get longer than the default request timeout
+EXPORT_TIMEOUT = aiohttp.ClientTimeout(total=300, connect=10)
+
+
+class BanList:
+    """Immutable set of ids kept as a sorted int64 array.
+
+    Saved lists are memory-mapped when opened, so loading them on start is
+    instant and the pages are shared with the page cache. Membership is a
+    binary search, no per-id Python object is ever created.
+    """
+
+    __slots__ = ("_ids", "_mmap")
+
+    _ids: Union["array[int]", memoryview]
+    _mmap: Optional[mmap.mmap]
+
+    def __init__(
+        self, ids: Union["array[int]", memoryview], mapped: Optional[mmap.mmap] = None
+    ) -> None:
+        self._ids = ids
+        self._mmap = mapped
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "BanList":
+        return cls(array("q", sorted(set(ids))))
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> "BanList":
+        """Memory-map a list written by :meth:`~save`"""
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mapped) >= HEADER.size:
+            magic, count = HEADER.unpack_from(mapped)
+            if magic == MAGIC and len(mapped) == HEADER.size + count * 8:
+                return cls(memoryview(mapped)[HEADER.size :].cast("q"), mapped)
+
+        mapped.close()
+        raise ValueError(f"{path} is not a ban list")
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the list, the file is replaced atomically"""
+        temp = f"{path}.tmp"
+        with open(temp, "wb") as file:
+            file.write(HEADER.pack(MAGIC, len(self._ids)))
+            file.write(self._ids.tobytes())
+
+        os.replace(temp, path)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            if isinstance(self._ids, memoryview):
+                self._ids.release()
+            self._mmap.close()
+            self._mmap = None
+
+        self._ids = array("q")
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+
+        index = bisect_left(self._ids, value)
+        return index < len(self._ids) and self._ids[index] == value
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BanList):
+            return NotImplemented
+
+        return self._ids.tobytes() == other._ids.tobytes()
+
+    __hash__ = None  # type: ignore
+
+
+def parse_export(data: bytes) -> List[int]:
+    """Ids of a ban list export.
+
+    JSON exports are either a list of ids or of objects with an ``id``/``user_id``,
+    optionally wrapped in a ``result`` object. Anything else is read as CSV or plain
+    lines with the id on the first column, like the CAS export. Lines that don't
+    start with an id (headers) are skipped.
+    """
+    if data.lstrip()[:1] in {b"[", b"{"}:
+        payload: Any = json.loads(data)
+        if isinstance(payload, dict):
+            payload = payload.get("result", payload.get("ids", []))
+
+        ids = []
+        for item in payload:
+            if isinstance(item, dict):
+                item = item.get("id", item.get("user_id"))
+            try:
+                ids.append(int(item))
+            except (TypeError, ValueError):
+                continue
+
+        return ids
+
+    ids = []
+    for row in csv.reader(io.StringIO(data.decode("utf-8", "replace"))):
+        if not row:
+            continue
+        try:
+            ids.append(int(row[0]))
+        except ValueError:
+            continue
+
+    return ids
+
+
+class BanListMirror:
+    """A :class:`BanList` mirrored from an export URL or a local file.
+
+    The last list is kept on disk and mapped back on :meth:`~load`, then
+    :meth:`~run` refreshes it every ``interval`` seconds. URLs are fetched with
+    ``If-Modified-Since`` and an unchanged list is never rewritten. A failing
+    source keeps the last list in use.
+    """
+
+    name: str
+    source: str
+    path: Path
+    interval: float
+    headers: Mapping[str, str]
+    banlist: Optional[BanList]
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        path: Union[str, Path],
+        interval: float,
+        *,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.name = name
+        self.source = source
+        self.path = Path(path)
+        self.interval = interval
+        self.headers = headers or {}
+        self.banlist = None
+
+    def __contains__(self, value: object) -> bool:
+        return self.banlist is not None and value in self.banlist
+
+    def __len__(self) -> int:
+        return len(self.banlist) if self.banlist is not None else 0
+
+    @property
+    def ready(self) -> bool:
+        return self.banlist is not None
+
+    def load(self) -> bool:
+        """Map the list saved by the last refresh"""
+        try:
+            self._swap(BanList.open(self.path))
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            log.warning("Ignoring the saved %s ban list: %s", self.name, e)
+            return False
+
+        return True
+
+    def _swap(self, banlist: BanList) -> None:
+        old, self.banlist = self.banlist, banlist
+        if old is not None:
+            old.close()
+
+    def _saved_at(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    async def _fetch(self, http: HttpClient) -> Optional[bytes]:
+        saved_at = self._saved_at() if self.ready else None
+        if not self.source.startswith(("http://", "https://")):
+            if saved_at is not None and os.stat(self.source).st_mtime <= saved_at:
+                return None
+
+            return await run_sync(Path(self.source).read_bytes)
+
+        headers = dict(self.headers)
+        if saved_at is not None:
+            headers["If-Modified-Since"] = formatdate(saved_at, usegmt=True)
+        async with http.get(self.source, headers=headers, timeout=EXPORT_TIMEOUT) as resp:
+            if resp.status == 304:
+                return None
+
+            resp.raise_for_status()
+            return await resp.read()
+
+    def _build(self, data: bytes) -> Optional[BanList]:
+        """Parse an export into a list, None when it has the same ids as the current one"""
+        banlist = BanList.from_ids(parse_export(data))
+        return None if banlist == self.banlist else banlist
+
+    async def refresh(self, http: HttpClient) -> bool:
+        """Fetch the source again, returns True when the list changed"""
+        data = await self._fetch(http)
+        if data is None:
+            return False
+
+        # Sorting and comparing millions of ids would block the loop as well
+        banlist = await run_sync(self._build, data, pool="cpu")
+        if banlist is None:
+            self.path.touch()
+            return False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        await run_sync(banlist.save, self.path)
+        log.info("Loaded %d ids of the %s ban list", len(banlist), self.name)
+        # Map the saved file rather than keeping the built array in memory
+        self._swap(BanList.open(self.path))
+        return True
+
+    async def run(self, http: HttpClient) -> None:
+        while True:
+            try:
+                await self.refresh(http)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError) as e:
+                log.warning("Failed to refresh the %s ban list: %s", self.name, e)
+
+            await asyncio.sleep(self.interval)
+
+    def close(self) -> None:
+        if self.banlist is not None:
+            self.banlist.close()
+            self.banlist = None
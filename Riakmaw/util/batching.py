@@ -0,0 +1,210 @@
+"""Micro-batched model prediction"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from time import monotonic
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .async_helper import run_sync
+
+__all__ = ["BatchPredictor", "predict_batch"]
+
+log = logging.getLogger("batching")
+
+# Model of a prediction worker process, set once when the worker starts
+_model: Any = None
+
+
+def _init_worker(model: Any) -> None:
+    global _model  # skipcq: PYL-W0603
+    _model = model
+
+
+def _predict_worker(texts: Sequence[str]) -> List[Any]:
+    return predict_batch(_model, texts)
+
+
+def predict_batch(model: Any, texts: Sequence[str]) -> List[Any]:
+    """Predict the texts in a single call when the model has a vectorized
+    ``predict_batch``, one by one with :meth:`Classifier.predict` otherwise.
+    """
+    batch = getattr(model, "predict_batch", None)
+    if batch is not None:
+        return list(batch(texts))
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.gather(*(model.predict(text) for text in texts)))
+    finally:
+        loop.close()
+
+
+class BatchPredictor:
+    """Runs the predictions of a :obj:`~Riakmaw.util.types.Classifier` in micro-batches.
+
+    Texts are queued until ``max_batch`` of them are waiting or the oldest one
+    waited ``max_delay`` seconds. The batch is then predicted on a process pool
+    whose workers got their own copy of the model once, when they started.
+    Without workers, or with a model that can't be pickled, batches are
+    predicted in this process instead.
+    """
+
+    workers: int
+    max_batch: int
+    max_delay: float
+    model: Any
+
+    batches: int
+    predicted: int
+    busy: float
+
+    _pool: Optional[ProcessPoolExecutor]
+    _pending: List[Tuple[str, "asyncio.Future[Any]"]]
+    _timer: Optional[asyncio.TimerHandle]
+    _tasks: Set["asyncio.Task[None]"]
+
+    def __init__(
+        self, model: Any, *, workers: int = 1, max_batch: int = 32, max_delay: float = 0.005
+    ) -> None:
+        self.model = model
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self.batches = self.predicted = 0
+        self.busy = 0.0
+
+        self._pool = None
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self._pool is None and self.workers > 0:
+            try:
+                pickle.dumps(self.model)
+            except Exception as err:  # skipcq: PYL-W0703
+                log.warning(
+                    "Model can't be sent to prediction workers, predicting in-process: %s", err
+                )
+                self.workers = 0
+                return None
+
+            # Spawned, forking a process that runs threads isn't safe
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model,),
+            )
+
+        return self._pool
+
+    def _shutdown_pool(self, cancel: bool = False) -> None:
+        if self._pool is not None:
+            # Batches already submitted still finish unless cancelled
+            self._pool.shutdown(wait=False, cancel_futures=cancel)
+            self._pool = None
+
+    async def _predict(self, texts: List[str]) -> List[Any]:
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    pool, _predict_worker, texts
+                )
+            except BrokenProcessPool:
+                log.warning("Prediction worker died, predicting the batch in-process")
+                # A new pool is started on the next batch
+                self._shutdown_pool()
+
+        if hasattr(self.model, "predict_batch"):
+            return await run_sync(predict_batch, self.model, texts, pool="cpu")
+
+        return await asyncio.gather(*(self.model.predict(text) for text in texts))
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[Any]"]]) -> None:
+        start = monotonic()
+        try:
+            results = await self._predict([text for text, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as err:  # skipcq: PYL-W0703
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        self.batches += 1
+        self.predicted += len(batch)
+        self.busy += monotonic() - start
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def predict(self, text: str) -> Any:
+        """Prediction of a single text, resolved when its batch is done"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def reload(self, model: Any) -> None:
+        """Swap the model, workers are restarted with it on the next batch"""
+        self.model = model
+        self._shutdown_pool()
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        self._shutdown_pool(cancel=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "batches": self.batches,
+            "predicted": self.predicted,
+            "batch_avg": self.predicted / self.batches if self.batches else 0.0,
+            "batch_time_avg": self.busy / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,288 @@
+"""Async TTL cache with request coalescing"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+from collections import OrderedDict, deque
+from functools import wraps
+from time import monotonic
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    Hashable,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+__all__ = ["AsyncCache", "RecentWindow", "cached"]
+
+Result = TypeVar("Result")
+AsyncFunc = Callable[..., Coroutine[Any, Any, Result]]
+
+_KWARGS_MARK = object()
+
+
+def _make_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    if not kwargs:
+        return args
+
+    return (*args, _KWARGS_MARK, *sorted(kwargs.items()))
+
+
+class AsyncCache:
+    """Bounded LRU of coroutine results.
+
+    Concurrent misses of the same key share a single call. Exceptions listed
+    in ``negative`` are remembered for ``negative_ttl`` seconds and raised
+    again on hits, anything else is not cached. ``ttl_of`` may pick the TTL
+    of each result, e.g. to keep positive lookups longer than empty ones.
+    """
+
+    ttl: float
+    maxsize: int
+    negative: Tuple[Type[BaseException], ...]
+    negative_ttl: float
+    ttl_of: Optional[Callable[[Any], float]]
+
+    hits: int
+    misses: int
+    coalesced: int
+    evictions: int
+
+    # key -> (expires at, is an exception, value)
+    _entries: "OrderedDict[Hashable, Tuple[float, bool, Any]]"
+    _pending: MutableMapping[Hashable, "asyncio.Future[Any]"]
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        maxsize: int = 1024,
+        *,
+        negative: Tuple[Type[BaseException], ...] = (),
+        negative_ttl: Optional[float] = None,
+        ttl_of: Optional[Callable[[Any], float]] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.negative = negative
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.ttl_of = ttl_of
+
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, bool, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry[0] <= monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Hashable, is_error: bool, value: Any) -> None:
+        if is_error:
+            ttl = self.negative_ttl
+        else:
+            ttl = self.ttl if self.ttl_of is None else self.ttl_of(value)
+        self._entries[key] = (monotonic() + ttl, is_error, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_call(
+        self, key: Hashable, func: AsyncFunc[Result], *args: Any, **kwargs: Any
+    ) -> Result:
+        entry = self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            _, is_error, value = entry
+            if is_error:
+                raise value.with_traceback(None)
+
+            return value
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            if isinstance(err, self.negative):
+                self._store(key, True, err)
+
+            future.set_exception(err)
+            # Mark retrieved, waiters already got the exception
+            future.exception()
+            raise
+        else:
+            self._store(key, False, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._pending[key]
+
+    def invalidate(self, *args: Any, **kwargs: Any) -> None:
+        """Drop the entry of the given call arguments"""
+        self._entries.pop(_make_key(args, kwargs), None)
+
+    def invalidate_where(self, predicate: Callable[[Tuple[Any, ...]], bool]) -> None:
+        """Drop every entry whose call arguments matches the predicate"""
+        for key in [key for key in self._entries if predicate(key)]:  # type: ignore
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            # Coalesced calls didn't reach the source either
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+class RecentWindow:
+    """Per-chat sets of ids seen within the last ``window`` seconds.
+
+    Ids are kept in ``buckets`` generations of ``window / buckets`` seconds and a
+    whole generation expires at once, so there is no deadline to track per id.
+    An id expires between ``window - window / buckets`` and ``window`` seconds
+    after it was added. Lookups don't extend the life of an id.
+    """
+
+    window: float
+    span: float
+
+    # (started at, chat id -> ids, id -> chat ids), oldest first
+    _generations: Deque[Tuple[float, Dict[int, Set[int]], Dict[int, Set[int]]]]
+
+    def __init__(self, window: float, buckets: int = 4) -> None:
+        self.window = window
+        self.span = window / buckets
+        self._generations = deque()
+
+    def __len__(self) -> int:
+        return sum(len(ids) for _, chats, _ in self._generations for ids in chats.values())
+
+    def _expire(self, now: float) -> None:
+        generations = self._generations
+        while generations and generations[0][0] + self.window <= now:
+            generations.popleft()
+
+    def add(self, chat_id: int, value: int, now: Optional[float] = None) -> None:
+        if self.window <= 0:
+            return
+
+        now = monotonic() if now is None else now
+        self._expire(now)
+        if not self._generations or self._generations[-1][0] + self.span <= now:
+            self._generations.append((now, {}, {}))
+
+        _, chats, values = self._generations[-1]
+        chats.setdefault(chat_id, set()).add(value)
+        values.setdefault(value, set()).add(chat_id)
+
+    def contains(self, chat_id: int, value: int, now: Optional[float] = None) -> bool:
+        self._expire(monotonic() if now is None else now)
+        for _, chats, _ in self._generations:
+            ids = chats.get(chat_id)
+            if ids and value in ids:
+                return True
+
+        return False
+
+    def discard(self, chat_id: int, value: int) -> None:
+        for _, chats, values in self._generations:
+            ids = chats.get(chat_id)
+            if ids:
+                ids.discard(value)
+
+            chat_ids = values.get(value)
+            if chat_ids:
+                chat_ids.discard(chat_id)
+
+    def discard_value(self, value: int) -> None:
+        """Drop the id from every chat"""
+        for _, chats, values in self._generations:
+            for chat_id in values.pop(value, ()):
+                chats[chat_id].discard(value)
+
+    def discard_chat(self, chat_id: int) -> None:
+        for _, chats, values in self._generations:
+            for value in chats.pop(chat_id, ()):
+                values[value].discard(chat_id)
+
+    def clear(self) -> None:
+        self._generations.clear()
+
+
+def cached(
+    ttl: float = 60,
+    maxsize: int = 1024,
+    *,
+    negative: Tuple[Type[BaseException], ...] = (),
+    negative_ttl: Optional[float] = None,
+    noself: bool = False,
+) -> Callable[[AsyncFunc[Result]], AsyncFunc[Result]]:
+    """Cache the results of a coroutine function.
+
+    The :obj:`AsyncCache` is exposed as the ``cache`` attribute of the decorated
+    function. When ``noself`` is True the first argument is left out of the key,
+    so methods are invalidated with their call arguments only.
+    """
+
+    def decorator(func: AsyncFunc[Result]) -> AsyncFunc[Result]:
+        cache = AsyncCache(ttl, maxsize, negative=negative, negative_ttl=negative_ttl)
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Result:
+            key = _make_key(args[1:] if noself else args, kwargs)
+            return await cache.get_or_call(key, func, *args, **kwargs)
+
+        wrapper.cache = cache  # type: ignore
+        return wrapper
+
+    return decorator
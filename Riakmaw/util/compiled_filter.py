@@ -0,0 +1,161 @@
+"""Compiled pyrogram filter trees"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import inspect
+from typing import Any, Callable, Hashable, List, MutableMapping, Tuple, Type, Union
+
+from pyrogram.client import Client
+from pyrogram.filters import AndFilter, Filter, InvertFilter, OrFilter
+
+from Riakmaw.util.types import CustomFilter
+
+__all__ = ["CompiledFilter", "compile_filter"]
+
+MEMO_ATTR = "_filter_memo"
+
+# (memo key, is coroutine function, evaluator)
+Node = Tuple[Hashable, bool, Callable[[Client, Any], Any]]
+
+
+def memo_of(update: Any) -> MutableMapping[Hashable, Tuple[bool, Any]]:
+    memo = getattr(update, MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        try:
+            setattr(update, MEMO_ATTR, memo)
+        except AttributeError:  # Can't attach into the update, memo will just be dropped
+            pass
+
+    return memo
+
+
+def _memoize(node: Node) -> Node:
+    key, is_async, func = node
+    if not is_async:  # Sync nodes are cheap enough to be re-evaluated
+        return node
+
+    async def evaluate(client: Client, update: Any) -> bool:
+        memo = memo_of(update)
+        try:
+            result, matches = memo[key]
+        except KeyError:
+            result = bool(await func(client, update))
+            memo[key] = (result, getattr(update, "matches", None))
+        else:
+            # Regex filters return their matches through the update
+            if matches is not None:
+                update.matches = matches
+
+        return result
+
+    return key, True, evaluate
+
+
+def _flatten(flt: Filter, kind: Type[Union[AndFilter, OrFilter]]) -> List[Filter]:
+    if isinstance(flt, CompiledFilter):
+        flt = flt.source
+
+    if type(flt) is kind:  # skipcq: PYL-C0123
+        return _flatten(flt.base, kind) + _flatten(flt.other, kind)
+
+    return [flt]
+
+
+def _compile_chain(flt: Union[AndFilter, OrFilter]) -> Node:
+    kind = type(flt)
+    # AndFilter stops on the first falsy child, OrFilter on the first truthy one
+    stop_on = kind is OrFilter
+    children = [_compile(child) for child in _flatten(flt, kind)]
+    key = (kind.__name__, *(child[0] for child in children))
+    steps = [(is_async, func) for _, is_async, func in children]
+
+    if not any(is_async for is_async, _ in steps):
+
+        def evaluate_sync(client: Client, update: Any) -> bool:
+            for _, func in steps:
+                if bool(func(client, update)) is stop_on:
+                    return stop_on
+
+            return not stop_on
+
+        return key, False, evaluate_sync
+
+    async def evaluate(client: Client, update: Any) -> bool:
+        for is_async, func in steps:
+            result = await func(client, update) if is_async else func(client, update)
+            if bool(result) is stop_on:
+                return stop_on
+
+        return not stop_on
+
+    return _memoize((key, True, evaluate))
+
+
+def _compile_invert(flt: InvertFilter) -> Node:
+    base_key, is_async, func = _compile(flt.base)
+    key = ("InvertFilter", base_key)
+
+    if not is_async:
+        return key, False, lambda client, update: not func(client, update)
+
+    async def evaluate(client: Client, update: Any) -> bool:
+        return not await func(client, update)
+
+    return _memoize((key, True, evaluate))
+
+
+def _compile(flt: Filter) -> Node:
+    if isinstance(flt, CompiledFilter):
+        return flt.node
+    if isinstance(flt, (AndFilter, OrFilter)):
+        return _compile_chain(flt)
+    if isinstance(flt, InvertFilter):
+        return _compile_invert(flt)
+
+    node = (id(flt), inspect.iscoroutinefunction(flt.__call__), flt)
+    # Bot aware filters are usually doing API calls, so it's worth to remember them
+    return _memoize(node) if isinstance(flt, CustomFilter) else node
+
+
+class CompiledFilter(Filter):
+    """A filter tree flattened into short-circuit evaluators.
+
+    Nested :obj:`~AndFilter`/:obj:`~OrFilter` chains are evaluated in a single loop,
+    sync filters run inline instead of on the executor, and results of identical
+    sub-trees are remembered on the update so they are evaluated once per update.
+    """
+
+    source: Filter
+    node: Node
+
+    def __init__(self, source: Filter) -> None:
+        self.source = source
+        self.node = _compile(source)
+
+    async def __call__(self, client: Client, update: Any) -> bool:
+        _, is_async, func = self.node
+        return bool(await func(client, update) if is_async else func(client, update))
+
+    def __repr__(self) -> str:
+        return f"<CompiledFilter of {type(self.source).__name__}>"
+
+
+def compile_filter(flt: Filter) -> CompiledFilter:
+    """Compile a filter tree, already compiled filters are returned as is."""
+    if isinstance(flt, CompiledFilter):
+        return flt
+
+    return CompiledFilter(flt)
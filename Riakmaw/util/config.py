@@ -13,11 +13,24 @@ class Config:
     BOT_TOKEN: str
     OWNER_ID: int
     WORKERS: int
+    DISPATCH_SHARDS: int
+    DISPATCH_QUEUE_SIZE: int
+    EXECUTOR_POOLS: dict[str, int]
     DOWNLOAD_PATH: Optional[str]
+    FEDRESTORE_CHUNK_SIZE: int
 
     DB_URI: str
+    DB_BACKEND: str
 
     SW_API: Optional[str]
+    BANLIST_PATH: str
+    CAS_EXPORT: Optional[str]
+    SW_EXPORT: Optional[str]
+    BANLIST_REFRESH: int
+    SPAMSHIELD_WINDOW: int
+    PREDICT_WORKERS: int
+    PREDICT_BATCH_SIZE: int
+    PREDICT_BATCH_DELAY: int
     LOG_CHANNEL: Optional[str]
     ALERT_LOG: Optional[str]
 
@@ -36,13 +49,31 @@ class Config:
         self.BOT_TOKEN = getenv("BOT_TOKEN", "")
         self.OWNER_ID = int(getenv("OWNER_ID", 0))
         self.WORKERS = int(getenv("WORKERS", min(32, (cpu_count() or 0) + 4)))
+        self.DISPATCH_SHARDS = int(getenv("DISPATCH_SHARDS", 0))
+        self.DISPATCH_QUEUE_SIZE = int(getenv("DISPATCH_QUEUE_SIZE", 100))
+        self.EXECUTOR_POOLS = {
+            name.strip(): int(size)
+            for name, size in (
+                pool.split("=", 1) for pool in getenv("EXECUTOR_POOLS", "").split(";") if pool.strip()
+            )
+        }
         self.DOWNLOAD_PATH = getenv("DOWNLOAD_PATH", "./downloads")
+        self.FEDRESTORE_CHUNK_SIZE = int(getenv("FEDRESTORE_CHUNK_SIZE", 1000))
 
         self.DB_URI = getenv("DB_URI", "")
+        self.DB_BACKEND = getenv("DB_BACKEND", "thread").lower()
 
         self.LOG_CHANNEL = getenv("LOG_CHANNEL")
         self.ALERT_LOG = getenv("ALERT_LOG")
         self.SW_API = getenv("SW_API")
+        self.BANLIST_PATH = getenv("BANLIST_PATH", "./banlists")
+        self.CAS_EXPORT = getenv("CAS_EXPORT", "https://api.cas.chat/export.csv") or None
+        self.SW_EXPORT = getenv("SW_EXPORT") or None
+        self.BANLIST_REFRESH = int(getenv("BANLIST_REFRESH", 3600))
+        self.SPAMSHIELD_WINDOW = int(getenv("SPAMSHIELD_WINDOW", 900))
+        self.PREDICT_WORKERS = int(getenv("PREDICT_WORKERS", 1))
+        self.PREDICT_BATCH_SIZE = int(getenv("PREDICT_BATCH_SIZE", 32))
+        self.PREDICT_BATCH_DELAY = int(getenv("PREDICT_BATCH_DELAY", 5))
 
         self.LOGIN_URL = getenv("LOGIN_URL")
         self.PLUGIN_FLAG = list(filter(None, [i.strip() for i in getenv("PLUGIN_FLAG", "").split(";")]))
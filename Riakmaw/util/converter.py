@@ -17,7 +17,18 @@
 import inspect
 from functools import partial
 from types import FunctionType
-from typing import Any, Dict, List, MutableMapping, Optional, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pyrogram import types
 from pyrogram.client import Client
@@ -31,6 +42,7 @@ __all__ = [
     "UserConverter",
     "ChatConverter",
     "ChatMemberConverter",
+    "InvocationPlan",
     "parse_arguments",
 ]
 
@@ -87,7 +99,7 @@ class UserConverter(EntityConverter):
     async def __call__(self, ctx: Context, arg: str) -> Optional[types.User]:
         if arg.isdigit() or arg.startswith("@"):
             try:
-                user = await ctx.bot.client.get_users(arg)
+                user = await ctx.bot.get_users(arg)
                 if isinstance(user, types.User):
                     return user
 
@@ -108,7 +120,7 @@ class ChatConverter(Converter):
 
     async def __call__(self, ctx: Context, args: str) -> types.Chat:
         try:
-            chat = await ctx.bot.client.get_chat(args)
+            chat = await ctx.bot.get_chat(args)
             if isinstance(chat, types.Chat):
                 return chat
 
@@ -164,11 +176,19 @@ def _get_default(param: inspect.Parameter, default: Any = None) -> Union[Any, No
     return param.default if param.default is not param.empty else default
 
 
-async def transform(ctx: Context, param: inspect.Parameter, arg: str) -> Any:
+Transformer = Callable[[Context, str], Coroutine[Any, Any, Any]]
+
+
+def _build_transformer(param: inspect.Parameter) -> Transformer:
+    """Resolve the converter of a parameter once, so invocations only run the conversion."""
     converter = param.annotation
 
     if converter is param.empty:
-        return arg
+
+        async def identity(_: Context, arg: str) -> str:
+            return arg
+
+        return identity
 
     # Check if the annotation was an `Optional` or `Union` type.
     # This type hinting make a parsing ambiguities.
@@ -181,10 +201,18 @@ async def transform(ctx: Context, param: inspect.Parameter, arg: str) -> Any:
             converter = converter.__args__[0]
 
     if isinstance(converter, (FunctionType, partial)):
-        if inspect.iscoroutinefunction(converter):
-            return await converter(arg)
+        func = converter
+        if inspect.iscoroutinefunction(func):
+
+            async def call_async(_: Context, arg: str) -> Any:
+                return await func(arg)
+
+            return call_async
+
+        async def call(_: Context, arg: str) -> Any:
+            return func(arg)
 
-        return converter(arg)
+        return call
 
     try:
         module = converter.__module__
@@ -195,49 +223,107 @@ async def transform(ctx: Context, param: inspect.Parameter, arg: str) -> Any:
             converter = CONVERTER_MAP.get(converter, converter)
 
     if inspect.isclass(converter) and issubclass(converter, Converter):
-        try:
-            return await converter()(ctx, arg)
-        except ConversionError as err:
-            return _get_default(param, err)
+        converter_cls = converter
+
+        async def convert(ctx: Context, arg: str) -> Any:
+            try:
+                return await converter_cls()(ctx, arg)
+            except ConversionError as err:
+                return _get_default(param, err)
+
+        return convert
 
     if converter is bool:
+
+        async def convert_bool(_: Context, arg: str) -> Any:
+            try:
+                return _bool_converter(arg)
+            except BadBoolArgument as err:
+                return _get_default(param, err)
+
+        return convert_bool
+
+    target = converter
+
+    async def convert_type(_: Context, arg: str) -> Any:
         try:
-            return _bool_converter(arg)
-        except BadBoolArgument as err:
+            return target(arg)
+        except ValueError as err:
             return _get_default(param, err)
 
-    try:
-        return converter(arg)
-    except ValueError as err:
-        return _get_default(param, err)
+    return convert_type
+
+
+async def transform(ctx: Context, param: inspect.Parameter, arg: str) -> Any:
+    return await _build_transformer(param)(ctx, arg)
+
+
+class InvocationPlan:
+    """Precomputed argument parsing of a command function.
+
+    Built once when the command is registered, so the signature and the
+    annotations don't need to be inspected on every invocation.
+
+    Attributes:
+        converters (`list`): Ordered transformer and default value of positional arguments.
+        consumer (`str`, *Optional*): Keyword-only argument consuming the remaining text.
+        error (`BadArgument`, *Optional*): Raised on invocation for unsupported signatures.
+    """
+
+    __slots__ = ("converters", "consumer", "error")
+
+    converters: List[Tuple[Transformer, Any]]
+    consumer: Optional[str]
+    error: Optional[BadArgument]
+
+    def __init__(self, func: CommandFunc, sig: Optional[inspect.Signature] = None) -> None:
+        self.converters = []
+        self.consumer = None
+        self.error = None
+
+        if sig is None:
+            sig = inspect.signature(func)
+
+        items = iter(sig.parameters.items())
+        # skip Context argument
+        next(items, None)
+        for name, param in items:
+            if param.kind in (param.POSITIONAL_OR_KEYWORD, param.POSITIONAL_ONLY):
+                self.converters.append((_build_transformer(param), _get_default(param)))
+            elif param.kind == param.KEYWORD_ONLY:
+                self.consumer = name
+                break
+            elif param.kind in {param.VAR_POSITIONAL, param.VAR_KEYWORD}:
+                self.error = BadArgument(
+                    f"Unsuported {param.kind} parameter conversion "
+                    f"Found '*{name}' on '{func.__name__}'"
+                )
+                break
+
+    async def parse(self, ctx: Context) -> Tuple[List[Any], Dict[Any, Any]]:
+        if self.error is not None:
+            raise self.error
+
+        args = []  # type: List[Any]
+        kwargs = {}  # type: Dict[Any, Any]
+        if not self.converters and self.consumer is None:
+            return args, kwargs
+
+        to_convert = ctx.args
+        for idx, (converter, default) in enumerate(self.converters):
+            if idx < len(to_convert):
+                args.append(await converter(ctx, to_convert[idx]))
+            else:
+                args.append(default)
+
+        if self.consumer is not None:
+            # Consume remaining text to the kwargs
+            kwargs[self.consumer] = " ".join(to_convert[len(self.converters) :]).strip()
+
+        return args, kwargs
 
 
 async def parse_arguments(
     sig: inspect.Signature, ctx: Context, func: CommandFunc
 ) -> Tuple[List[Any], Dict[Any, Any]]:
-    to_convert = ctx.args
-    args = []  # type: List[Any]
-    kwargs = {}  # type: Dict[Any, Any]
-    idx = 0
-    items = iter(sig.parameters.items())
-
-    # skip Context argument
-    next(items)  # skipcq: PTC-W0063
-    for name, param in items:
-        if param.kind in (param.POSITIONAL_OR_KEYWORD, param.POSITIONAL_ONLY):
-            try:
-                result = await transform(ctx, param, to_convert[idx])
-            except IndexError:
-                result = _get_default(param)
-            args.append(result)
-            idx += 1
-        elif param.kind == param.KEYWORD_ONLY:
-            # Consume remaining text to the kwargs
-            kwargs[name] = " ".join(to_convert[idx:]).strip()
-            break
-        elif param.kind in {param.VAR_POSITIONAL, param.VAR_KEYWORD}:
-            raise BadArgument(
-                f"Unsuported {param.kind} parameter conversion "
-                f"Found '*{name}' on '{func.__name__}'"
-            )
-    return args, kwargs
+    return await InvocationPlan(func, sig).parse(ctx)
@@ -14,9 +14,28 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from .change_stream import (  # skipcq: PY-W2000
+    change_stream_backoff,
+    change_stream_unsupported,
+)
 from .client import AsyncClient  # skipcq: PY-W2000
 from .collection import AsyncCollection  # skipcq: PY-W2000
 from .cursor import AsyncCursor  # skipcq: PY-W2000
 from .db import AsyncDatabase  # skipcq: PY-W2000
+from .indexes import merge_indexes  # skipcq: PY-W2000
+from .native import NativeClient  # skipcq: PY-W2000
+from .settings_cache import SettingsCache  # skipcq: PY-W2000
+from .write_behind import WriteBehind  # skipcq: PY-W2000
 
-__all__ = ["AsyncClient", "AsyncCollection", "AsyncCursor", "AsyncDatabase"]
+__all__ = [
+    "AsyncClient",
+    "AsyncCollection",
+    "AsyncCursor",
+    "AsyncDatabase",
+    "NativeClient",
+    "SettingsCache",
+    "WriteBehind",
+    "change_stream_backoff",
+    "change_stream_unsupported",
+    "merge_indexes",
+]
@@ -14,11 +14,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from functools import partial
 from typing import TYPE_CHECKING, Any, List, Literal, Mapping, Optional, Union
 
 from bson.timestamp import Timestamp
 from pymongo.change_stream import ChangeStream
 from pymongo.collation import Collation
+from pymongo.errors import OperationFailure, PyMongoError
 
 from Riakmaw import util
 
@@ -30,6 +32,22 @@ if TYPE_CHECKING:
     from .collection import AsyncCollection
     from .db import AsyncDatabase
 
+# Server errors of deployments without change streams: not a replica set, unknown stage
+UNSUPPORTED_CODES = frozenset({40573, 40324})
+# Seconds before a lost stream is opened again, doubled on every failure up to the max
+RETRY_DELAY = 1.0
+RETRY_DELAY_MAX = 60.0
+
+
+def change_stream_unsupported(error: PyMongoError) -> bool:
+    """Whether opening a change stream failed because the deployment can't have any"""
+    return isinstance(error, OperationFailure) and error.code in UNSUPPORTED_CODES
+
+
+def change_stream_backoff(failures: int) -> float:
+    """Seconds to wait before watching again after ``failures`` failures in a row"""
+    return min(RETRY_DELAY_MAX, RETRY_DELAY * 2**failures)
+
 
 class AsyncChangeStream(AsyncBase):
     """AsyncIO :obj:`~ChangeStream`
@@ -41,6 +59,8 @@ class AsyncChangeStream(AsyncBase):
 
     dispatch: ChangeStream
 
+    _executor: Optional[util.async_helper.Executor]
+
     def __init__(
         self,
         target: Union["AsyncClient", "AsyncDatabase", "AsyncCollection"],
@@ -71,6 +91,9 @@ class AsyncChangeStream(AsyncBase):
             "full_document_before_change": full_document_before_change,
         }
 
+        # Waiting for changes blocks a thread for as long as the stream is open
+        self._executor = None
+
         super().__init__(None)  # type: ignore
 
     def __aiter__(self) -> "AsyncChangeStream":
@@ -97,13 +120,24 @@ class AsyncChangeStream(AsyncBase):
 
     async def _init(self) -> ChangeStream:
         if not self.dispatch:
-            self.dispatch = await util.run_sync(self._target.dispatch.watch, **self._options)
+            if self._executor is None:
+                self._executor = util.async_helper.open_executor("change-stream")
+
+            self.dispatch = await self._executor.run(
+                partial(self._target.dispatch.watch, **self._options)
+            )
 
         return self.dispatch
 
     async def close(self):
-        if self.dispatch:
-            await util.run_sync(self.dispatch.close)
+        try:
+            if self.dispatch:
+                # Not on the stream executor, it may still be waiting for changes
+                await util.run_sync(self.dispatch.close, pool="db-stream")
+        finally:
+            if self._executor is not None:
+                util.async_helper.close_executor(self._executor)
+                self._executor = None
 
     async def next(self) -> Mapping[str, Any]:
         while self.alive:
@@ -115,7 +149,7 @@ class AsyncChangeStream(AsyncBase):
 
     async def try_next(self) -> Optional[Mapping[str, Any]]:
         self.dispatch = await self._init()
-        return await util.run_sync(self.dispatch.try_next)
+        return await self._executor.run(self.dispatch.try_next)  # type: ignore
 
     @property
     def alive(self) -> bool:
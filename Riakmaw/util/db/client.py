@@ -75,7 +75,7 @@ class AsyncClient(AsyncBaseProperty):
         return hash(self.address)
 
     async def close(self) -> None:
-        await util.run_sync(self.dispatch.close)
+        await util.run_sync(self.dispatch.close, pool="db")
 
     async def drop_database(
         self,
@@ -89,6 +89,7 @@ class AsyncClient(AsyncBaseProperty):
             self.dispatch.drop_database,
             name_or_database,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     def get_database(
@@ -133,7 +134,9 @@ class AsyncClient(AsyncBaseProperty):
 
     async def list_database_names(self, session: Optional[AsyncClientSession] = None) -> List[str]:
         return await util.run_sync(
-            self.dispatch.list_database_names, session=session.dispatch if session else session
+            self.dispatch.list_database_names,
+            session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def list_databases(
@@ -151,6 +154,7 @@ class AsyncClient(AsyncBaseProperty):
             database.dispatch._retryable_read_command,  # skipcq: PYL-W0212
             cmd,
             session=session.dispatch if session else session,
+            pool="db",
         )
         cursor: Mapping[str, Any] = {
             "id": 0,
@@ -161,7 +165,7 @@ class AsyncClient(AsyncBaseProperty):
 
     async def server_info(self, session: Optional[AsyncClientSession] = None) -> Mapping[str, Any]:
         return await util.run_sync(
-            self.dispatch.server_info, session=session.dispatch if session else session
+            self.dispatch.server_info, session=session.dispatch if session else session, pool="db"
         )
 
     # Don't need await when entering the context manager,
@@ -179,6 +183,7 @@ class AsyncClient(AsyncBaseProperty):
             causal_consistency=causal_consistency,
             default_transaction_options=default_transaction_options,
             snapshot=snapshot,
+            pool="db",
         )
 
         async with AsyncClientSession(self, session) as session:
@@ -61,19 +61,19 @@ class AsyncClientSession(AsyncBase):
         return self
 
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        await util.run_sync(self.dispatch.__exit__, exc_type, exc_val, exc_tb)
+        await util.run_sync(self.dispatch.__exit__, exc_type, exc_val, exc_tb, pool="db")
 
     def __enter__(self) -> None:
         raise RuntimeError("Use 'async with' not just 'with'")
 
     async def abort_transaction(self) -> None:
-        return await util.run_sync(self.dispatch.abort_transaction)
+        return await util.run_sync(self.dispatch.abort_transaction, pool="db")
 
     async def commit_transaction(self) -> None:
-        return await util.run_sync(self.dispatch.commit_transaction)
+        return await util.run_sync(self.dispatch.commit_transaction, pool="db")
 
     async def end_session(self) -> None:
-        return await util.run_sync(self.dispatch.end_session)
+        return await util.run_sync(self.dispatch.end_session, pool="db")
 
     @asynccontextmanager
     async def start_transaction(
@@ -90,6 +90,7 @@ class AsyncClientSession(AsyncBase):
             write_concern=write_concern,
             read_preference=read_preference,
             max_commit_time_ms=max_commit_time_ms,
+            pool="db",
         )
         try:
             yield self
@@ -156,6 +156,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             ordered=ordered,
             bypass_document_validation=bypass_document_validation,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def count_documents(
@@ -170,10 +171,11 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             query,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def create_index(self, keys: Union[str, List[Tuple[str, Any]]], **kwargs: Any) -> str:
-        return await util.run_sync(self.dispatch.create_index, keys, **kwargs)
+        return await util.run_sync(self.dispatch.create_index, keys, **kwargs, pool="db")
 
     async def create_indexes(
         self,
@@ -187,6 +189,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             indexes,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def delete_many(
@@ -203,6 +206,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             collation=collation,
             hint=hint,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def delete_one(
@@ -219,6 +223,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             collation=collation,
             hint=hint,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def distinct(
@@ -235,10 +240,13 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             filter=query,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def drop(self, session: Optional[AsyncClientSession] = None) -> None:
-        await util.run_sync(self.dispatch.drop, session=session.dispatch if session else session)
+        await util.run_sync(
+            self.dispatch.drop, session=session.dispatch if session else session, pool="db"
+        )
 
     async def drop_index(
         self,
@@ -252,15 +260,19 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             index_or_name,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def drop_indexes(self, session: Optional[AsyncClientSession] = None, **kwargs) -> None:
         await util.run_sync(
-            self.dispatch.drop_indexes, session=session.dispatch if session else session, **kwargs
+            self.dispatch.drop_indexes,
+            session=session.dispatch if session else session,
+            **kwargs,
+            pool="db",
         )
 
     async def estimated_document_count(self, **kwargs: Any) -> int:
-        return await util.run_sync(self.dispatch.estimated_document_count, **kwargs)
+        return await util.run_sync(self.dispatch.estimated_document_count, **kwargs, pool="db")
 
     def find(self, *args: Any, **kwargs: Any) -> AsyncCursor:
         return AsyncCursor(Cursor(self, *args, **kwargs), self)
@@ -268,7 +280,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
     async def find_one(
         self, query: Optional[Mapping[str, Any]], *args: Any, **kwargs: Any
     ) -> Optional[Mapping[str, Any]]:
-        return await util.run_sync(self.dispatch.find_one, query, *args, **kwargs)
+        return await util.run_sync(self.dispatch.find_one, query, *args, **kwargs, pool="db")
 
     async def find_one_and_delete(
         self,
@@ -288,6 +300,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             hint=hint,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def find_one_and_replace(
@@ -314,12 +327,13 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             hint=hint,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def find_one_and_update(
         self,
         query: Mapping[str, Any],
-        update: Mapping[str, Any],
+        update: Union[Mapping[str, Any], List[Mapping[str, Any]]],
         *,
         projection: Optional[Union[List[Any], Mapping[str, Any]]] = None,
         sort: Optional[List[Tuple[str, Any]]] = None,
@@ -342,6 +356,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             hint=hint,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     def find_raw_batches(self, *args: Any, **kwargs: Any) -> AsyncRawBatchCursor:
@@ -357,7 +372,9 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
         self, session: Optional[AsyncClientSession] = None
     ) -> Mapping[str, Any]:
         return await util.run_sync(
-            self.dispatch.index_information, session=session.dispatch if session else session
+            self.dispatch.index_information,
+            session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def insert_many(
@@ -374,6 +391,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             ordered=ordered,
             bypass_document_validation=bypass_document_validation,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def insert_one(
@@ -388,6 +406,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             document,
             bypass_document_validation=bypass_document_validation,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     def list_indexes(
@@ -403,7 +422,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
 
     async def options(self, session: Optional[AsyncClientSession] = None) -> Mapping[str, Any]:
         return await util.run_sync(
-            self.dispatch.options, session=session.dispatch if session else session
+            self.dispatch.options, session=session.dispatch if session else session, pool="db"
         )
 
     async def rename(
@@ -414,6 +433,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             new_name,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def replace_one(
@@ -436,12 +456,13 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             collation=collation,
             hint=hint,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def update_many(
         self,
         query: Mapping[str, Any],
-        update: Mapping[str, Any],
+        update: Union[Mapping[str, Any], List[Mapping[str, Any]]],
         *,
         upsert: bool = False,
         array_filters: Optional[List[Mapping[str, Any]]] = None,
@@ -460,12 +481,13 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             collation=collation,
             hint=hint,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     async def update_one(
         self,
         query: Mapping[str, Any],
-        update: Mapping[str, Any],
+        update: Union[Mapping[str, Any], List[Mapping[str, Any]]],
         *,
         upsert: bool = False,
         array_filters: Optional[List[Mapping[str, Any]]] = None,
@@ -484,6 +506,7 @@ class AsyncCollection(AsyncBaseProperty, Generic[_DocumentType]):
             collation=collation,
             hint=hint,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     def watch(
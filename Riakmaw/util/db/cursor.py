@@ -75,7 +75,7 @@ class Cursor(_Cursor, Generic[_DocumentType]):
         return self.__data
 
     async def _AsyncCursor__die(self, synchronous: bool = False) -> None:
-        await util.run_sync(self.__die, synchronous=synchronous)
+        await util.run_sync(self.__die, synchronous=synchronous, pool="db-stream")
 
     @property
     def _AsyncCursor__exhaust(self) -> bool:
@@ -143,10 +143,10 @@ class AsyncCursor(AsyncCursorBase, Generic[_DocumentType]):
         return self
 
     async def distinct(self, key: str) -> List[Any]:
-        return await util.run_sync(self.dispatch.distinct, key)
+        return await util.run_sync(self.dispatch.distinct, key, pool="db-stream")
 
     async def explain(self) -> _DocumentType:
-        return await util.run_sync(self.dispatch.explain)
+        return await util.run_sync(self.dispatch.explain, pool="db-stream")
 
     def hint(self, index: Union[str, List[Tuple[str, Any]]]) -> "AsyncCursor[_DocumentType]":
         self.dispatch = self.dispatch.hint(index)
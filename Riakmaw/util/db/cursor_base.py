@@ -32,9 +32,14 @@ from typing import (
 
 from pymongo.client_session import ClientSession
 from pymongo.collection import Collection
-from pymongo.cursor import _QUERY_OPTIONS, Cursor, RawBatchCursor
+from pymongo.cursor import Cursor, RawBatchCursor
 from pymongo.typings import _Address, _DocumentType
 
+try:
+    from pymongo.cursor import _QUERY_OPTIONS
+except ImportError:  # pymongo>=4.9 moved the shared cursor constants
+    from pymongo.cursor_shared import _QUERY_OPTIONS
+
 from Riakmaw import util
 
 from .base import AsyncBase
@@ -63,6 +68,9 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
     ]
     loop: asyncio.AbstractEventLoop
 
+    _prefetch: Optional[asyncio.Future[int]]
+    _read_ahead: bool
+
     def __init__(
         self,
         cursor: Union[
@@ -81,6 +89,8 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
             self.collection = cursor.collection
         self.started = False
         self.closed = False
+        self._prefetch = None
+        self._read_ahead = False
 
         self.loop = asyncio.get_event_loop()
 
@@ -109,7 +119,12 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
     def _killed(self) -> bool:
         raise NotImplementedError
 
-    def _get_more(self) -> Coroutine[Any, Any, int]:
+    def _get_more(self) -> Union[asyncio.Future[int], Coroutine[Any, Any, int]]:
+        # A batch that has been read ahead is handed to the first caller that needs it
+        if self._prefetch is not None:
+            prefetch, self._prefetch = self._prefetch, None
+            return prefetch
+
         if not self.alive:
             raise InvalidOperation(
                 "Can't call get_more() on a AsyncCursor that has been" " exhausted or killed."
@@ -156,7 +171,7 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
                 future.set_exception(exc)
 
     async def _refresh(self) -> int:
-        return await util.run_sync(self.dispatch._refresh)  # skipcq: PYL-W0212
+        return await util.run_sync(self.dispatch._refresh, pool="db-stream")  # skipcq: PYL-W0212
 
     def batch_size(self, batch_size: int) -> "AsyncCursorBase":
         self.dispatch.batch_size(batch_size)
@@ -165,13 +180,35 @@ class AsyncCursorBase(AsyncBase, Generic[_DocumentType]):
     async def close(self) -> None:
         if not self.closed:
             self.closed = True
-            await util.run_sync(self.dispatch.close)
+            if self._prefetch is not None:
+                # pymongo cursors aren't thread safe, wait the running refresh first
+                await asyncio.gather(self._prefetch, return_exceptions=True)
+                self._prefetch = None
+
+            await util.run_sync(self.dispatch.close, pool="db-stream")
 
     async def next(self) -> Any:
+        if self._prefetch is not None:
+            await self._get_more()
+
+        # Buffered documents are popped right away, only refreshing the batch hits the executor
         if self.alive and (self._buffer_size() or await self._get_more()):
-            return await util.run_sync(next, self.dispatch)
+            document = self._data().popleft()
+            if self._read_ahead and not self._buffer_size() and self.alive:
+                self._prefetch = self.loop.create_task(self._get_more())
+
+            return document
         raise StopAsyncIteration
 
+    def read_ahead(self, enabled: bool = True) -> "AsyncCursorBase":
+        """Fetch the next batch in the background as soon as the current one
+        is drained, so the round-trip overlaps with processing the last document.
+
+        Useful for long scans like broadcasts where every batch is fully consumed.
+        """
+        self._read_ahead = enabled
+        return self
+
     def to_list(self, length: Optional[int] = None) -> asyncio.Future[List[Mapping[str, Any]]]:
         if length is not None and length < 0:
             raise ValueError("length must be non-negative")
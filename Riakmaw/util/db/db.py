@@ -101,6 +101,7 @@ class AsyncDatabase(AsyncBaseProperty):
             codec_options=codec_options,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def close(self) -> None:
@@ -131,6 +132,7 @@ class AsyncDatabase(AsyncBaseProperty):
                 session=session.dispatch if session else session,
                 check_exists=check_exists,
                 **kwargs,
+                pool="db",
             ),
             session=session,
         )
@@ -143,6 +145,7 @@ class AsyncDatabase(AsyncBaseProperty):
             dbref,
             session=session.dispatch if session else session,
             **kwargs,
+            pool="db",
         )
 
     async def drop_collection(
@@ -157,6 +160,7 @@ class AsyncDatabase(AsyncBaseProperty):
             self.dispatch.drop_collection,
             name_or_collection,
             session=session.dispatch if session else session,
+            pool="db",
         )
 
     def get_collection(
@@ -189,6 +193,7 @@ class AsyncDatabase(AsyncBaseProperty):
             session=session.dispatch if session else session,
             filter=query,
             **kwargs,
+            pool="db",
         )
 
     async def list_collections(
@@ -205,6 +210,7 @@ class AsyncDatabase(AsyncBaseProperty):
             self.dispatch._retryable_read_command,  # skipcq: PYL-W0212
             cmd,
             session=session.dispatch if session else session,
+            pool="db",
         )
         return AsyncCommandCursor(CommandCursor(self["$cmd"], res["cursor"], None))
 
@@ -227,6 +233,7 @@ class AsyncDatabase(AsyncBaseProperty):
             full=full,
             session=session.dispatch if session else session,
             background=background,
+            pool="db",
         )
 
     def watch(
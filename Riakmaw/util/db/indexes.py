@@ -0,0 +1,36 @@
+"""Declared collection indexes"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from typing import Dict, Iterable, List, Mapping, Sequence
+
+from pymongo import IndexModel
+
+__all__ = ["merge_indexes"]
+
+
+def merge_indexes(
+    declarations: Iterable[Mapping[str, Sequence[IndexModel]]]
+) -> Dict[str, List[IndexModel]]:
+    """Group the declared indexes by collection,
+    indexes with the same name on a collection are only kept once."""
+    merged: Dict[str, Dict[str, IndexModel]] = {}
+    for declaration in declarations:
+        for collection, indexes in declaration.items():
+            for index in indexes:
+                merged.setdefault(collection, {}).setdefault(index.document["name"], index)
+
+    return {collection: list(indexes.values()) for collection, indexes in merged.items()}
@@ -0,0 +1,182 @@
+"""Riakmaw database backend on the Motor asyncio driver"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from typing import Any, List, Mapping, Optional
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # Motor is an optional dependency
+    AsyncIOMotorClient = None
+
+__all__ = ["AVAILABLE", "NativeClient", "NativeCollection", "NativeCursor", "NativeDatabase"]
+
+AVAILABLE = AsyncIOMotorClient is not None
+
+
+class _NativeBase:
+    """Forwards anything not adapted to the Motor object"""
+
+    dispatch: Any
+
+    def __init__(self, dispatch: Any) -> None:
+        self.dispatch = dispatch
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.dispatch, name)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, self.__class__):
+            return self.dispatch == other.dispatch
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.dispatch)
+
+    def __repr__(self) -> str:
+        return f"Native{self.dispatch!r}"
+
+
+class NativeCursor(_NativeBase):
+    """Motor cursor or change stream with the :obj:`~Riakmaw.util.db` cursor extras"""
+
+    def __aiter__(self) -> "NativeCursor":
+        return self
+
+    async def __anext__(self) -> Mapping[str, Any]:
+        return await self.dispatch.next()
+
+    async def __aenter__(self) -> "NativeCursor":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self.dispatch.close()
+
+    def batch_size(self, batch_size: int) -> "NativeCursor":
+        self.dispatch.batch_size(batch_size)
+        return self
+
+    def read_ahead(self, enabled: bool = True) -> "NativeCursor":  # skipcq: PYL-W0613
+        # Batches are fetched by Motor, there is no executor hop of ours to overlap
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Mapping[str, Any]]:
+        return await self.dispatch.to_list(length)
+
+
+class _NativeQueryBase(_NativeBase):
+    def aggregate(self, pipeline: List[Mapping[str, Any]], *args: Any, **kwargs: Any) -> Any:
+        return NativeCursor(self.dispatch.aggregate(pipeline, *args, **kwargs))
+
+    def watch(self, pipeline: Optional[List[Mapping[str, Any]]] = None, **kwargs: Any) -> Any:
+        return NativeCursor(self.dispatch.watch(pipeline, **kwargs))
+
+
+class NativeCollection(_NativeQueryBase):
+    database: "NativeDatabase"
+
+    def __init__(self, database: "NativeDatabase", dispatch: Any) -> None:
+        self.database = database
+
+        super().__init__(dispatch)
+
+    def __getitem__(self, name: str) -> "NativeCollection":
+        return NativeCollection(self.database, self.dispatch[name])
+
+    def find(self, *args: Any, **kwargs: Any) -> NativeCursor:
+        return NativeCursor(self.dispatch.find(*args, **kwargs))
+
+    def find_raw_batches(self, *args: Any, **kwargs: Any) -> NativeCursor:
+        return NativeCursor(self.dispatch.find_raw_batches(*args, **kwargs))
+
+    def aggregate_raw_batches(self, pipeline: List[Mapping[str, Any]], **kwargs: Any) -> Any:
+        return NativeCursor(self.dispatch.aggregate_raw_batches(pipeline, **kwargs))
+
+    def list_indexes(self, *args: Any, **kwargs: Any) -> NativeCursor:
+        return NativeCursor(self.dispatch.list_indexes(*args, **kwargs))
+
+    def with_options(self, **kwargs: Any) -> "NativeCollection":
+        return NativeCollection(self.database, self.dispatch.with_options(**kwargs))
+
+
+class NativeDatabase(_NativeQueryBase):
+    client: "NativeClient"
+
+    def __init__(self, client: "NativeClient", dispatch: Any) -> None:
+        self.client = client
+
+        super().__init__(dispatch)
+
+    def __getitem__(self, name: str) -> NativeCollection:
+        return NativeCollection(self, self.dispatch[name])
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def get_collection(self, name: str, **kwargs: Any) -> NativeCollection:
+        return NativeCollection(self, self.dispatch.get_collection(name, **kwargs))
+
+    async def create_collection(self, name: str, **kwargs: Any) -> NativeCollection:
+        return NativeCollection(self, await self.dispatch.create_collection(name, **kwargs))
+
+    async def list_collection_names(
+        self, *, query: Optional[Mapping[str, Any]] = None, **kwargs: Any
+    ) -> List[str]:
+        return await self.dispatch.list_collection_names(filter=query, **kwargs)
+
+    async def list_collections(
+        self, *, query: Optional[Mapping[str, Any]] = None, **kwargs: Any
+    ) -> NativeCursor:
+        return NativeCursor(await self.dispatch.list_collections(filter=query, **kwargs))
+
+    def with_options(self, **kwargs: Any) -> "NativeDatabase":
+        return NativeDatabase(self.client, self.dispatch.with_options(**kwargs))
+
+
+class NativeClient(_NativeQueryBase):
+    """:obj:`~Riakmaw.util.db.AsyncClient` compatible client on :obj:`~AsyncIOMotorClient`.
+
+    Operations are run by Motor instead of our executors, cursors and sessions
+    are the Motor ones. Motor 3.2 works with the PyMongo 4.4 pinned by pyrofork.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        if AsyncIOMotorClient is None:
+            raise RuntimeError("Native database backend requires motor")
+
+        super().__init__(AsyncIOMotorClient(*args, **kwargs))
+
+    def __getitem__(self, name: str) -> NativeDatabase:
+        return NativeDatabase(self, self.dispatch[name])
+
+    def get_database(self, name: Optional[str] = None, **kwargs: Any) -> NativeDatabase:
+        return NativeDatabase(self, self.dispatch.get_database(name, **kwargs))
+
+    def get_default_database(self, default: Optional[str] = None, **kwargs: Any) -> NativeDatabase:
+        return NativeDatabase(self, self.dispatch.get_default_database(default, **kwargs))
+
+    async def close(self) -> None:
+        self.dispatch.close()
+
+    async def drop_database(self, name: Any, **kwargs: Any) -> None:
+        if isinstance(name, NativeDatabase):
+            name = name.name
+
+        await self.dispatch.drop_database(name, **kwargs)
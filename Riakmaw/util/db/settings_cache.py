@@ -0,0 +1,337 @@
+"""Read-through cache of per chat settings documents"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from pymongo.errors import PyMongoError
+
+from .change_stream import change_stream_backoff, change_stream_unsupported
+
+if TYPE_CHECKING:
+    from .collection import AsyncCollection
+
+__all__ = ["SettingsCache"]
+
+log = logging.getLogger("settings_cache")
+
+# Operations that change the collection as a whole
+_RESET_OPERATIONS = frozenset({"drop", "rename", "dropDatabase", "invalidate"})
+
+
+class SettingsCache:
+    """Bounded LRU of settings documents keyed by chat id.
+
+    Missing documents are cached as ``None`` too, most chats never change their
+    settings. Entries are dropped by :meth:`~invalidate` after the owner writes,
+    and by a change stream on the collection so edits of other instances are
+    seen as well. When change streams aren't supported by the deployment,
+    entries still expire after ``ttl`` seconds.
+
+    With ``fields`` only those fields are fetched, and updates that don't touch
+    them are ignored, so settings living in busy documents can be cached too.
+    """
+
+    collection: "AsyncCollection"
+    key: str
+    fields: Optional[Sequence[str]]
+    maxsize: int
+    ttl: float
+
+    hits: int
+    misses: int
+    watching: bool
+
+    # chat id -> (expires at, document)
+    _entries: "OrderedDict[Any, Tuple[float, Optional[Mapping[str, Any]]]]"
+    # document _id -> chat id, change events only carry the _id
+    _ids: MutableMapping[Any, Any]
+    _pending: Dict[Any, "asyncio.Future[Optional[Mapping[str, Any]]]"]
+    _epoch: int
+    _watcher: Optional[asyncio.Task[None]]
+
+    def __init__(
+        self,
+        collection: "AsyncCollection",
+        *,
+        key: str = "chat_id",
+        fields: Optional[Sequence[str]] = None,
+        maxsize: int = 10000,
+        ttl: float = 600,
+    ) -> None:
+        self.collection = collection
+        self.key = key
+        self.fields = fields
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.watching = False
+
+        self._entries = OrderedDict()
+        self._ids = {}
+        self._pending = {}
+        self._epoch = 0
+        self._watcher = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, chat_id: Any) -> Optional[Mapping[str, Any]]:
+        """Get the settings document of a chat, the document must not be mutated."""
+        if self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+        try:
+            expires, document = self._entries[chat_id]
+        except KeyError:
+            pass
+        else:
+            if expires > monotonic():
+                self._entries.move_to_end(chat_id)
+                self.hits += 1
+                return document
+
+            self._drop(chat_id)
+
+        self.misses += 1
+        pending = self._pending.get(chat_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = self._pending[chat_id] = asyncio.get_running_loop().create_future()
+        epoch = self._epoch
+        try:
+            document = await self.collection.find_one(
+                {self.key: chat_id},
+                {field: True for field in self.fields} if self.fields else None,
+            )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Only the waiters should see the exception
+            future.exception()
+            raise
+        else:
+            # Something was written while reading, the result might be outdated already
+            if epoch == self._epoch:
+                self._store(chat_id, document)
+            future.set_result(document)
+            return document
+        finally:
+            del self._pending[chat_id]
+
+    def _store(self, chat_id: Any, document: Optional[Mapping[str, Any]]) -> None:
+        self._entries[chat_id] = (monotonic() + self.ttl, document)
+        self._entries.move_to_end(chat_id)
+        if document is not None and "_id" in document:
+            self._ids[document["_id"]] = chat_id
+
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, chat_id: Any) -> None:
+        _, document = self._entries.pop(chat_id, (0, None))
+        if document is not None:
+            self._ids.pop(document.get("_id"), None)
+
+    def invalidate(self, *chat_ids: Any) -> None:
+        """Forget the cached settings of the given chats, call it after writing them."""
+        self._epoch += 1
+        for chat_id in chat_ids:
+            self._drop(chat_id)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        self._ids.clear()
+
+    def _touches(self, paths: Iterable[str]) -> bool:
+        if not self.fields:
+            return True
+
+        return any(
+            path == field or path.startswith(field + ".") or field.startswith(path + ".")
+            for path in paths
+            for field in (*self.fields, self.key)
+        )
+
+    def _on_change(self, change: Mapping[str, Any]) -> None:
+        operation = change["operationType"]
+        if operation in _RESET_OPERATIONS:
+            self.clear()
+            return
+
+        description = change.get("updateDescription", {})
+        if operation == "update" and not self._touches(
+            [
+                *description.get("updatedFields", {}),
+                *description.get("removedFields", []),
+                *(array["field"] for array in description.get("truncatedArrays", [])),
+            ]
+        ):
+            return
+
+        chat_ids = []
+        document = change.get("fullDocument")
+        if document and self.key in document:
+            chat_ids.append(document[self.key])
+
+        document_id = change.get("documentKey", {}).get("_id")
+        if self.key == "_id":
+            chat_ids.append(document_id)
+        elif document_id in self._ids:
+            chat_ids.append(self._ids[document_id])
+
+        # A document can be moved into another chat, i.e. on chat migration
+        updated = description.get("updatedFields", {})
+        if self.key in updated:
+            chat_ids.append(updated[self.key])
+
+        self.invalidate(*chat_ids)
+
+    def _touches_expr(self, paths: Any) -> Mapping[str, Any]:
+        """Aggregation counterpart of :meth:`~_touches` on the array expression ``paths``"""
+        return {
+            "$anyElementTrue": [
+                {
+                    "$map": {
+                        "input": {"$ifNull": [paths, []]},
+                        "as": "path",
+                        "in": {
+                            "$or": [
+                                condition
+                                for field in (*self.fields, self.key)  # type: ignore
+                                for condition in (
+                                    {"$eq": ["$$path", field]},
+                                    {"$eq": [{"$indexOfCP": ["$$path", field + "."]}, 0]},
+                                    {
+                                        "$eq": [
+                                            {"$indexOfCP": [field, {"$concat": ["$$path", "."]}]},
+                                            0,
+                                        ]
+                                    },
+                                )
+                            ]
+                        },
+                    }
+                }
+            ]
+        }
+
+    def _pipeline(self) -> List[Mapping[str, Any]]:
+        """Filters out updates that don't touch ``fields`` on the server already"""
+        if not self.fields:
+            return []
+
+        updated = {"$objectToArray": {"$ifNull": ["$updateDescription.updatedFields", {}]}}
+        return [
+            {
+                "$match": {
+                    "$expr": {
+                        "$or": [
+                            {"$ne": ["$operationType", "update"]},
+                            self._touches_expr({"$map": {"input": updated, "in": "$$this.k"}}),
+                            self._touches_expr("$updateDescription.removedFields"),
+                            self._touches_expr("$updateDescription.truncatedArrays.field"),
+                        ]
+                    }
+                }
+            }
+        ]
+
+    async def _watch(self) -> None:
+        resume_token = None
+        failures = 0
+        while True:
+            opened = False
+            try:
+                async with self.collection.watch(
+                    self._pipeline(), resume_after=resume_token
+                ) as stream:
+                    opened = True
+                    if failures:
+                        # Other instances may have written while the stream was down
+                        self.clear()
+                        failures = 0
+
+                    self.watching = True
+                    async for change in stream:
+                        self._on_change(change)
+                        resume_token = stream.resume_token
+
+                # The stream was invalidated, it can't be resumed
+                resume_token = None
+            except PyMongoError as e:
+                if change_stream_unsupported(e):
+                    log.warning(
+                        "Can't watch %s for changes, settings expire after %d seconds instead: %s",
+                        self.collection.name,
+                        self.ttl,
+                        e,
+                    )
+                    return
+
+                if not opened:
+                    # The resume token may be too old, start over
+                    resume_token = None
+
+                delay = change_stream_backoff(failures)
+                failures += 1
+                log.warning(
+                    "Lost the change stream of %s, watching again in %.0f seconds: %s",
+                    self.collection.name,
+                    delay,
+                    e,
+                )
+                self.watching = False
+                await asyncio.sleep(delay)
+            finally:
+                self.watching = False
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def stats(self) -> Mapping[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "watching": self.watching,
+        }
@@ -0,0 +1,292 @@
+"""Write-behind buffer for hot-path updates"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+import logging
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+if TYPE_CHECKING:
+    from .collection import AsyncCollection
+
+__all__ = ["WriteBehind"]
+
+log = logging.getLogger("write_behind")
+
+MERGEABLE = frozenset({"$set", "$setOnInsert", "$inc", "$addToSet", "$push"})
+# $push modifiers that still give the same result when the values are pushed at once
+PUSH_MODIFIERS = frozenset({"$each", "$slice", "$sort"})
+
+
+def _key(query: Mapping[str, Any]) -> str:
+    return repr(sorted(query.items()))
+
+
+def _overlaps(path: str, other: str) -> bool:
+    return path == other or path.startswith(other + ".") or other.startswith(path + ".")
+
+
+def _split_push(value: Any) -> Tuple[List[Any], Dict[str, Any]]:
+    if isinstance(value, Mapping) and "$each" in value:
+        return list(value["$each"]), {k: v for k, v in value.items() if k != "$each"}
+
+    return [value], {}
+
+
+def _split_add(value: Any) -> List[Any]:
+    if isinstance(value, Mapping) and "$each" in value:
+        return list(value["$each"])
+
+    return [value]
+
+
+class _Pending:
+    """Updates of a single document merged into one update document"""
+
+    __slots__ = ("query", "upsert", "ops", "sealed")
+
+    query: Mapping[str, Any]
+    upsert: bool
+    ops: MutableMapping[str, MutableMapping[str, Any]]
+    sealed: bool
+
+    def __init__(self, query: Mapping[str, Any], upsert: bool) -> None:
+        self.query = query
+        self.upsert = upsert
+        self.ops = {}
+        self.sealed = False
+
+    def _upgradable(self, update: Mapping[str, Mapping[str, Any]]) -> bool:
+        # A plain update can only become an upsert when the upsert overwrites all of it,
+        # otherwise the inserted document would get fields the plain update never wrote
+        if self.ops.keys() != {"$set"}:
+            return False
+
+        return self.ops["$set"].keys() <= update.get("$set", {}).keys()
+
+    def _compatible(self, update: Mapping[str, Mapping[str, Any]], upsert: bool) -> bool:
+        # A later plain update is covered by an upsert, the other way around isn't
+        if self.sealed or (upsert and not self.upsert and not self._upgradable(update)):
+            return False
+
+        for op, fields in update.items():
+            if op not in MERGEABLE:
+                return False
+
+            for path, value in fields.items():
+                for other_op, other_fields in self.ops.items():
+                    for other in other_fields:
+                        if _overlaps(path, other) and (other_op != op or other != path):
+                            return False
+
+                if op == "$push" and path in self.ops.get("$push", {}):
+                    _, modifiers = _split_push(value)
+                    if modifiers != self.ops["$push"][path][1]:
+                        return False
+                    if not PUSH_MODIFIERS.issuperset(modifiers):
+                        return False
+
+        return True
+
+    def merge(self, update: Mapping[str, Mapping[str, Any]], upsert: bool) -> bool:
+        if not self.ops and any(op not in MERGEABLE for op in update):
+            # Unknown operators are written as is, nothing can be merged after it
+            self.ops = {op: dict(fields) for op, fields in update.items()}
+            self.sealed = True
+            return True
+
+        if not self._compatible(update, upsert):
+            return False
+
+        self.upsert = self.upsert or upsert
+        for op, fields in update.items():
+            target = self.ops.setdefault(op, {})
+            for path, value in fields.items():
+                if op == "$set":
+                    target[path] = value
+                elif op == "$setOnInsert":
+                    target.setdefault(path, value)
+                elif op == "$inc":
+                    target[path] = target.get(path, 0) + value
+                elif op == "$addToSet":
+                    values = target.setdefault(path, [])
+                    values.extend(v for v in _split_add(value) if v not in values)
+                else:  # $push
+                    each, modifiers = _split_push(value)
+                    if path in target:
+                        target[path][0].extend(each)
+                    else:
+                        target[path] = (each, modifiers)
+
+        return True
+
+    def build(self) -> Dict[str, Any]:
+        if self.sealed:
+            return dict(self.ops)
+
+        update: Dict[str, Any] = {}
+        for op, fields in self.ops.items():
+            if op == "$addToSet":
+                update[op] = {path: {"$each": values} for path, values in fields.items()}
+            elif op == "$push":
+                update[op] = {
+                    path: {"$each": each, **modifiers} for path, (each, modifiers) in fields.items()
+                }
+            else:
+                update[op] = dict(fields)
+
+        return update
+
+
+class WriteBehind:
+    """Buffer of :meth:`~AsyncCollection.update_one` calls that are written later.
+
+    Updates to the same document are merged when their operators allow it,
+    ``$set``, ``$setOnInsert``, ``$inc``, ``$addToSet`` and ``$push`` are merged,
+    anything else is written on its own ahead of the rest of the buffer. A plain
+    update followed by an upsert that overwrites it becomes one upsert. The buffer
+    is written with one unordered ``bulk_write`` once ``max_docs`` documents are
+    pending or ``delay`` seconds after the first pending update, whichever comes first.
+
+    Updates are matched by their query, so always use the same query for a document.
+    Updates of one document through different queries end up in the same unordered
+    bulk and are applied in no particular order.
+
+    Writes are best effort and errors are only logged, only use it for data that
+    doesn't need to be read back right away, or :meth:`~flush` before reading it.
+    """
+
+    collection: "AsyncCollection"
+    max_docs: int
+    delay: float
+
+    queued: int
+    written: int
+    flushes: int
+    errors: int
+
+    _pending: Dict[str, _Pending]
+    _lock: asyncio.Lock
+    _tasks: Set[asyncio.Task[None]]
+    _timer: Optional[asyncio.TimerHandle]
+
+    def __init__(self, collection: "AsyncCollection", *, max_docs: int = 500, delay: float = 2.0):
+        self.collection = collection
+        self.max_docs = max_docs
+        self.delay = delay
+
+        self.queued = 0
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+
+        self._pending = {}
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+        self._timer = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def update_one(
+        self, query: Mapping[str, Any], update: Mapping[str, Any], upsert: bool = False
+    ) -> None:
+        """Queue an update, returns immediately."""
+        self.queued += 1
+        key = _key(query)
+
+        entry = self._pending.get(key)
+        if entry is not None and entry.merge(update, upsert):
+            return
+
+        if entry is not None:
+            # Can't be merged, only that update is written ahead of the rest of the buffer
+            del self._pending[key]
+            self._start_write([entry])
+
+        entry = _Pending(query, upsert)
+        entry.merge(update, upsert)
+        self._pending[key] = entry
+
+        if len(self._pending) >= self.max_docs:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        self._start_write(list(batch.values()))
+
+    def _start_write(self, batch: List[_Pending]) -> None:
+        task = asyncio.get_running_loop().create_task(self._write(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: List[_Pending]) -> None:
+        # Batches are written one at a time so they are applied in the queued order
+        async with self._lock:
+            requests = [
+                UpdateOne(entry.query, entry.build(), upsert=entry.upsert) for entry in batch
+            ]
+            try:
+                await self.collection.bulk_write(requests, ordered=False)
+            except PyMongoError as e:
+                self.errors += 1
+                log.error(
+                    "Failed to write %d buffered updates to %s: %s",
+                    len(requests),
+                    self.collection.name,
+                    e,
+                )
+            else:
+                self.written += len(requests)
+            finally:
+                self.flushes += 1
+
+    async def flush(self) -> None:
+        """Write everything that is pending and wait for it."""
+        self._schedule_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    def stats(self) -> Mapping[str, int]:
+        return {
+            "pending": len(self._pending),
+            "queued": self.queued,
+            "written": self.written,
+            "flushes": self.flushes,
+            "errors": self.errors,
+        }
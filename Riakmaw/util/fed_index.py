@@ -0,0 +1,209 @@
+"""In-memory federation ban index"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+__all__ = ["FedBanIndex", "IntSet"]
+
+# Changes kept aside before they are merged into the sorted array
+_DELTA_MIN = 256
+
+
+class IntSet:
+    """Set of 64-bit ints stored as a sorted array.
+
+    Recent changes are kept in small delta sets and merged once they grow,
+    so a large ban list costs 8 bytes per id instead of a full ``set`` entry.
+    """
+
+    __slots__ = ("_base", "_added", "_removed")
+
+    _base: "array[int]"
+    _added: Set[int]
+    _removed: Set[int]
+
+    def __init__(self, values: Iterable[int] = ()) -> None:
+        self._base = array("q", sorted(set(values)))
+        self._added = set()
+        self._removed = set()
+
+    def __contains__(self, value: object) -> bool:
+        if value in self._added:
+            return True
+        if value in self._removed or not isinstance(value, int):
+            return False
+
+        return self._in_base(value)
+
+    def __iter__(self) -> Iterator[int]:
+        yield from (value for value in self._base if value not in self._removed)
+        yield from self._added
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._removed) + len(self._added)
+
+    def _in_base(self, value: int) -> bool:
+        index = bisect_left(self._base, value)
+        return index < len(self._base) and self._base[index] == value
+
+    def add(self, value: int) -> None:
+        self._removed.discard(value)
+        if not self._in_base(value):
+            self._added.add(value)
+            self._maybe_compact()
+
+    def discard(self, value: int) -> None:
+        self._added.discard(value)
+        if self._in_base(value):
+            self._removed.add(value)
+            self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if len(self._added) + len(self._removed) > max(_DELTA_MIN, len(self._base) // 8):
+            self.compact()
+
+    def compact(self) -> None:
+        """Merge the pending changes into the sorted array"""
+        self._base = array("q", sorted(self))
+        self._added.clear()
+        self._removed.clear()
+
+
+class FedBanIndex:
+    """Which federations apply to a chat, and who is banned in them.
+
+    Maps each chat to its federation, each federation to the federations it
+    subscribed to, and each federation to an :class:`IntSet` of banned ids, so
+    checking a member against every federation that applies costs no database
+    round-trip. A hit only means the target *may* be banned, callers should
+    read the ban itself, and :meth:`remove_ban` stale ids they come across.
+    """
+
+    _names: Dict[str, str]
+    _chats: Dict[int, str]
+    _fed_chats: Dict[str, Set[int]]
+    # federation -> federations subscribed to it, as stored on its document
+    _subscribers: Dict[str, Set[str]]
+    # federation -> federations it subscribed to
+    _follows: Dict[str, Set[str]]
+    _bans: Dict[str, IntSet]
+    # federation -> itself and every federation it subscribed to, transitively
+    _effective: Dict[str, Tuple[str, ...]]
+
+    def __init__(self) -> None:
+        self._names = {}
+        self._chats = {}
+        self._fed_chats = {}
+        self._subscribers = {}
+        self._follows = {}
+        self._bans = {}
+        self._effective = {}
+
+    def __len__(self) -> int:
+        return sum(len(bans) for bans in self._bans.values())
+
+    def clear(self) -> None:
+        self._names.clear()
+        self._chats.clear()
+        self._fed_chats.clear()
+        self._subscribers.clear()
+        self._follows.clear()
+        self._bans.clear()
+        self._effective.clear()
+
+    def set_federation(
+        self, fid: str, name: str, chats: Iterable[int], subscribers: Iterable[str]
+    ) -> None:
+        """Replace what is known about a federation from its document"""
+        self._names[fid] = name
+
+        for chat in self._fed_chats.pop(fid, set()):
+            if self._chats.get(chat) == fid:
+                del self._chats[chat]
+        self._fed_chats[fid] = set(chats)
+        for chat in self._fed_chats[fid]:
+            self._chats[chat] = fid
+
+        for subscriber in self._subscribers.pop(fid, set()):
+            self._follows.get(subscriber, set()).discard(fid)
+        self._subscribers[fid] = set(subscribers)
+        for subscriber in self._subscribers[fid]:
+            self._follows.setdefault(subscriber, set()).add(fid)
+
+        self._effective.clear()
+
+    def remove_federation(self, fid: str) -> None:
+        self.set_federation(fid, "", (), ())
+        del self._names[fid]
+        del self._fed_chats[fid]
+        del self._subscribers[fid]
+        self._bans.pop(fid, None)
+
+    def federation(self, chat: int) -> Optional[str]:
+        """The federation a chat has joined"""
+        return self._chats.get(chat)
+
+    def name(self, fid: str) -> Optional[str]:
+        return self._names.get(fid)
+
+    def federations(self, chat: int) -> Tuple[str, ...]:
+        """The chat federation followed by every federation it subscribed to"""
+        fid = self._chats.get(chat)
+        if fid is None:
+            return ()
+
+        try:
+            return self._effective[fid]
+        except KeyError:
+            pass
+
+        order = [fid]
+        seen = {fid}
+        for current in order:
+            for followed in sorted(self._follows.get(current, ())):
+                if followed not in seen:
+                    seen.add(followed)
+                    order.append(followed)
+
+        self._effective[fid] = tuple(order)
+        return self._effective[fid]
+
+    def add_ban(self, fid: str, target: int) -> None:
+        try:
+            self._bans[fid].add(target)
+        except KeyError:
+            self._bans[fid] = IntSet((target,))
+
+    def load_bans(self, fid: str, targets: Iterable[int]) -> None:
+        """Bulk add bans of a federation, used on the initial load"""
+        bans = self._bans.get(fid)
+        self._bans[fid] = IntSet([*bans, *targets] if bans else targets)
+
+    def remove_ban(self, fid: str, target: int) -> None:
+        bans = self._bans.get(fid)
+        if bans is not None:
+            bans.discard(target)
+
+    def lookup(self, chat: int, target: int) -> Optional[str]:
+        """First federation applying to the chat that has banned the target"""
+        for fid in self.federations(chat):
+            bans = self._bans.get(fid)
+            if bans is not None and target in bans:
+                return fid
+
+        return None
@@ -0,0 +1,305 @@
+"""Resilient outbound HTTP client"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import random
+from time import monotonic
+from typing import Any, Dict, Generator, MutableMapping, Optional, Tuple
+
+import aiohttp
+from yarl import URL
+
+__all__ = ["CircuitBreaker", "CircuitOpen", "HostStats", "HttpClient"]
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Statuses that are worth another attempt, anything else is the final answer
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpen(aiohttp.ClientError):
+    """The host failed too many times in a row, requests are refused until it cools down"""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"Circuit of {host} is open, retry in {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive failure breaker.
+
+    After ``threshold`` failures in a row the circuit opens and every request
+    fails fast for ``reset_after`` seconds. Then a single trial request is let
+    through, its success closes the circuit and its failure opens it again.
+    """
+
+    threshold: int
+    reset_after: float
+
+    failures: int
+    opened_at: Optional[float]
+    _trial: bool
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30) -> None:
+        self.threshold = threshold
+        self.reset_after = reset_after
+
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+
+        return "half-open" if self._trial else "open"
+
+    def retry_after(self, now: Optional[float] = None) -> float:
+        if self.opened_at is None:
+            return 0
+
+        now = monotonic() if now is None else now
+        return max(0.0, self.opened_at + self.reset_after - now)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        if self.opened_at is None:
+            return True
+
+        now = monotonic() if now is None else now
+        if self.retry_after(now) > 0:
+            return False
+
+        # Wait another period before the next trial, in case this one never reports back
+        self.opened_at = now
+        self._trial = True
+        return True
+
+    def success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def failure(self, now: Optional[float] = None) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            self.opened_at = monotonic() if now is None else now
+            self._trial = False
+
+
+class HostStats:
+    """Request metrics of a single host"""
+
+    # Weight of the last request in the latency moving average
+    ALPHA = 0.2
+
+    requests: int
+    errors: int
+    retries: int
+    rejected: int
+    latency: float
+    max_latency: float
+    last_error: Optional[str]
+
+    def __init__(self) -> None:
+        self.requests = self.errors = self.retries = self.rejected = 0
+        self.latency = self.max_latency = 0.0
+        self.last_error = None
+
+    def observe(self, elapsed: float, error: Optional[str] = None) -> None:
+        self.requests += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+
+        self.latency = (
+            elapsed if self.requests == 1 else self.latency + self.ALPHA * (elapsed - self.latency)
+        )
+        self.max_latency = max(self.max_latency, elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_ratio": self.errors / self.requests if self.requests else 0.0,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "latency": self.latency,
+            "max_latency": self.max_latency,
+            "last_error": self.last_error,
+        }
+
+
+class _Request:
+    """Awaitable and async context manager of a request, like aiohttp's"""
+
+    __slots__ = ("_coro", "_resp")
+
+    def __init__(self, coro: Any) -> None:
+        self._coro = coro
+        self._resp: Optional[aiohttp.ClientResponse] = None
+
+    def __await__(self) -> Generator[Any, None, aiohttp.ClientResponse]:
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self._resp = await self._coro
+        return self._resp
+
+    async def __aexit__(self, *_: Any) -> None:
+        if self._resp is not None:
+            self._resp.release()
+
+
+class HttpClient:
+    """Outbound HTTP with a connection pool, a circuit breaker and metrics per host.
+
+    Requests are made like on :obj:`aiohttp.ClientSession`, e.g.
+    ``async with http.get(url) as resp``. Connection errors, timeouts and the
+    statuses in ``RETRY_STATUSES`` are retried ``retries`` times with a jittered
+    exponential backoff, only for idempotent methods unless ``retries`` is given
+    to the request. Hosts whose breaker is open raise :obj:`CircuitOpen` at once.
+    """
+
+    limit_per_host: int
+    dns_ttl: int
+    timeout: aiohttp.ClientTimeout
+    retries: int
+    backoff: float
+    breaker_threshold: int
+    breaker_reset: float
+
+    breakers: MutableMapping[str, CircuitBreaker]
+    metrics: MutableMapping[str, HostStats]
+    _sessions: MutableMapping[str, aiohttp.ClientSession]
+
+    def __init__(
+        self,
+        *,
+        limit_per_host: int = 10,
+        dns_ttl: int = 300,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        retries: int = 2,
+        backoff: float = 0.5,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30,
+    ) -> None:
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.timeout = timeout or aiohttp.ClientTimeout(total=15, connect=5)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+
+        self.breakers = {}
+        self.metrics = {}
+        self._sessions = {}
+
+    def session(self, host: str) -> aiohttp.ClientSession:
+        """Session of the host, each one has its own connection pool"""
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit_per_host, ttl_dns_cache=self.dns_ttl)
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._sessions[host] = session
+
+        return session
+
+    def _host(self, url: URL) -> Tuple[str, CircuitBreaker, HostStats]:
+        host = f"{url.host}:{url.port}" if url.port and not url.is_default_port() else str(url.host)
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                self.breaker_threshold, self.breaker_reset
+            )
+            self.metrics[host] = HostStats()
+
+        return host, breaker, self.metrics[host]
+
+    def _delay(self, attempt: int) -> float:
+        # Full jitter, so clients retrying together don't hit the host together again
+        return random.uniform(0, self.backoff * 2**attempt)
+
+    async def _send(
+        self, method: str, url: Any, retries: Optional[int], **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        url = URL(url)
+        host, breaker, stats = self._host(url)
+        if retries is None:
+            retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                stats.rejected += 1
+                raise CircuitOpen(host, breaker.retry_after())
+
+            start = monotonic()
+            try:
+                resp = await self.session(host).request(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                stats.observe(monotonic() - start, repr(err))
+                breaker.failure()
+                if attempt >= retries:
+                    raise
+            else:
+                if resp.status < 500:
+                    stats.observe(monotonic() - start)
+                    breaker.success()
+                else:
+                    stats.observe(monotonic() - start, f"HTTP {resp.status}")
+                    breaker.failure()
+
+                if resp.status not in RETRY_STATUSES or attempt >= retries:
+                    return resp
+
+                resp.release()
+
+            stats.retries += 1
+            await asyncio.sleep(self._delay(attempt))
+            attempt += 1
+
+    def request(
+        self, method: str, url: Any, *, retries: Optional[int] = None, **kwargs: Any
+    ) -> _Request:
+        return _Request(self._send(method, url, retries, **kwargs))
+
+    def get(self, url: Any, **kwargs: Any) -> _Request:
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: Any, **kwargs: Any) -> _Request:
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url: Any, **kwargs: Any) -> _Request:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: Any, **kwargs: Any) -> _Request:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: Any, **kwargs: Any) -> _Request:
+        return self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            host: {**stats.snapshot(), "circuit": self.breakers[host].state}
+            for host, stats in self.metrics.items()
+        }
+
+    async def close(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions))
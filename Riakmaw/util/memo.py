@@ -0,0 +1,113 @@
+"""Update scoped memo shared by listeners"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+from pyrogram.types import Update
+
+__all__ = ["UpdateMemo", "current", "memo_of", "scope"]
+
+MEMO_ATTR = "_update_memo"
+
+Result = TypeVar("Result")
+
+_current: ContextVar[Optional["UpdateMemo"]] = ContextVar("update_memo", default=None)
+
+
+class UpdateMemo:
+    """Values loaded while handling a single update.
+
+    Keys are tuples of the source and the id, e.g. ``("USERS", user_id)``.
+    Concurrent loads of the same key share a single call, failed loads aren't kept.
+    """
+
+    __slots__ = ("_values",)
+
+    _values: Dict[Hashable, "asyncio.Future[Any]"]
+
+    def __init__(self) -> None:
+        self._values = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._values
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Result]]) -> Result:
+        try:
+            return await asyncio.shield(self._values[key])
+        except KeyError:
+            pass
+
+        future = self._values[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await loader()
+        except BaseException as e:
+            del self._values[key]
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Only the waiters should see the exception
+                future.exception()
+            raise
+
+        future.set_result(result)
+        return result
+
+    def set(self, key: Hashable, value: Any) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._values[key] = future
+
+    def discard(self, *keys: Hashable) -> None:
+        """Forget values that are outdated by a write."""
+        for key in keys:
+            self._values.pop(key, None)
+
+
+def memo_of(update: Any) -> UpdateMemo:
+    memo = getattr(update, MEMO_ATTR, None)
+    if memo is None:
+        memo = UpdateMemo()
+        try:
+            setattr(update, MEMO_ATTR, memo)
+        except AttributeError:  # Can't attach into the update, memo will just be dropped
+            pass
+
+    return memo
+
+
+def current() -> UpdateMemo:
+    """Memo of the update being dispatched, outside of an update nothing is shared."""
+    memo = _current.get()
+    return memo if memo is not None else UpdateMemo()
+
+
+@contextmanager
+def scope(update: Any) -> Iterator[None]:
+    """Make the memo of an update current, anything that isn't an update keeps the outer one."""
+    if not isinstance(update, Update):
+        yield
+        return
+
+    token = _current.set(memo_of(update))
+    try:
+        yield
+    finally:
+        _current.reset(token)
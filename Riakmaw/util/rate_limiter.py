@@ -0,0 +1,174 @@
+"""In-process token bucket rate limiters"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+from time import monotonic
+from typing import Dict, Hashable, Optional, Tuple
+
+__all__ = ["RateLimiter", "CommandLimiter", "Throttle"]
+
+
+class RateLimiter:
+    """Token bucket limiter keyed by an arbitrary hashable.
+
+    Each key may burst up to ``capacity`` hits, tokens are refilled continuously
+    at ``capacity / period`` per second. Buckets are stored as ``(tokens, stamp)``
+    tuples and idle buckets are swept lazily at most once every ``period``.
+    """
+
+    __slots__ = ("capacity", "period", "rate", "buckets", "_next_sweep")
+
+    capacity: float
+    period: float
+    rate: float
+    buckets: Dict[Hashable, Tuple[float, float]]
+
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = float(capacity)
+        self.period = period
+        self.rate = capacity / period
+        self.buckets = {}
+        self._next_sweep = 0.0
+
+    def available(self, key: Hashable, now: float) -> float:
+        """Tokens available of the key at the given time"""
+        try:
+            tokens, stamp = self.buckets[key]
+        except KeyError:
+            return self.capacity
+
+        return min(self.capacity, tokens + (now - stamp) * self.rate)
+
+    def consume(self, key: Hashable, tokens: float, now: float) -> None:
+        """Take a token out of the given available tokens"""
+        self.buckets[key] = (tokens - 1, now)
+        if now >= self._next_sweep:
+            self.sweep(now)
+
+    def sweep(self, now: float) -> None:
+        """Drop buckets that have been refilled"""
+        # A bucket left untouched for a whole period is full again,
+        # so forgetting it doesn't change the outcome of the next hit.
+        self.buckets = {
+            key: bucket for key, bucket in self.buckets.items() if now - bucket[1] < self.period
+        }
+        self._next_sweep = now + self.period
+
+    def hit(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """Consume a token of the key, returns False if the key is rate limited"""
+        if now is None:
+            now = monotonic()
+
+        tokens = self.available(key, now)
+        if tokens < 1:
+            return False
+
+        self.consume(key, tokens, now)
+        return True
+
+
+class CommandLimiter:
+    """Per-user, per-chat and global command rate limiter.
+
+    A hit is only accepted when all of the scopes have a token left,
+    rejected hits don't consume any token.
+    """
+
+    __slots__ = ("user", "chat", "total")
+
+    user: RateLimiter
+    chat: RateLimiter
+    total: RateLimiter
+
+    def __init__(
+        self,
+        *,
+        user: Tuple[int, float] = (3, 10),
+        chat: Tuple[int, float] = (20, 60),
+        total: Tuple[int, float] = (30, 1),
+    ) -> None:
+        self.user = RateLimiter(*user)
+        self.chat = RateLimiter(*chat)
+        self.total = RateLimiter(*total)
+
+    def acquire(self, user_id: int, chat_id: Optional[int], now: Optional[float] = None) -> bool:
+        """Check and consume the rate limit of the user in the chat"""
+        if now is None:
+            now = monotonic()
+
+        user_tokens = self.user.available(user_id, now)
+        if user_tokens < 1:
+            return False
+
+        chat_tokens = self.chat.available(chat_id, now)
+        if chat_tokens < 1:
+            return False
+
+        total_tokens = self.total.available(None, now)
+        if total_tokens < 1:
+            return False
+
+        self.user.consume(user_id, user_tokens, now)
+        self.chat.consume(chat_id, chat_tokens, now)
+        self.total.consume(None, total_tokens, now)
+        return True
+
+
+class Throttle:
+    """Paces calls shared by concurrent workers to ``rate`` per second.
+
+    Up to ``burst`` calls may go through at once after an idle time. :meth:`~pause`
+    holds every caller back, i.e. for the duration of a ``FloodWait``.
+    """
+
+    __slots__ = ("interval", "burst", "_next", "_paused_until")
+
+    interval: float
+    burst: int
+    _next: float
+    _paused_until: float
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.interval = 1 / rate
+        self.burst = burst
+        self._next = 0.0
+        self._paused_until = 0.0
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """Take the next slot, returns the seconds to wait until it"""
+        if now is None:
+            now = monotonic()
+
+        # Slots left unused while idle can be spent, up to the burst size
+        slot = max(self._next, now - (self.burst - 1) * self.interval, self._paused_until)
+        self._next = slot + self.interval
+        return max(0.0, slot - now)
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A pause may have been requested while sleeping
+            delay = max(0.0, self._paused_until - monotonic())
+
+    def pause(self, seconds: float, now: Optional[float] = None) -> None:
+        """Hold back every caller for the given seconds"""
+        if now is None:
+            now = monotonic()
+
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._next = max(self._next, self._paused_until)
@@ -0,0 +1,198 @@
+"""Chat administrators roster cache"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, MutableMapping, Optional
+
+from pyrogram.client import Client
+from pyrogram.enums.chat_member_status import ChatMemberStatus
+from pyrogram.enums.chat_members_filter import ChatMembersFilter
+from pyrogram.types import ChatMember, ChatMemberUpdated
+
+__all__ = ["ADMIN_STATUS", "ChatRoster", "AdminRoster", "ROSTER"]
+
+ADMIN_STATUS = {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}
+LEFT_STATUS = {ChatMemberStatus.LEFT, ChatMemberStatus.BANNED}
+
+
+class ChatRoster:
+    """Administrators of a chat and the bot own membership.
+
+    Attributes:
+        chat_id (`int`): The chat id.
+        me (`ChatMember`): The bot membership on the chat.
+        admins (`dict`): Administrators and owner of the chat mapped by their user id.
+        loaded_at (`float`): Monotonic time the roster was fetched.
+    """
+
+    __slots__ = ("chat_id", "me", "admins", "loaded_at")
+
+    chat_id: int
+    me: ChatMember
+    admins: Dict[int, ChatMember]
+    loaded_at: float
+
+    def __init__(self, chat_id: int, me: ChatMember, admins: Dict[int, ChatMember]) -> None:
+        self.chat_id = chat_id
+        self.me = me
+        self.admins = admins
+        self.loaded_at = monotonic()
+
+    def get(self, user_id: int) -> Optional[ChatMember]:
+        """Get the admin membership of the user, None if the user is not an admin"""
+        return self.admins.get(user_id)
+
+    def is_admin(self, user_id: int) -> bool:
+        return user_id in self.admins
+
+    def apply(self, member: Optional[ChatMember], user_id: int) -> None:
+        """Apply a membership change of the user"""
+        if member is not None and member.status in ADMIN_STATUS:
+            self.admins[user_id] = member
+        else:
+            self.admins.pop(user_id, None)
+
+        if member is not None and member.user and member.user.is_self:
+            self.me = member
+
+
+class AdminRoster:
+    """LRU of chat rosters, refreshed after ``ttl`` seconds.
+
+    Rosters are fetched once with a single administrators listing and then
+    kept up to date from chat member updates through :meth:`update`.
+    """
+
+    max_chats: int
+    ttl: float
+
+    _chats: "OrderedDict[int, ChatRoster]"
+    _loading: MutableMapping[int, "asyncio.Future[ChatRoster]"]
+
+    def __init__(self, max_chats: int = 1000, ttl: float = 600) -> None:
+        self.max_chats = max_chats
+        self.ttl = ttl
+
+        self._chats = OrderedDict()
+        self._loading = {}
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def peek(self, chat_id: int) -> Optional[ChatRoster]:
+        """Get a fresh cached roster without fetching it"""
+        roster = self._chats.get(chat_id)
+        if roster is None or monotonic() - roster.loaded_at >= self.ttl:
+            return None
+
+        self._chats.move_to_end(chat_id)
+        return roster
+
+    async def get(self, client: Client, chat_id: int) -> ChatRoster:
+        """Get the roster of a chat, fetching it if it's missing or expired"""
+        roster = self.peek(chat_id)
+        if roster is not None:
+            return roster
+
+        # Share a single fetch between concurrent callers
+        try:
+            return await asyncio.shield(self._loading[chat_id])
+        except KeyError:
+            pass
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[chat_id] = future
+        try:
+            roster = await self._fetch(client, chat_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # Mark retrieved, waiters already got the exception
+            future.exception()
+            raise
+        else:
+            future.set_result(roster)
+        finally:
+            del self._loading[chat_id]
+
+        self._chats[chat_id] = roster
+        self._chats.move_to_end(chat_id)
+        while len(self._chats) > self.max_chats:
+            self._chats.popitem(last=False)
+
+        return roster
+
+    async def _fetch(self, client: Client, chat_id: int) -> ChatRoster:
+        me = None
+        admins = {}
+        member: ChatMember
+        async for member in client.get_chat_members(chat_id, filter=ChatMembersFilter.ADMINISTRATORS):  # type: ignore
+            if member.status not in ADMIN_STATUS:
+                continue
+
+            admins[member.user.id] = member
+            if member.user.is_self:
+                me = member
+
+        if me is None:
+            me = await client.get_chat_member(chat_id, "me")
+
+        return ChatRoster(chat_id, me, admins)
+
+    async def get_member(self, client: Client, chat_id: int, user_id: int) -> ChatMember:
+        """Get a chat member, administrators are served from the roster"""
+        roster = await self.get(client, chat_id)
+        member = roster.get(user_id)
+        if member is not None:
+            return member
+
+        return await client.get_chat_member(chat_id, user_id)
+
+    async def is_admin(self, client: Client, chat_id: int, user_id: int) -> bool:
+        return (await self.get(client, chat_id)).is_admin(user_id)
+
+    def update(self, update: ChatMemberUpdated) -> None:
+        """Apply a chat member update into the cached roster of the chat"""
+        roster = self._chats.get(update.chat.id)
+        if roster is None:
+            return
+
+        member = update.new_chat_member or update.old_chat_member
+        if member is None or member.user is None:
+            return
+
+        new = update.new_chat_member
+        if member.user.is_self and (new is None or new.status in LEFT_STATUS):
+            # We're out of the chat
+            self.invalidate(update.chat.id)
+            return
+
+        roster.apply(new, member.user.id)
+
+    def invalidate(self, chat_id: int) -> None:
+        self._chats.pop(chat_id, None)
+
+    def clear(self) -> None:
+        self._chats.clear()
+
+
+# Shared roster of the running bot
+ROSTER = AdminRoster()
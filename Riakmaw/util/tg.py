@@ -19,13 +19,15 @@ import codecs
 import html
 import re
 from enum import IntEnum, unique
-from functools import wraps
+from string import Formatter
+from types import MappingProxyType
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncGenerator,
-    Callable,
     List,
+    Mapping,
+    MutableMapping,
     Optional,
     Set,
     Tuple,
@@ -49,10 +51,8 @@ from pyrogram.types import (
     Message,
     User,
 )
-from typing_extensions import ParamSpecArgs, ParamSpecKwargs
 
-from Riakmaw.util import types as _types
-from Riakmaw.util.async_helper import run_sync
+from Riakmaw.util.roster import ROSTER
 
 if TYPE_CHECKING:
     from Riakmaw.core import Riakmaw
@@ -230,10 +230,11 @@ async def fetch_permissions(
     client: Client, chat: int, user: int
 ) -> Tuple[Optional[Bot], Optional[Member]]:
     try:
-        bot, member = await asyncio.gather(
-            client.get_chat_member(chat, "me"), client.get_chat_member(chat, user)
-        )
-        return bot, member
+        # Bot and administrators are served from the roster,
+        # so only regular members cost an API call
+        roster = await ROSTER.get(client, chat)
+        member = roster.get(user) or await client.get_chat_member(chat, user)
+        return roster.me, member
     except UserNotParticipant:
         return None, None
 
@@ -281,57 +282,63 @@ async def reply_and_delete(message: Message, text: str, del_in: int = 1) -> None
 
 
 # { GetText Language
-def __loop_safe(
-    func: Callable[
-        [
-            _types.Bot,
-            _types.ChatId,
-            _types.TextName,
-            ParamSpecArgs,
-            _types.NoFormat,
-            ParamSpecKwargs,
-        ],
-        str,
-    ]
-):  # Special: let default typing choose the return type
-    """Decorator for get_text functions"""
-
-    @wraps(func)
-    async def wrapper(
-        bot: "Riakmaw",
-        chat_id: Optional[int],
-        text_name: str,
-        *args: Any,
-        noformat: bool = False,
-        **kwargs: Any,
-    ) -> str:
-        """Parse the string with user language setting.
-
-        Parameters:
-            bot (`Riakmaw`):
-                The bot instance.
-            chat_id (`int`, *Optional*):
-                Id of the sender(PM's) or chat_id to fetch the user language setting.
-                If chat_id is None, the language will always use 'en'.
-            text_name (`str`):
-                String name to parse. The string is parsed from YAML documents.
-            *args (`any`, *Optional*):
-                One or more values that should be formatted and inserted in the string.
-                The value should be in order based on the language string placeholder.
-            noformat (`bool`, *Optional*):
-                If True, the text returned will not be formated.
-                Default to False.
-            **kwargs (`any`, *Optional*):
-                One or more keyword values that should be formatted and inserted in the string.
-                based on the keyword on the language strings.
-        """
-        return await run_sync(func, bot, chat_id, text_name, *args, noformat=noformat, **kwargs)
-
-    return wrapper
-
-
-@__loop_safe
-def get_text(
+def _format_fields(text: str) -> List[str]:
+    """Placeholders of a format string, raises ValueError if the string is malformed"""
+    return sorted(field or "" for _, field, _, _ in Formatter().parse(text) if field is not None)
+
+
+def _decode_text(text: Any) -> str:
+    return codecs.decode(
+        codecs.encode(str(text), "latin-1", "backslashreplace"),
+        "unicode-escape",
+    )
+
+
+def compile_languages(
+    bot: "Riakmaw", raw: Mapping[str, Mapping[str, Any]]
+) -> MutableMapping[str, Mapping[str, str]]:
+    """Decode loaded language files into read-only string tables.
+
+    Strings missing from a language, or with placeholders that don't match the
+    'en' string, are replaced by the 'en' string so lookups never have to fall back.
+    """
+    base = {name: _decode_text(text) for name, text in raw.get("en", {}).items()}
+
+    languages: MutableMapping[str, Mapping[str, str]] = {"en": MappingProxyType(base)}
+    for lang, strings in raw.items():
+        if lang == "en":
+            continue
+
+        table = dict(base)
+        for name, text in strings.items():
+            text = _decode_text(text)
+            try:
+                fields = _format_fields(text)
+            except ValueError:
+                bot.log.error("Malformed '%s' string on '%s', using 'en'", name, lang)
+                continue
+
+            if name in base:
+                try:
+                    expected = _format_fields(base[name])
+                except ValueError:
+                    expected = fields
+
+                if fields != expected:
+                    bot.log.error("Mismatched '%s' placeholders on '%s', using 'en'", name, lang)
+                    continue
+
+            table[name] = text
+
+        for name in base.keys() - strings.keys():
+            bot.log.debug("NO LANGUAGE STRING FOR '%s' in '%s'", name, lang)
+
+        languages[lang] = MappingProxyType(table)
+
+    return languages
+
+
+def get_text_sync(
     bot: "Riakmaw",
     chat_id: Optional[int],
     text_name: str,
@@ -339,29 +346,55 @@ def get_text(
     noformat: bool = False,
     **kwargs: Any,
 ) -> str:
-    def _get_text(lang: str) -> str:
+    """Synchronous :obj:`get_text`, strings are looked up from the compiled language tables."""
+    lang = bot.chats_languages.get(chat_id or 0, "en")
+    try:
+        text = bot.languages[lang][text_name]
+    except KeyError:
         try:
-            text = codecs.decode(
-                codecs.encode(bot.languages[lang][text_name], "latin-1", "backslashreplace"),
-                "unicode-escape",
-            )
+            text = bot.languages["en"][text_name]
         except KeyError:
-            if lang == "en":
-                return (
-                    f"**NO LANGUAGE STRING FOR '{text_name}' in '{lang}'**\n"
-                    "__Please forward this to__ @userbotindo"
-                )
-
-            bot.log.warning("NO LANGUAGE STRING FOR '%s' in '%s'", text_name, lang)
-            return _get_text("en")
-        else:
-            try:
-                return text if noformat else text.format(*args, **kwargs)
-            except (IndexError, KeyError):
-                bot.log.error("Failed to format '%s' string on '%s'", text_name, lang)
-                raise
+            return (
+                f"**NO LANGUAGE STRING FOR '{text_name}' in '{lang}'**\n"
+                "__Please forward this to__ @userbotindo"
+            )
+
+    try:
+        return text if noformat else text.format(*args, **kwargs)
+    except (IndexError, KeyError):
+        bot.log.error("Failed to format '%s' string on '%s'", text_name, lang)
+        raise
 
-    return _get_text(bot.chats_languages.get(chat_id or 0, "en"))
+
+async def get_text(
+    bot: "Riakmaw",
+    chat_id: Optional[int],
+    text_name: str,
+    *args: Any,
+    noformat: bool = False,
+    **kwargs: Any,
+) -> str:
+    """Parse the string with user language setting.
+
+    Parameters:
+        bot (`Riakmaw`):
+            The bot instance.
+        chat_id (`int`, *Optional*):
+            Id of the sender(PM's) or chat_id to fetch the user language setting.
+            If chat_id is None, the language will always use 'en'.
+        text_name (`str`):
+            String name to parse. The string is parsed from YAML documents.
+        *args (`any`, *Optional*):
+            One or more values that should be formatted and inserted in the string.
+            The value should be in order based on the language string placeholder.
+        noformat (`bool`, *Optional*):
+            If True, the text returned will not be formated.
+            Default to False.
+        **kwargs (`any`, *Optional*):
+            One or more keyword values that should be formatted and inserted in the string.
+            based on the keyword on the language strings.
+    """
+    return get_text_sync(bot, chat_id, text_name, *args, noformat=noformat, **kwargs)
 
 
 # }
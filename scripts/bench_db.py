@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Benchmark util.db backends against a local mongod
+
+Usage: python scripts/bench_db.py [--uri mongodb://localhost:27017] [--ops 20000]
+"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Any, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Riakmaw.util import db  # noqa: E402  # skipcq: FLK-E402
+
+DATABASE = "RiakmawBench"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(client: Any, ops: int, concurrency: int) -> Tuple[float, float, float]:
+    collection = client.get_database(DATABASE).get_collection("bench")
+    await collection.delete_many({})
+    await collection.insert_many([{"_id": i, "value": 0} for i in range(1000)])
+
+    latencies: List[float] = []
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for i in range(ops):
+        queue.put_nowait(i)
+
+    async def worker() -> None:
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = perf_counter()
+            # Mixed workload close to the bot: mostly reads with some upserts
+            if i % 4:
+                await collection.find_one({"_id": i % 1000})
+            else:
+                await collection.update_one({"_id": i % 1000}, {"$inc": {"value": 1}}, upsert=True)
+            latencies.append(perf_counter() - start)
+
+    start = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+
+    await client.drop_database(DATABASE)
+    return ops / elapsed, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    backends = [("thread", db.AsyncClient)]
+    if db.native.AVAILABLE:
+        backends.append(("native", db.NativeClient))
+    else:
+        print("native backend unavailable (requires motor), skipping")
+
+    print(f"{'backend':<8} {'ops/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, client_cls in backends:
+        client = client_cls(args.uri)
+        try:
+            throughput, p50, p99 = await run(client, args.ops, args.concurrency)
+        finally:
+            await client.close()
+
+        print(f"{name:<8} {throughput:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""Benchmark micro-batched spam prediction with a stub classifier
+
+Usage: python scripts/bench_predict.py [--messages 2000] [--workers 1]
+"""
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Any, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from Riakmaw.util.batching import BatchPredictor  # noqa: E402  # skipcq: FLK-E402
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128]
+# Cost of a model call, and of each text in it. Close to a vectorizer + linear model,
+# where most of a single prediction is call overhead.
+CALL_COST = 0.0005
+TEXT_COST = 0.00005
+
+
+def burn(seconds: float) -> None:
+    end = perf_counter() + seconds
+    while perf_counter() < end:
+        pass
+
+
+class Prediction:
+    """[[ham, spam]] probabilities, like the real model"""
+
+    def __init__(self, spam: float) -> None:
+        self.rows = [[1 - spam, spam]]
+
+    def __getitem__(self, key: int) -> Any:
+        return self.rows[key]
+
+    @property
+    def size(self) -> int:
+        return 2
+
+
+class StubClassifier:
+    """Implements util.types.Classifier with a fixed CPU cost per call"""
+
+    async def predict(self, text: str, **_: Any) -> Prediction:
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: Sequence[str]) -> List[Prediction]:
+        burn(CALL_COST + TEXT_COST * len(texts))
+        return [Prediction(0.9 if "spam" in text else 0.1) for text in texts]
+
+    async def load_model(self, _: Any) -> None:
+        pass
+
+    async def is_spam(self, text: str) -> bool:
+        return (await self.predict(text))[0][1] > 0.5
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.lower()
+
+    @staticmethod
+    def prob_to_string(value: float) -> str:
+        return f"{value * 100:.2f}"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def measure(predict: Any, messages: int) -> Tuple[float, float, float]:
+    latencies: List[float] = []
+
+    async def message(i: int) -> None:
+        await predict(f"message number {i} with some spam" if i % 10 == 0 else f"hello {i}")
+        latencies.append(perf_counter() - start)
+
+    # A traffic spike, every message arrives at once
+    start = perf_counter()
+    await asyncio.gather(*(message(i) for i in range(messages)))
+    elapsed = perf_counter() - start
+    return messages / elapsed, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--delay", type=float, default=5, help="max batch delay in ms")
+    args = parser.parse_args()
+
+    print(f"{'batch':<8} {'msg/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    model = StubClassifier()
+    throughput, p50, p99 = await measure(model.predict, args.messages)
+    print(f"{'inline':<8} {throughput:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+    for size in BATCH_SIZES:
+        predictor = BatchPredictor(
+            model, workers=args.workers, max_batch=size, max_delay=args.delay / 1000
+        )
+        try:
+            await predictor.predict("warm up the workers")
+            throughput, p50, p99 = await measure(predictor.predict, args.messages)
+        finally:
+            predictor.close()
+
+        print(f"{size:<8} {throughput:>10.0f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import threading
+
+import pytest
+
+from Riakmaw.util.async_helper import (
+    close_executor,
+    executor_stats,
+    open_executor,
+    run_sync,
+    shutdown_executors,
+)
+
+
+def thread_name() -> str:
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_named_pools():
+    try:
+        assert (await run_sync(thread_name, pool="db")).startswith("Riakmaw-db_")
+        assert (await run_sync(thread_name, pool="db-stream")).startswith("Riakmaw-db-stream_")
+        assert (await run_sync(thread_name)).startswith("Riakmaw-misc_")
+
+        stats = executor_stats()
+        assert stats["db"]["completed"] == 1
+        assert stats["db"]["depth"] == 0
+
+        with pytest.raises(ValueError):
+            await run_sync(thread_name, pool="unknown")
+    finally:
+        shutdown_executors()
+
+
+@pytest.mark.asyncio
+async def test_dedicated_executors():
+    try:
+        first = open_executor("stream")
+        second = open_executor("stream")
+        assert await first.run(threading.get_ident) != await second.run(threading.get_ident)
+
+        stats = executor_stats()
+        assert stats["stream"]["size"] == 2
+        assert stats["stream"]["completed"] == 2
+
+        close_executor(first)
+        assert executor_stats()["stream"]["size"] == 1
+
+        close_executor(second)
+        assert "stream" not in executor_stats()
+    finally:
+        shutdown_executors()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+
+import pytest
+
+from Riakmaw.util.banlist import BanList, BanListMirror, parse_export
+
+
+def test_parse_export():
+    assert parse_export(b"id,reason\n5,spam\n3,scam\n\n-7\n") == [5, 3, -7]
+    assert parse_export(json.dumps([1, "2", None]).encode()) == [1, 2]
+    assert parse_export(json.dumps({"result": [{"id": 4}, {"user_id": 6}]}).encode()) == [4, 6]
+
+
+def test_roundtrip(tmp_path):
+    path = tmp_path / "list.rbl"
+    banlist = BanList.from_ids([9, 1, 5, 1, -2])
+    banlist.save(path)
+
+    mapped = BanList.open(path)
+    assert len(mapped) == 4
+    assert mapped == banlist
+    assert all(i in mapped for i in (-2, 1, 5, 9))
+    assert not any(i in mapped for i in (0, 2, 10, "1"))
+    mapped.close()
+
+    path.write_bytes(b"garbage")
+    with pytest.raises(ValueError):
+        BanList.open(path)
+
+
+@pytest.mark.asyncio
+async def test_mirror_refresh(tmp_path):
+    source = tmp_path / "export.csv"
+    source.write_text("1\n2\n")
+    mirror = BanListMirror("test", str(source), tmp_path / "mirror.rbl", 60)
+
+    assert not mirror.load()
+    assert 1 not in mirror
+    assert await mirror.refresh(None)
+    assert 1 in mirror and 3 not in mirror
+
+    # Unchanged source isn't read again
+    assert not await mirror.refresh(None)
+
+    source.write_text("3\n")
+    os.utime(source, (0, os.path.getmtime(mirror.path) + 10))
+    assert await mirror.refresh(None)
+    assert 3 in mirror and 1 not in mirror
+    mirror.close()
+
+    # Restarts map the saved list back
+    restarted = BanListMirror("test", str(source), tmp_path / "mirror.rbl", 60)
+    assert restarted.load()
+    assert 3 in restarted
+    restarted.close()
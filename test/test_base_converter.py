@@ -19,7 +19,7 @@ from inspect import signature
 import pytest
 
 from Riakmaw.error import BadArgument
-from Riakmaw.util.converter import parse_arguments
+from Riakmaw.util.converter import InvocationPlan, parse_arguments
 
 from . import Context, Message
 
@@ -145,3 +145,9 @@ class TestBaseConverter:
         with pytest.raises(BadArgument):
             await self.__parse_arguments(var_keyword)
             await self.__parse_arguments_no_args(var_keyword)
+
+    @pytest.mark.asyncio
+    async def test_plan_reused(self):
+        plan = InvocationPlan(one_arg_with_default_and_type)
+        assert await plan.parse(context) == ([1], {})  # type: ignore
+        assert await plan.parse(no_args_context) == ([0], {})  # type: ignore
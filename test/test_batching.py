@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+
+import pytest
+
+from Riakmaw.util.batching import BatchPredictor
+
+
+class StubClassifier:
+    def __init__(self):
+        self.calls = []
+
+    async def predict(self, text, **_):
+        return (os.getpid(), text.upper())
+
+    def predict_batch(self, texts):
+        self.calls.append(len(texts))
+        return [(os.getpid(), text.upper()) for text in texts]
+
+
+class FailingClassifier:
+    async def predict(self, text, **_):
+        raise RuntimeError(text)
+
+
+@pytest.mark.asyncio
+async def test_batch_bounds():
+    model = StubClassifier()
+    predictor = BatchPredictor(model, workers=0, max_batch=4, max_delay=0.01)
+
+    texts = [f"text {i}" for i in range(10)]
+    results = await asyncio.gather(*(predictor.predict(text) for text in texts))
+    assert [text for _, text in results] == [text.upper() for text in texts]
+    # Full batches leave at once, the rest once the delay passed
+    assert model.calls == [4, 4, 2]
+    assert predictor.stats()["batches"] == 3
+
+    predictor.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_error():
+    predictor = BatchPredictor(FailingClassifier(), workers=0)
+    with pytest.raises(RuntimeError):
+        await predictor.predict("boom")
+
+    predictor.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_process():
+    predictor = BatchPredictor(StubClassifier(), workers=1, max_batch=8)
+    try:
+        results = await asyncio.gather(*(predictor.predict(str(i)) for i in range(8)))
+    finally:
+        predictor.close()
+
+    pids = {pid for pid, _ in results}
+    assert len(pids) == 1 and os.getpid() not in pids
+    assert [text for _, text in results] == [str(i) for i in range(8)]
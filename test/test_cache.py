@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import pytest
+
+from Riakmaw.util.cache import AsyncCache, RecentWindow, cached
+
+calls = []
+
+
+@cached(maxsize=2, negative=(KeyError,))
+async def fetch(key):
+    calls.append(key)
+    await asyncio.sleep(0)
+    if key == "missing":
+        raise KeyError(key)
+    if key == "broken":
+        raise ValueError(key)
+
+    return key.upper()
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    calls.clear()
+    fetch.cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_singleflight():
+    assert await asyncio.gather(*(fetch("a") for _ in range(5))) == ["A"] * 5
+    assert calls == ["a"]
+    assert fetch.cache.stats()["coalesced"] == 4
+
+    assert await fetch("a") == "A"
+    assert calls == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_lru_and_invalidate():
+    for key in ("a", "b", "a", "c"):
+        await fetch(key)
+
+    assert calls == ["a", "b", "c"]
+    assert fetch.cache.evictions == 1
+
+    await fetch("b")
+    assert calls[-1] == "b"
+
+    fetch.cache.invalidate("b")
+    await fetch("b")
+    assert calls == ["a", "b", "c", "b", "b"]
+
+
+@pytest.mark.asyncio
+async def test_negative_cache():
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            await fetch("missing")
+
+    assert calls == ["missing"]
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await fetch("broken")
+
+    assert calls == ["missing", "broken", "broken"]
+
+
+@pytest.mark.asyncio
+async def test_ttl_of_result():
+    cache = AsyncCache(60, ttl_of=lambda value: 60 if value else 0)
+
+    async def lookup(value):
+        calls.append(value)
+        return value
+
+    for _ in range(2):
+        await cache.get_or_call("hit", lookup, "banned")
+        await cache.get_or_call("miss", lookup, None)
+
+    # Empty results expired right away
+    assert calls == ["banned", None, None]
+    assert cache.stats()["hit_ratio"] == 0.25
+
+
+def test_recent_window():
+    window = RecentWindow(100, buckets=4)
+    window.add(-1, 1, now=0)
+    window.add(-1, 2, now=10)
+    window.add(-2, 1, now=30)
+
+    assert window.contains(-1, 1, now=50)
+    assert not window.contains(-2, 2, now=50)
+    assert len(window) == 3
+
+    # The first generation expires as a whole
+    assert not window.contains(-1, 2, now=100)
+    assert window.contains(-2, 1, now=100)
+
+    window.add(-1, 3, now=100)
+    window.discard_value(1)
+    assert not window.contains(-2, 1, now=100)
+    window.discard_chat(-1)
+    assert len(window) == 0
+
+    # The index of the chats of an id follows discards of a chat or a single entry
+    window.add(-1, 4, now=100)
+    window.add(-2, 4, now=100)
+    window.add(-3, 4, now=100)
+    window.discard_chat(-1)
+    window.discard(-2, 4)
+    window.discard_value(4)
+    assert not window.contains(-3, 4, now=100)
+    assert len(window) == 0
+
+    disabled = RecentWindow(0)
+    disabled.add(-1, 1, now=0)
+    assert not disabled.contains(-1, 1, now=0)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+import pytest
+from pyrogram.enums.chat_type import ChatType
+from pyrogram.filters import create, group, outgoing
+from pyrogram.types import Chat, Message
+
+from Riakmaw.filters import create as create_custom
+from Riakmaw.util.compiled_filter import compile_filter
+
+calls = []
+
+
+async def _async_true(_, __, ___):
+    calls.append("async_true")
+    return True
+
+
+def _sync_false(_, __, ___):
+    calls.append("sync_false")
+    return False
+
+
+async_true = create(_async_true)
+sync_false = create(_sync_false)
+
+
+def update(chat_type=ChatType.SUPERGROUP, is_outgoing=False, text="hello"):
+    return Message(id=1, chat=Chat(id=-1, type=chat_type), outgoing=is_outgoing, text=text)
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+@pytest.mark.asyncio
+async def test_truth_table():
+    flt = compile_filter(group & ~outgoing)
+    assert await flt(None, update())
+    assert not await flt(None, update(is_outgoing=True))
+    assert not await flt(None, update(chat_type=ChatType.PRIVATE))
+
+    assert await compile_filter(sync_false | async_true)(None, update())
+    assert not await compile_filter(~(sync_false | async_true))(None, update())
+
+
+@pytest.mark.asyncio
+async def test_short_circuit():
+    assert not await compile_filter(sync_false & async_true)(None, update())
+    assert calls == ["sync_false"]
+
+    calls.clear()
+    assert await compile_filter(async_true | sync_false)(None, update())
+    assert calls == ["async_true"]
+
+
+@pytest.mark.asyncio
+async def test_memoized_per_update():
+    first = compile_filter(async_true & group)
+    second = compile_filter(async_true & group)
+    message = update()
+
+    assert await first(None, message)
+    assert await second(None, message)
+    assert calls == ["async_true"]
+
+    assert await second(None, update())
+    assert calls == ["async_true", "async_true"]
+
+
+async def _async_regex(_, __, update):
+    calls.append("async_regex")
+    update.matches = [match] if (match := re.match(r"^(h)ello", update.text)) else None
+    return bool(update.matches)
+
+
+async_regex = create_custom(_async_regex)
+
+
+@pytest.mark.asyncio
+async def test_memoized_matches():
+    message = update()
+
+    assert await compile_filter(async_regex & group)(None, message)
+    message.matches = None
+    # A different tree sharing the filter, it's answered from the memo with its matches
+    assert await compile_filter(async_regex & ~outgoing)(None, message)
+    assert calls == ["async_regex"]
+    assert message.matches[0].group(1) == "h"
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import threading
+from collections import deque
+
+import pytest
+
+from Riakmaw.util.db.cursor_base import AsyncCursorBase
+
+
+class Dispatch:
+    def __init__(self, batches):
+        self.batches = [list(batch) for batch in batches]
+        self.data = deque()
+        self.killed = False
+        self.threads = []
+        self.collection = None
+
+    @property
+    def alive(self):
+        return bool(self.data) or not self.killed
+
+    def _refresh(self):
+        self.threads.append(threading.current_thread().name)
+        if self.batches:
+            self.data.extend(self.batches.pop(0))
+        self.killed = not self.batches
+
+        return len(self.data)
+
+    def close(self):
+        self.killed = True
+
+
+class Cursor(AsyncCursorBase):
+    def _data(self):
+        return self.dispatch.data
+
+    def _killed(self):
+        return self.dispatch.killed
+
+    def _query_flags(self):
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_buffered_iteration():
+    dispatch = Dispatch([[1, 2, 3], [4, 5]])
+
+    assert [doc async for doc in Cursor(dispatch)] == [1, 2, 3, 4, 5]
+    # Only refreshing a batch goes through the executor
+    assert len(dispatch.threads) == 2
+    assert all(name.startswith("Riakmaw-db-stream") for name in dispatch.threads)
+
+
+@pytest.mark.asyncio
+async def test_read_ahead():
+    dispatch = Dispatch([[1, 2], [3, 4], [5]])
+    cursor = Cursor(dispatch).read_ahead()
+
+    assert await cursor.next() == 1
+    assert await cursor.next() == 2
+    # Buffer is drained, the next batch is already on its way
+    assert cursor._prefetch is not None
+    assert await cursor.to_list() == [3, 4, 5]
+
+    cursor = Cursor(Dispatch([[1], [2], [3]])).read_ahead()
+    assert await cursor.next() == 1
+    await cursor.close()
+    assert cursor._prefetch is None
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from Riakmaw.util.db import native
+from Riakmaw.util.db.native import NativeCursor
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.size = None
+        self.closed = False
+
+    def batch_size(self, size):
+        self.size = size
+
+    async def next(self):
+        if not self.docs:
+            raise StopAsyncIteration
+
+        return self.docs.pop(0)
+
+    async def to_list(self, length=None):
+        res, self.docs = self.docs[:length], self.docs[length:] if length else []
+        return res
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_cursor():
+    motor_cursor = Cursor([{"_id": 1}, {"_id": 2}, {"_id": 3}])
+    cursor = NativeCursor(motor_cursor).batch_size(2).read_ahead()
+
+    async with cursor:
+        assert [doc["_id"] async for doc in cursor] == [1, 2, 3]
+
+    assert motor_cursor.size == 2 and motor_cursor.closed
+    assert await NativeCursor(Cursor([{"_id": 1}, {"_id": 2}])).to_list(1) == [{"_id": 1}]
+
+
+@pytest.mark.skipif(not native.AVAILABLE, reason="motor is not installed")
+@pytest.mark.asyncio
+async def test_client_wrappers():
+    client = native.NativeClient("mongodb://localhost:27017", connect=False)
+    try:
+        database = client.get_database("RiakmawTest")
+        collection = database.get_collection("test")
+        assert isinstance(collection, native.NativeCollection)
+        assert collection.database is database and database.client is client
+        assert collection.name == "test"
+
+        # Cursors are lazy, nothing is sent to the server until iterated
+        assert isinstance(collection.find({}).read_ahead(), NativeCursor)
+        assert isinstance(collection.aggregate([]), NativeCursor)
+        assert isinstance(collection.watch(), NativeCursor)
+    finally:
+        await client.close()
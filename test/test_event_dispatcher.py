@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from pyrogram.enums.chat_type import ChatType
+from pyrogram.filters import regex
+from pyrogram.types import Chat, Message
+
+from Riakmaw.core.event_dispatcher import CONCURRENT_DISPATCH_LIMIT, EventDispatcher
+from Riakmaw.util.misc import StopPropagation
+
+PLUGIN = SimpleNamespace(name="Test")
+
+
+class Bot(EventDispatcher):
+    def __init__(self, shards=0, queue_size=100):
+        self.log = logging.getLogger("test")
+        self.loop = asyncio.get_running_loop()
+        self.config = SimpleNamespace(DISPATCH_SHARDS=shards, DISPATCH_QUEUE_SIZE=queue_size)
+        self.client = None
+        self.stopping = False
+        super().__init__()
+
+    def update_plugin_events(self):
+        pass
+
+    async def dispatch_alert(self, invoker, exc):
+        raise exc
+
+
+def message(chat_id, msg_id=1, text="hello"):
+    return Message(id=msg_id, chat=Chat(id=chat_id, type=ChatType.SUPERGROUP), text=text)
+
+
+@pytest.mark.asyncio
+async def test_shard_chat_order():
+    bot = Bot(shards=4)
+    received = []
+
+    async def on_message(msg):
+        # Later messages finish faster, only the shard keeps them in order
+        await asyncio.sleep((10 - msg.id) / 1000)
+        received.append((msg.chat.id, msg.id))
+
+    bot.register_listener(PLUGIN, "message", on_message)
+    bot.start_dispatch_shards()
+    for msg_id in range(10):
+        for chat_id in range(-1, -6, -1):
+            await bot.dispatch_sharded_event("message", message(chat_id, msg_id))
+
+    await bot.stop_dispatch_shards()
+    assert len(received) == 50
+    for chat_id in range(-1, -6, -1):
+        assert [i for chat, i in received if chat == chat_id] == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_shard_backpressure():
+    bot = Bot(shards=1, queue_size=2)
+    gate = asyncio.Event()
+    received = []
+
+    async def on_message(msg):
+        await gate.wait()
+        received.append(msg.id)
+
+    bot.register_listener(PLUGIN, "message", on_message)
+    bot.start_dispatch_shards()
+
+    await bot.dispatch_sharded_event("message", message(-1, 1))
+    await asyncio.sleep(0)  # The worker takes the first one and blocks on it
+    await bot.dispatch_sharded_event("message", message(-1, 2))
+    await bot.dispatch_sharded_event("message", message(-1, 3))
+
+    blocked = asyncio.create_task(bot.dispatch_sharded_event("message", message(-1, 4)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert bot.dispatch_stats()[0]["depth"] == 2
+
+    gate.set()
+    await asyncio.wait_for(blocked, 1)
+    await bot.stop_dispatch_shards()
+    assert received == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_shard_drain_on_stop():
+    bot = Bot(shards=2)
+    received = []
+
+    async def on_message(msg):
+        await asyncio.sleep(0.001)
+        received.append(msg.id)
+
+    bot.register_listener(PLUGIN, "message", on_message)
+    bot.start_dispatch_shards()
+    for msg_id in range(20):
+        await bot.dispatch_sharded_event("message", message(-(msg_id % 3) - 1, msg_id))
+
+    bot.stopping = True
+    await bot.stop_dispatch_shards()
+    assert sorted(received) == list(range(20))
+    assert not bot.dispatch_shards
+
+    # Updates arriving after the stop began are dropped
+    await bot.dispatch_sharded_event("message", message(-1, 99))
+    assert 99 not in received
+
+
+@pytest.mark.asyncio
+async def test_concurrent_listeners():
+    bot = Bot()
+    running = 0
+    peak = 0
+
+    def make_listener(prio):
+        async def on_message(_):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return prio
+
+        return on_message
+
+    for prio in range(CONCURRENT_DISPATCH_LIMIT * 2):
+        bot.register_listener(
+            PLUGIN, "message", make_listener(prio), priority=prio, concurrent=True
+        )
+
+    start = asyncio.get_running_loop().time()
+    results = await bot.dispatch_event("message", message(-1))
+    elapsed = asyncio.get_running_loop().time() - start
+
+    # Ran together, but never more than the limit at once
+    assert peak == CONCURRENT_DISPATCH_LIMIT
+    assert elapsed < 0.01 * CONCURRENT_DISPATCH_LIMIT
+    assert results == tuple(range(1, CONCURRENT_DISPATCH_LIMIT * 2))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stop_propagation():
+    bot = Bot()
+    called = []
+
+    def make_listener(name, stop=False):
+        async def on_message(_):
+            called.append(name)
+            if stop:
+                raise StopPropagation
+            return name
+
+        return on_message
+
+    bot.register_listener(
+        PLUGIN, "message", make_listener("a", stop=True), priority=1, concurrent=True
+    )
+    bot.register_listener(PLUGIN, "message", make_listener("b"), priority=2, concurrent=True)
+    bot.register_listener(PLUGIN, "message", make_listener("c"), priority=3)
+
+    # The batch that raised finishes, the listeners after it don't run
+    assert await bot.dispatch_event("message", message(-1)) == ("b",)
+    assert sorted(called) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_matches():
+    bot = Bot()
+    seen = {}
+
+    def make_listener(name):
+        async def on_message(msg):
+            await asyncio.sleep(0)
+            seen[name] = msg.matches[0].group(0)
+
+        return on_message
+
+    bot.register_listener(
+        PLUGIN,
+        "message",
+        make_listener("first"),
+        priority=1,
+        filters=regex(r"^\w+"),
+        concurrent=True,
+    )
+    bot.register_listener(
+        PLUGIN,
+        "message",
+        make_listener("last"),
+        priority=2,
+        filters=regex(r"\w+$"),
+        concurrent=True,
+    )
+
+    await bot.dispatch_event("message", message(-1, text="hello world"))
+    assert seen == {"first": "hello", "last": "world"}
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from Riakmaw.util.fed_index import FedBanIndex, IntSet
+
+
+def test_int_set():
+    values = IntSet([5, -1001234567890, 3])
+    assert 3 in values and -1001234567890 in values
+    assert 4 not in values and "3" not in values
+
+    values.add(4)
+    values.discard(3)
+    values.discard(100)
+    assert 4 in values and 3 not in values
+    assert sorted(values) == [-1001234567890, 4, 5]
+    assert len(values) == 3
+
+    for value in range(1000):
+        values.add(value)
+    values.compact()
+    assert len(values) == 1001
+    assert 999 in values and -1 not in values
+
+
+def test_lookup():
+    index = FedBanIndex()
+    index.set_federation("a", "Alpha", [-1], [])
+    index.set_federation("b", "Beta", [-2], ["a"])
+    index.set_federation("c", "Gamma", [-3], ["b"])
+    index.add_ban("c", 42)
+
+    # a subscribed to b, and b subscribed to c
+    assert index.federations(-1) == ("a", "b", "c")
+    assert index.lookup(-1, 42) == "c"
+    assert index.lookup(-3, 42) == "c"
+    assert index.lookup(-1, 7) is None
+    assert index.lookup(-100, 42) is None
+
+    index.add_ban("a", 42)
+    assert index.lookup(-1, 42) == "a"
+
+    index.set_federation("b", "Beta", [-2], [])
+    assert index.federations(-1) == ("a",)
+    assert index.lookup(-1, 42) == "a"
+    assert index.lookup(-2, 42) == "c"
+
+    index.remove_ban("a", 42)
+    index.remove_federation("a")
+    assert index.federation(-1) is None
+    assert index.lookup(-1, 42) is None
+
+
+def test_subscription_cycle():
+    index = FedBanIndex()
+    index.set_federation("a", "Alpha", [-1], ["b"])
+    index.set_federation("b", "Beta", [-2], ["a"])
+    index.load_bans("b", [1, 2, 3])
+
+    assert index.federations(-1) == ("a", "b")
+    assert index.lookup(-1, 2) == "b"
+    assert len(index) == 3
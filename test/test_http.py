@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import ClientTimeout, web
+from aiohttp.test_utils import TestServer
+
+from Riakmaw.util.http import CircuitBreaker, CircuitOpen, HttpClient
+
+
+@pytest_asyncio.fixture
+async def server():
+    calls = {"flaky": 0, "down": 0}
+
+    async def ok(_):
+        return web.json_response({"ok": True})
+
+    async def flaky(_):
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+
+    async def down(_):
+        calls["down"] += 1
+        return web.Response(status=500)
+
+    async def slow(_):
+        await asyncio.sleep(1)
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    app.router.add_get("/flaky", flaky)
+    app.router.add_post("/flaky", flaky)
+    app.router.add_get("/down", down)
+    app.router.add_get("/slow", slow)
+
+    test_server = TestServer(app)
+    await test_server.start_server()
+    test_server.calls = calls
+    yield test_server
+    await test_server.close()
+
+
+@pytest_asyncio.fixture
+async def http():
+    client = HttpClient(backoff=0.01, breaker_threshold=3, breaker_reset=60)
+    yield client
+    await client.close()
+
+
+def test_breaker():
+    breaker = CircuitBreaker(threshold=2, reset_after=10)
+    breaker.failure(now=0)
+    assert breaker.allow(now=0)
+    breaker.failure(now=1)
+    assert breaker.state == "open"
+    assert not breaker.allow(now=5)
+
+    # A single trial after the cooldown
+    assert breaker.allow(now=11)
+    assert not breaker.allow(now=11)
+    breaker.failure(now=12)
+    assert not breaker.allow(now=15)
+
+    assert breaker.allow(now=22)
+    breaker.success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_request(server, http):
+    async with http.get(server.make_url("/ok")) as resp:
+        assert await resp.json() == {"ok": True}
+
+    resp = await http.get(server.make_url("/ok"))
+    assert resp.status == 200
+    resp.release()
+
+    stats = http.stats()[f"{server.host}:{server.port}"]
+    assert stats["requests"] == 2
+    assert stats["errors"] == 0
+    assert stats["circuit"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_retry(server, http):
+    async with http.get(server.make_url("/flaky")) as resp:
+        assert resp.status == 200
+    assert server.calls["flaky"] == 3
+
+    stats = http.stats()[f"{server.host}:{server.port}"]
+    assert stats["retries"] == 2
+    assert stats["errors"] == 2
+
+    # POST isn't retried unless asked to
+    server.calls["flaky"] = 0
+    async with http.post(server.make_url("/flaky")) as resp:
+        assert resp.status == 503
+    assert server.calls["flaky"] == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_open(server, http):
+    async with http.get(server.make_url("/down")) as resp:
+        assert resp.status == 500
+    assert server.calls["down"] == 3
+
+    with pytest.raises(CircuitOpen):
+        await http.get(server.make_url("/ok"))
+    assert server.calls["down"] == 3
+    assert http.stats()[f"{server.host}:{server.port}"]["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout(server, http):
+    with pytest.raises(asyncio.TimeoutError):
+        await http.get(server.make_url("/slow"), retries=0, timeout=ClientTimeout(total=0.1))
+
+    stats = http.stats()[f"{server.host}:{server.port}"]
+    assert stats["errors"] == 1
+    assert stats["last_error"]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import inspect
+import os
+from typing import Any, Iterator, List, Mapping
+from uuid import uuid4
+
+import pytest
+from pymongo import IndexModel, MongoClient
+from pymongo.errors import PyMongoError
+
+import Riakmaw.core  # noqa: F401  # skipcq: PY-W2000
+from Riakmaw import plugin, plugins
+from Riakmaw.util.db import merge_indexes
+
+# Query shapes that run on every update or command, keep it in sync with the plugins
+HOT_QUERIES = [
+    ("FEDERATIONS", {"chats": -100}),
+    ("FEDERATIONS", {"owner": 1}),
+    ("FEDERATIONS", {"admins": 1}),
+    ("FEDERATIONS", {"subscribers": "fed"}),
+    ("FED_BANS", {"fed_id": "fed", "target_id": 1}),
+    ("FED_BANS", {"type": "user", "fed_id": "fed"}),
+    ("FED_BANS", {"target_id": 1}),
+    ("USERS", {"hash": "hash"}),
+    ("USERS", {"chats": -100}),
+    ("CHATS", {"chat_id": -100}),
+    ("CHATS", {"hash": "hash"}),
+    ("WELCOME", {"chat_id": -100}),
+    ("LOCKINGS", {"chat_id": -100}),
+    ("FILTERS", {"chat_id": -100}),
+    ("NOTES", {"chat_id": -100}),
+    ("RULES", {"chat_id": -100}),
+    ("LANGUAGE", {"chat_id": -100}),
+    ("SPAM_PREDICT_SETTING", {"chat_id": -100}),
+    ("GBAN_SETTINGS", {"chat_id": -100}),
+    ("CHAT_REPORTING", {"chat_id": -100}),
+]
+
+
+def declared_indexes() -> Mapping[str, List[Any]]:
+    classes = [
+        cls
+        for module in plugins.subplugins
+        for _, cls in inspect.getmembers(module, inspect.isclass)
+        if issubclass(cls, plugin.Plugin) and cls is not plugin.Plugin
+    ]
+    return merge_indexes(cls.indexes for cls in classes)
+
+
+def stages(plan: Mapping[str, Any]) -> Iterator[str]:
+    yield plan["stage"]
+    for key in ("inputStage", "inputStages"):
+        children = plan.get(key, [])
+        for child in children if isinstance(children, list) else [children]:
+            yield from stages(child)
+
+
+def test_merge_indexes():
+    merged = merge_indexes(
+        [
+            {"CHATS": [IndexModel("chat_id")]},
+            {"CHATS": [IndexModel("chat_id"), IndexModel("hash")], "USERS": [IndexModel("hash")]},
+        ]
+    )
+    assert [i.document["name"] for i in merged["CHATS"]] == ["chat_id_1", "hash_1"]
+    assert [i.document["name"] for i in merged["USERS"]] == ["hash_1"]
+
+
+@pytest.mark.parametrize("collection, query", HOT_QUERIES)
+def test_hot_query_declared(collection, query):
+    prefixes = {
+        next(iter(index.document["key"])) for index in declared_indexes().get(collection, [])
+    }
+    assert next(iter(query)) in prefixes
+
+
+@pytest.fixture(scope="module")
+def database():
+    client: MongoClient = MongoClient(
+        os.environ.get("TEST_DB_URI", "mongodb://localhost:27017"), serverSelectionTimeoutMS=500
+    )
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip("No local mongod to explain queries against")
+
+    name = f"riakmaw_test_{uuid4().hex[:8]}"
+    db = client[name]
+    for collection, indexes in declared_indexes().items():
+        db[collection].create_indexes(indexes)
+
+    yield db
+
+    client.drop_database(name)
+    client.close()
+
+
+@pytest.mark.parametrize("collection, query", HOT_QUERIES)
+def test_hot_query_plan(database, collection, query):
+    database[collection].insert_one({"_dummy": True})
+    plan = database[collection].find(query).explain()["queryPlanner"]["winningPlan"]
+    # Newer servers wrap the classic plan with the query engine details
+    plan = plan.get("queryPlan", plan)
+    assert "COLLSCAN" not in set(stages(plan)), f"{collection} {query} does a COLLSCAN"
@@ -14,10 +14,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
+
 import pytest
 from yaml import full_load
 
 from Riakmaw.language import get_lang_file
+from Riakmaw.util.tg import compile_languages, get_text
+
+
+class Bot:
+    log = logging.getLogger("test")
+    chats_languages = {1: "id"}
 
 
 @pytest.mark.asyncio
@@ -25,3 +33,21 @@ async def test_language():
     """Check if language file is valid."""
     async for language_file in get_lang_file():
         full_load(await language_file.read_text())
+
+
+@pytest.mark.asyncio
+async def test_compiled_language():
+    bot = Bot()
+    bot.languages = compile_languages(  # type: ignore
+        bot,
+        {
+            "en": {"hello": "Hello {}", "bye": "Bye\\n{name}", "missing": "Only en"},
+            "id": {"hello": "Halo {name}", "bye": "Dah\\n{name}"},
+        },
+    )
+
+    assert bot.languages["en"]["bye"] == "Bye\n{name}"
+    # Mismatched placeholders and missing strings falls back to 'en' at load
+    assert await get_text(bot, 1, "hello", "Bot") == "Hello Bot"  # type: ignore
+    assert await get_text(bot, 1, "bye", name="Bot") == "Dah\nBot"  # type: ignore
+    assert await get_text(bot, 1, "missing") == "Only en"  # type: ignore
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import pytest
+from pyrogram.enums.chat_type import ChatType
+from pyrogram.types import Chat, Message
+
+from Riakmaw.util import memo
+
+calls = []
+
+
+async def load():
+    calls.append(1)
+    await asyncio.sleep(0)
+    return {"_id": 1}
+
+
+async def listener():
+    return await memo.current().get(("USERS", 1), load)
+
+
+@pytest.mark.asyncio
+async def test_update_scope():
+    calls.clear()
+    message = Message(id=1, chat=Chat(id=-1, type=ChatType.SUPERGROUP))
+
+    with memo.scope(message):
+        first, second = await asyncio.gather(listener(), listener())
+        assert first is second
+        assert await listener() is first
+    assert calls == [1]
+
+    # Same update dispatched again shares the memo, other updates don't
+    with memo.scope(message):
+        await listener()
+    with memo.scope(Message(id=2, chat=Chat(id=-1, type=ChatType.SUPERGROUP))):
+        await listener()
+    assert calls == [1, 1]
+
+    # Nothing is shared outside of an update
+    await listener()
+    await listener()
+    assert calls == [1, 1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_failed_load():
+    update_memo = memo.UpdateMemo()
+
+    async def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await update_memo.get("key", fail)
+    assert "key" not in update_memo
+
+    update_memo.set("key", 1)
+    assert await update_memo.get("key", fail) == 1
+    update_memo.discard("key")
+    assert "key" not in update_memo
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import pytest
+
+from Riakmaw.util.rate_limiter import CommandLimiter, RateLimiter, Throttle
+
+
+def test_bucket_refill():
+    limiter = RateLimiter(3, 10)
+    assert all(limiter.hit(1, now=100.0) for _ in range(3))
+    assert not limiter.hit(1, now=100.0)
+    assert limiter.hit(2, now=100.0)
+
+    # One token is refilled every period / capacity seconds
+    assert not limiter.hit(1, now=103.0)
+    assert limiter.hit(1, now=103.4)
+    assert not limiter.hit(1, now=103.4)
+
+
+def test_lazy_sweep():
+    limiter = RateLimiter(3, 10)
+    limiter.hit(1, now=100.0)
+    limiter.hit(2, now=105.0)
+    limiter.hit(3, now=111.0)
+    assert set(limiter.buckets) == {2, 3}
+
+
+def test_scopes():
+    limiter = CommandLimiter(user=(2, 10), chat=(3, 10), total=(4, 10))
+    assert limiter.acquire(1, -1, now=0.0)
+    assert limiter.acquire(1, -1, now=0.0)
+    assert not limiter.acquire(1, -1, now=0.0)  # user exceeded
+
+    assert limiter.acquire(2, -1, now=0.0)
+    assert not limiter.acquire(3, -1, now=0.0)  # chat exceeded
+
+    assert limiter.acquire(3, -2, now=0.0)
+    assert not limiter.acquire(4, -3, now=0.0)  # global exceeded
+
+    # Rejected hits don't consume other scopes
+    assert limiter.user.available(4, now=0.0) == 2
+
+
+def test_throttle():
+    throttle = Throttle(10, burst=2)
+    assert throttle.reserve(now=100.0) == 0
+    assert throttle.reserve(now=100.0) == 0
+    assert throttle.reserve(now=100.0) == pytest.approx(0.1)
+    assert throttle.reserve(now=100.0) == pytest.approx(0.2)
+
+    throttle.pause(5, now=100.0)
+    assert throttle.reserve(now=101.0) == pytest.approx(4)
+    assert throttle.reserve(now=101.0) == pytest.approx(4.1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from pyrogram.enums.chat_member_status import ChatMemberStatus
+from pyrogram.enums.chat_type import ChatType
+from pyrogram.types import Chat, ChatMember, ChatMemberUpdated, User
+
+from Riakmaw.util.roster import AdminRoster
+
+CHAT = -100
+
+
+def member(user_id, status, is_self=False):
+    return ChatMember(status=status, user=User(id=user_id, is_self=is_self))
+
+
+class Client:
+    def __init__(self):
+        self.listed = 0
+        self.members = {
+            1: member(1, ChatMemberStatus.OWNER),
+            2: member(2, ChatMemberStatus.ADMINISTRATOR),
+            3: member(3, ChatMemberStatus.MEMBER),
+            "me": member(99, ChatMemberStatus.ADMINISTRATOR, is_self=True),
+        }
+
+    async def get_chat_members(self, chat_id, filter=None):  # skipcq: PYL-W0622
+        self.listed += 1
+        await asyncio.sleep(0)
+        for value in self.members.values():
+            if value.status in {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}:
+                yield value
+
+    async def get_chat_member(self, chat_id, user_id):
+        return self.members[user_id]
+
+
+def updated(old, new):
+    return ChatMemberUpdated(
+        chat=Chat(id=CHAT, type=ChatType.SUPERGROUP),
+        from_user=User(id=1),
+        date=datetime.now(),
+        old_chat_member=old,
+        new_chat_member=new,
+    )
+
+
+@pytest.mark.asyncio
+async def test_singleflight_load():
+    client, roster = Client(), AdminRoster()
+    first, second = await asyncio.gather(roster.get(client, CHAT), roster.get(client, CHAT))
+    assert first is second
+    assert client.listed == 1
+
+    assert first.me.user.id == 99
+    assert set(first.admins) == {1, 2, 99}
+    assert (await roster.get_member(client, CHAT, 3)).status == ChatMemberStatus.MEMBER
+    assert client.listed == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_update():
+    client, roster = Client(), AdminRoster()
+    await roster.get(client, CHAT)
+
+    promoted = member(3, ChatMemberStatus.ADMINISTRATOR)
+    roster.update(updated(client.members[3], promoted))
+    assert await roster.is_admin(client, CHAT, 3)
+
+    roster.update(updated(client.members[2], member(2, ChatMemberStatus.MEMBER)))
+    assert not await roster.is_admin(client, CHAT, 2)
+
+    demoted = member(99, ChatMemberStatus.MEMBER, is_self=True)
+    roster.update(updated(client.members["me"], demoted))
+    assert (await roster.get(client, CHAT)).me is demoted
+    assert client.listed == 1
+
+    roster.update(updated(demoted, member(99, ChatMemberStatus.LEFT, is_self=True)))
+    assert roster.peek(CHAT) is None
+
+
+@pytest.mark.asyncio
+async def test_lru_and_ttl():
+    client, roster = Client(), AdminRoster(max_chats=2)
+    for chat_id in (1, 2, 1, 3):
+        await roster.get(client, chat_id)
+
+    assert roster.peek(2) is None
+    assert roster.peek(1) is not None and roster.peek(3) is not None
+
+    roster.ttl = 0
+    assert roster.peek(1) is None
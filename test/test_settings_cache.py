@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from Riakmaw.util.db import change_stream
+from Riakmaw.util.db.settings_cache import SettingsCache
+
+
+class Collection:
+    name = "TEST"
+
+    def __init__(self, docs, streams=()):
+        self.docs = docs
+        self.reads = 0
+        self.pipeline = None
+        self.streams = list(streams)
+        self.resumes = []
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        await asyncio.sleep(0)
+        return self.docs.get(query["chat_id"])
+
+    def watch(self, pipeline=None, resume_after=None):
+        self.pipeline = pipeline
+        self.resumes.append(resume_after)
+        stream = self.streams.pop(0) if self.streams else Stream()
+        if isinstance(stream, Exception):
+            raise stream
+
+        return stream
+
+
+class Stream:
+    def __init__(self, changes=(), error=None):
+        self.changes = list(changes)
+        self.error = error
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.changes:
+            change = self.changes.pop(0)
+            self.resume_token = change["_id"]
+            return change
+        if self.error:
+            raise self.error
+
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_read_through():
+    collection = Collection({1: {"_id": "a", "chat_id": 1, "setting": False}})
+    cache = SettingsCache(collection, maxsize=2)
+
+    first, second = await asyncio.gather(cache.get(1), cache.get(1))
+    assert first is second
+    assert await cache.get(2) is None
+    assert await cache.get(2) is None
+    assert collection.reads == 2
+
+    cache.invalidate(1)
+    assert (await cache.get(1))["setting"] is False
+    assert collection.reads == 3
+
+    await cache.get(3)  # evicts chat 2
+    assert len(cache) == 2
+    await cache.get(2)
+    assert collection.reads == 5
+    assert cache.stats()["hits"] == 1
+    cache.close()
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_change_events():
+    collection = Collection({1: {"_id": "a", "chat_id": 1, "topic": 5}})
+    cache = SettingsCache(collection, fields=("topic",))
+    await cache.get(1)
+    await cache.get(2)
+
+    # Unrelated fields don't evict the entry
+    cache._on_change(
+        {
+            "operationType": "update",
+            "documentKey": {"_id": "a"},
+            "updateDescription": {"updatedFields": {"last_update": 1}, "removedFields": []},
+        }
+    )
+    assert len(cache) == 2
+
+    cache._on_change(
+        {
+            "operationType": "update",
+            "documentKey": {"_id": "a"},
+            "updateDescription": {"updatedFields": {"topic": 6}, "removedFields": []},
+        }
+    )
+    cache._on_change({"operationType": "insert", "fullDocument": {"_id": "b", "chat_id": 2}})
+    assert len(cache) == 0
+
+    # Updates of other fields are filtered out on the server too
+    (stage,) = collection.pipeline
+    assert "topic." in str(stage["$match"])
+    assert SettingsCache(collection)._pipeline() == []
+    cache.close()
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_watch_recovery(monkeypatch):
+    monkeypatch.setattr(change_stream, "RETRY_DELAY", 0)
+    update = {
+        "_id": "token",
+        "operationType": "update",
+        "documentKey": {"_id": "b"},
+        "updateDescription": {"updatedFields": {"other": 1}, "removedFields": []},
+    }
+    collection = Collection(
+        {1: {"_id": "a", "chat_id": 1}},
+        [Stream([update], AutoReconnect("blip")), AutoReconnect("down")],
+    )
+    cache = SettingsCache(collection, fields=("topic",))
+    await cache.get(1)
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    # Resumed after the stream was lost, the failed reopen starts over and clears the cache
+    assert collection.resumes == [None, "token", None]
+    assert len(cache) == 0
+    assert cache.watching
+    cache.close()
+    await asyncio.sleep(0)
+
+    collection = Collection({}, [OperationFailure("not a replica set", code=40573)])
+    cache = SettingsCache(collection)
+    await cache.get(1)
+    await asyncio.sleep(0)
+    assert cache._watcher.done()
+    assert not cache.watching
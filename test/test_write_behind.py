@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# Copyright (C) 2020 - 2023  Famhawite Infosys Team, <https://github.com/lalrochhara.git>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import pytest
+
+from Riakmaw.util.db.write_behind import WriteBehind
+
+
+class Collection:
+    name = "TEST"
+
+    def __init__(self):
+        self.bulks = []
+
+    async def bulk_write(self, requests, ordered=True):
+        assert not ordered
+        self.bulks.append([(req._filter, req._doc, req._upsert) for req in requests])
+
+
+@pytest.mark.asyncio
+async def test_merge():
+    collection = Collection()
+    buffer = WriteBehind(collection, delay=60)
+
+    buffer.update_one({"_id": 1}, {"$set": {"name": "a"}, "$addToSet": {"chats": 1}}, upsert=True)
+    buffer.update_one({"_id": 1}, {"$set": {"name": "b"}, "$addToSet": {"chats": 2}}, upsert=True)
+    buffer.update_one({"_id": 1}, {"$push": {"sample": {"$each": [1], "$slice": -10}}})
+    buffer.update_one({"_id": 1}, {"$push": {"sample": {"$each": [2], "$slice": -10}}})
+    buffer.update_one({"_id": 2}, {"$inc": {"count": 1}}, upsert=True)
+    buffer.update_one({"_id": 2}, {"$inc": {"count": 2}}, upsert=True)
+    assert len(buffer) == 2
+
+    await buffer.flush()
+    assert collection.bulks == [
+        [
+            (
+                {"_id": 1},
+                {
+                    "$set": {"name": "b"},
+                    "$addToSet": {"chats": {"$each": [1, 2]}},
+                    "$push": {"sample": {"$each": [1, 2], "$slice": -10}},
+                },
+                True,
+            ),
+            ({"_id": 2}, {"$inc": {"count": 3}}, True),
+        ]
+    ]
+    assert buffer.stats()["written"] == 2
+
+
+@pytest.mark.asyncio
+async def test_conflict_and_triggers():
+    collection = Collection()
+    buffer = WriteBehind(collection, max_docs=2, delay=0.01)
+
+    buffer.update_one({"_id": 1}, {"$set": {"data.a": 1}})
+    # Overlapping path starts a new batch, the first one is written before it
+    buffer.update_one({"_id": 1}, {"$unset": {"data": ""}})
+    buffer.update_one({"_id": 1}, {"$set": {"data.a": 2}})
+    await asyncio.sleep(0.05)
+
+    assert collection.bulks == [
+        [({"_id": 1}, {"$set": {"data.a": 1}}, False)],
+        [({"_id": 1}, {"$unset": {"data": ""}}, False)],
+        [({"_id": 1}, {"$set": {"data.a": 2}}, False)],
+    ]
+
+    collection.bulks.clear()
+    buffer.update_one({"_id": 1}, {"$inc": {"a": 1}})
+    buffer.update_one({"_id": 2}, {"$inc": {"a": 1}})
+    await asyncio.sleep(0)
+    assert len(collection.bulks) == 1
+
+
+@pytest.mark.asyncio
+async def test_conflict_keeps_other_documents():
+    collection = Collection()
+    buffer = WriteBehind(collection, delay=60)
+
+    buffer.update_one({"_id": 1}, {"$set": {"name": "a"}})
+    buffer.update_one({"_id": 2}, {"$set": {"name": "b"}})
+    # The upsert overwrites everything the plain update wrote
+    buffer.update_one({"_id": 1}, {"$set": {"name": "c"}, "$addToSet": {"chats": 1}}, upsert=True)
+    # It doesn't here, only the conflicting document is written early
+    buffer.update_one({"_id": 2}, {"$setOnInsert": {"chats": []}}, upsert=True)
+    await asyncio.sleep(0)
+
+    assert collection.bulks == [[({"_id": 2}, {"$set": {"name": "b"}}, False)]]
+    assert len(buffer) == 2
+
+    await buffer.flush()
+    assert collection.bulks[1] == [
+        ({"_id": 1}, {"$set": {"name": "c"}, "$addToSet": {"chats": {"$each": [1]}}}, True),
+        ({"_id": 2}, {"$setOnInsert": {"chats": []}}, True),
+    ]